@@ -0,0 +1,188 @@
+"""
+Tabela de Feriados para o Cálculo de Dias Úteis
+Base offline de feriados nacionais, estaduais (por UF) e municipais.
+
+As datas fixas são indicadas como (mês, dia). Os feriados móveis são
+indicados pelo deslocamento em dias relativamente ao Domingo de Páscoa.
+Feriados criados por lei a partir de um dado ano (nacionais, estaduais ou
+municipais) ficam nas tabelas *_DESDE, que indicam também o primeiro ano em vigor.
+"""
+
+
+# ============================================================================
+# FERIADOS NACIONAIS
+# ============================================================================
+
+FERIADOS_NACIONAIS_FIXOS = {
+    (1, 1): "Confraternização Universal",
+    (4, 21): "Tiradentes",
+    (5, 1): "Dia do Trabalho",
+    (9, 7): "Independência do Brasil",
+    (10, 12): "Nossa Senhora Aparecida",
+    (11, 2): "Finados",
+    (11, 15): "Proclamação da República",
+    (12, 25): "Natal",
+}
+
+# Feriados nacionais fixos que só se aplicam a partir de um ano: (mês, dia): (ano, nome)
+FERIADOS_NACIONAIS_FIXOS_DESDE = {
+    (11, 20): (2024, "Dia Nacional de Zumbi e da Consciência Negra"),  # Lei 14.759/2023
+}
+
+# Inclui os pontos facultativos de observância generalizada (Carnaval e Corpus Christi)
+FERIADOS_NACIONAIS_MOVEIS = {
+    -48: "Carnaval (segunda-feira)",
+    -47: "Carnaval (terça-feira)",
+    -2: "Sexta-feira Santa",
+    60: "Corpus Christi",
+}
+
+
+# ============================================================================
+# FERIADOS ESTADUAIS (por UF)
+# ============================================================================
+
+FERIADOS_ESTADUAIS = {
+    "AC": {
+        (1, 23): "Dia do Evangélico",
+        (6, 15): "Aniversário do Acre",
+        (9, 5): "Dia da Amazônia",
+        (11, 17): "Assinatura do Tratado de Petrópolis",
+    },
+    "AL": {
+        (6, 24): "São João",
+        (6, 29): "São Pedro",
+        (9, 16): "Emancipação Política de Alagoas",
+    },
+    "AM": {
+        (9, 5): "Elevação do Amazonas à Categoria de Província",
+    },
+    "AP": {
+        (3, 19): "Dia de São José",
+        (9, 13): "Criação do Território Federal do Amapá",
+    },
+    "BA": {
+        (7, 2): "Independência da Bahia",
+    },
+    "CE": {
+        (3, 19): "Dia de São José",
+        (3, 25): "Data Magna do Ceará",
+    },
+    "DF": {
+        (11, 30): "Dia do Evangélico",
+    },
+    "ES": {},
+    "GO": {},
+    "MA": {
+        (7, 28): "Adesão do Maranhão à Independência",
+    },
+    "MG": {},
+    "MS": {
+        (10, 11): "Criação do Estado de Mato Grosso do Sul",
+    },
+    "MT": {},
+    "PA": {
+        (8, 15): "Adesão do Grão-Pará à Independência",
+    },
+    "PB": {
+        (8, 5): "Fundação do Estado da Paraíba",
+    },
+    "PE": {
+        (3, 6): "Revolução Pernambucana",
+    },
+    "PI": {
+        (10, 19): "Dia do Piauí",
+    },
+    "PR": {
+        (12, 19): "Emancipação Política do Paraná",
+    },
+    "RJ": {
+        (4, 23): "Dia de São Jorge",
+    },
+    "RN": {
+        (10, 3): "Mártires de Cunhaú e Uruaçu",
+    },
+    "RO": {
+        (1, 4): "Criação do Estado de Rondônia",
+        (6, 18): "Dia do Evangélico",
+    },
+    "RR": {
+        (10, 5): "Criação do Estado de Roraima",
+    },
+    "RS": {
+        (9, 20): "Revolução Farroupilha",
+    },
+    "SC": {},
+    "SE": {
+        (7, 8): "Emancipação Política de Sergipe",
+    },
+    "SP": {
+        (7, 9): "Revolução Constitucionalista",
+    },
+    "TO": {
+        (9, 8): "Nossa Senhora da Natividade",
+        (10, 5): "Criação do Estado do Tocantins",
+    },
+}
+
+# Feriados estaduais que só se aplicam a partir de um ano: UF -> {(mês, dia): (ano, nome)}
+# Antes da Lei 14.759/2023, o 20/11 só era feriado onde a lei local o instituía.
+FERIADOS_ESTADUAIS_DESDE = {
+    "AL": {
+        (11, 20): (1996, "Dia de Zumbi dos Palmares"),  # Lei estadual 5.724/1995
+    },
+    "MT": {
+        (11, 20): (2003, "Dia da Consciência Negra"),  # Lei estadual 7.879/2002
+    },
+    "RJ": {
+        (11, 20): (2003, "Dia de Zumbi dos Palmares e da Consciência Negra"),  # Lei estadual 4.007/2002
+    },
+}
+
+
+# ============================================================================
+# FERIADOS MUNICIPAIS (por UF e município)
+# ============================================================================
+
+# Chave: (UF, nome do município em minúsculas e sem acentos)
+FERIADOS_MUNICIPAIS = {
+    ("MG", "itajuba"): {
+        (3, 19): "Aniversário de Itajubá",
+    },
+    ("MG", "belo horizonte"): {
+        (8, 15): "Assunção de Nossa Senhora",
+        (12, 8): "Imaculada Conceição",
+    },
+    ("SP", "sao paulo"): {
+        (1, 25): "Aniversário de São Paulo",
+    },
+    ("RJ", "rio de janeiro"): {
+        (1, 20): "Dia de São Sebastião",
+    },
+    ("RS", "porto alegre"): {
+        (2, 2): "Nossa Senhora dos Navegantes",
+    },
+    ("PR", "curitiba"): {
+        (9, 8): "Nossa Senhora da Luz dos Pinhais",
+    },
+    ("PE", "recife"): {
+        (7, 16): "Nossa Senhora do Carmo",
+    },
+    ("CE", "fortaleza"): {
+        (8, 15): "Nossa Senhora da Assunção",
+    },
+    ("BA", "salvador"): {
+        (6, 24): "São João",
+    },
+}
+
+# Feriados municipais que só se aplicam a partir de um ano: (UF, município) -> {(mês, dia): (ano, nome)}
+FERIADOS_MUNICIPAIS_DESDE = {
+    ("SP", "sao paulo"): {
+        (11, 20): (2004, "Dia da Consciência Negra"),  # Lei municipal 13.707/2004
+    },
+}
+
+
+# Lista de UFs disponíveis para seleção na interface
+UFS = sorted(FERIADOS_ESTADUAIS.keys())
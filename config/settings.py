@@ -38,6 +38,7 @@ class AppConfig:
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / os.getenv("DATA_DIR", "data")
     REPORTS_DIR = BASE_DIR / os.getenv("REPORTS_DIR", "reports")
+    CACHE_DIR = DATA_DIR / "cache"
     
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -45,6 +46,7 @@ class AppConfig:
     
     # Configurações adicionais
     MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "50"))
+    CACHE_MAX_SIZE_MB = int(os.getenv("CACHE_MAX_SIZE_MB", "500"))
     DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "pt-BR")
     
     # Benchmarks (para análises)
@@ -5,12 +5,13 @@ import pandas as pd
 import numpy as np
 import hashlib
 from datetime import datetime, date
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional, Iterable
 import logging
 
 from models.analysis import AnalysisResult, ValidationResult
 from models.enums import AnalysisType, RiskLevel, DataQuality
 from config.settings import AppConfig
+from logic.business_calendar import get_business_calendar, list_holidays
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,36 @@ BENCHMARK_ABSENTISMO = {
     'Outros': 3.5
 }
 
+# Formatos de data testados na detecção automática (ordem = prioridade em caso de empate)
+DATE_FORMATS = [
+    '%d/%m/%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+    '%d/%m/%y',
+    '%Y/%m/%d',
+    '%Y%m%d'
+]
+
+# Datas seriais do Excel (dias desde 30/12/1899) aceites: ~1927 a ~2119
+EXCEL_SERIAL_RANGE = (10000, 80000)
+EXCEL_EPOCH = '1899-12-30'
+
+# Frequências aceites em build_periods (nome -> frequência de pandas.Period)
+PERIOD_FREQUENCIES = {
+    'mensal': 'M',
+    'trimestral': 'Q',
+    'anual': 'Y'
+}
+
+# Parâmetros da detecção por amostragem
+DATE_SAMPLE_SIZE = 200
+DATE_FORMAT_MIN_MATCH = 0.8  # Mínimo para reutilizar um formato em cache
+
 class AbsenteeismProcessor:
     """
     Processa dados de absentismo e calcula mÃ©tricas chave:
@@ -35,6 +66,9 @@ class AbsenteeismProcessor:
     - AnÃ¡lise por colaborador
     """
     
+    # Cache de formatos detetados: (mapeamento de colunas, coluna) -> formato
+    _date_format_cache: Dict[Tuple, str] = {}
+    
     def __init__(self):
         self.config = AppConfig()
     
@@ -95,26 +129,115 @@ class AbsenteeismProcessor:
             quality_score=quality_score
         )
     
-    def _parse_dates_robust(self, df: pd.DataFrame, date_column: str) -> pd.Series:
+    def _format_match_ratio(self, sample: pd.Series, date_format: str) -> float:
+        """Proporção da amostra que é convertida com sucesso por um formato."""
+        return self._parse_with_format(sample, date_format).notna().mean()
+    
+    def _parse_with_format(self, values: pd.Series, date_format: str) -> pd.Series:
+        """Converte uma coluna com um formato explícito (ou 'excel' para datas seriais)."""
+        if date_format == 'excel':
+            serials = pd.to_numeric(values, errors='coerce')
+            serials = serials.where(serials.between(*EXCEL_SERIAL_RANGE))
+            return pd.to_datetime(serials, unit='D', origin=EXCEL_EPOCH, errors='coerce')
+        
+        return pd.to_datetime(values.astype(str).str.strip(), format=date_format, errors='coerce')
+    
+    def _detect_date_format(self, values: pd.Series) -> Optional[str]:
+        """
+        Deteta o formato de uma coluna de datas a partir de uma amostra.
+        
+        Args:
+            values: Coluna com as datas em bruto (texto ou números)
+        
+        Returns:
+            Formato com mais correspondências na amostra ('excel' para datas seriais),
+            ou None se nenhum formato servir
+        """
+        non_null = values.dropna()
+        if non_null.empty:
+            return None
+        
+        # Amostra distribuída ao longo do ficheiro (não apenas as primeiras linhas)
+        positions = np.linspace(0, len(non_null) - 1, num=min(len(non_null), DATE_SAMPLE_SIZE)).astype(int)
+        sample = non_null.iloc[np.unique(positions)]
+        
+        candidates = ['excel'] + DATE_FORMATS
+        ratios = {fmt: self._format_match_ratio(sample, fmt) for fmt in candidates}
+        best_format = max(candidates, key=lambda fmt: ratios[fmt])
+        
+        return best_format if ratios[best_format] > 0 else None
+    
+    def _parse_dates_robust(
+        self,
+        df: pd.DataFrame,
+        date_column: str,
+        cache_key: Optional[Tuple] = None
+    ) -> pd.Series:
         """
         Converte uma coluna para datas de forma robusta, tentando mÃºltiplos formatos.
         
+        O formato é detetado numa amostra e a coluna inteira é convertida com esse
+        formato explícito; só os valores que falharem passam pela conversão genérica
+        do pandas. O formato detetado fica em cache por mapeamento de colunas.
+        
         Args:
             df: DataFrame contendo a coluna
             date_column: Nome da coluna a converter
+            cache_key: Chave da cache de formatos (ex.: o mapeamento de colunas)
         
         Returns:
-            Series com as datas convertidas
+            Series datetime64[ns] com as datas convertidas (sem hora)
         """
         try:
-            # Tenta conversÃ£o padrÃ£o do pandas (suporta mÃºltiplos formatos)
-            dates = pd.to_datetime(df[date_column], dayfirst=True, errors='coerce')
+            values = df[date_column]
             
-            # Converte para date (remove timezone se existir)
+            if pd.api.types.is_datetime64_any_dtype(values):
+                dates = values
+            else:
+                key = (cache_key, date_column)
+                date_format = self._date_format_cache.get(key)
+                
+                # Confirma o formato em cache numa amostra antes de o reutilizar
+                if date_format is not None:
+                    sample = values.dropna().head(DATE_SAMPLE_SIZE)
+                    if self._format_match_ratio(sample, date_format) < DATE_FORMAT_MIN_MATCH:
+                        date_format = None
+                
+                if date_format is None:
+                    date_format = self._detect_date_format(values)
+                    if date_format is not None and cache_key is not None:
+                        self._date_format_cache[key] = date_format
+                
+                if date_format is not None:
+                    dates = self._parse_with_format(values, date_format)
+                    
+                    # Valores noutro formato (exportações mistas): tenta os restantes
+                    # formatos apenas nas linhas que falharam e, por fim, a conversão genérica
+                    dates = dates.astype('datetime64[ns]')
+                    leftover = dates.isna() & values.notna()
+                    for fallback_format in ['excel'] + DATE_FORMATS:
+                        if not leftover.any():
+                            break
+                        if fallback_format == date_format:
+                            continue
+                        dates[leftover] = self._parse_with_format(
+                            values[leftover], fallback_format
+                        ).astype('datetime64[ns]')
+                        leftover = dates.isna() & values.notna()
+                    
+                    if leftover.any():
+                        dates[leftover] = pd.to_datetime(
+                            values[leftover], dayfirst=True, errors='coerce'
+                        ).astype('datetime64[ns]')
+                else:
+                    # Tenta conversÃ£o padrÃ£o do pandas (suporta mÃºltiplos formatos)
+                    dates = pd.to_datetime(values, dayfirst=True, errors='coerce')
+            
+            # Remove timezone se existir
             if dates.dt.tz is not None:
                 dates = dates.dt.tz_localize(None)
             
-            dates = dates.dt.date
+            dates = dates.astype('datetime64[ns]').dt.normalize()
             
             # Log de datas invÃ¡lidas
             invalid_count = dates.isna().sum()
@@ -125,18 +248,24 @@ class AbsenteeismProcessor:
             
         except Exception as e:
             logger.error(f"Erro ao converter coluna '{date_column}': {e}")
-            return pd.Series([None] * len(df))
+            return pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
     
-    def _calculate_business_days(self, start_date: date, end_date: date) -> int:
+    def _calculate_business_days(
+        self,
+        start_date: date,
+        end_date: date,
+        busdaycal: Optional[np.busdaycalendar] = None
+    ) -> int:
         """
         Calcula o nÃºmero de dias Ãºteis entre duas datas.
         
         Args:
             start_date: Data de inÃ­cio
             end_date: Data de fim
+            busdaycal: Calendário de dias úteis com feriados (opcional)
         
         Returns:
-            NÃºmero de dias Ãºteis (excluindo fins de semana)
+            NÃºmero de dias Ãºteis (excluindo fins de semana e feriados do calendário)
         """
         try:
             if pd.isna(start_date) or pd.isna(end_date):
@@ -145,12 +274,17 @@ class AbsenteeismProcessor:
             if end_date < start_date:
                 return 0
             
+            if busdaycal is None:
+                busdaycal = np.busdaycalendar()
+            
             # Converte para numpy datetime64 para usar busday_count
             start_np = np.datetime64(start_date)
             end_np = np.datetime64(end_date)
             
             # Calcula dias Ãºteis (inclusive o Ãºltimo dia)
-            business_days = np.busday_count(start_np, end_np + np.timedelta64(1, 'D'))
+            business_days = np.busday_count(
+                start_np, end_np + np.timedelta64(1, 'D'), busdaycal=busdaycal
+            )
             
             return max(0, int(business_days))
             
@@ -158,6 +292,122 @@ class AbsenteeismProcessor:
             logger.error(f"Erro ao calcular dias Ãºteis entre {start_date} e {end_date}: {e}")
             return 1  # Fallback: considera pelo menos 1 dia
     
+    def _calculate_business_days_vectorized(
+        self,
+        start_dates: pd.Series,
+        end_dates: pd.Series,
+        period_start: date,
+        period_end: date,
+        busdaycal: Optional[np.busdaycalendar] = None
+    ) -> np.ndarray:
+        """
+        Calcula os dias úteis de todas as ausências numa única chamada a np.busday_count.
+        
+        As datas são recortadas ao período analisado antes da contagem. O resultado
+        é equivalente a chamar _calculate_business_days linha a linha com as datas
+        ajustadas, que é mantido como implementação de referência.
+        
+        Args:
+            start_dates: Datas de início das ausências
+            end_dates: Datas de fim das ausências
+            period_start: Data de início do período
+            period_end: Data de fim do período
+            busdaycal: Calendário de dias úteis com feriados (opcional)
+        
+        Returns:
+            Array de inteiros com os dias úteis de cada ausência
+        """
+        starts = pd.to_datetime(start_dates).to_numpy(dtype='datetime64[D]')
+        ends = pd.to_datetime(end_dates).to_numpy(dtype='datetime64[D]')
+        
+        # Ajusta as datas para o período analisado
+        starts = np.maximum(starts, np.datetime64(period_start, 'D'))
+        ends = np.minimum(ends, np.datetime64(period_end, 'D'))
+        
+        if busdaycal is None:
+            busdaycal = np.busdaycalendar()
+        
+        # Datas em falta (NaT) contam zero dias, como em _calculate_business_days
+        valid = ~(np.isnat(starts) | np.isnat(ends))
+        business_days = np.zeros(len(starts), dtype=np.int64)
+        
+        # Calcula dias úteis (inclusive o último dia); intervalos vazios ficam a zero
+        business_days[valid] = np.busday_count(
+            starts[valid], ends[valid] + np.timedelta64(1, 'D'), busdaycal=busdaycal
+        )
+        
+        return np.clip(business_days, 0, None)
+    
+    def _merge_absence_spells(
+        self,
+        absences_df: pd.DataFrame,
+        period_start: date,
+        period_end: date,
+        busdaycal: Optional[np.busdaycalendar] = None
+    ) -> pd.DataFrame:
+        """
+        Agrupa atestados sobrepostos ou consecutivos do mesmo colaborador num único período.
+        
+        Dois registos pertencem ao mesmo período quando se sobrepõem ou quando não
+        existe nenhum dia útil entre o fim de um e o início do seguinte (ex.: atestado
+        que termina na sexta e outro que começa na segunda). Implementado com
+        ordenação + groupby, sem ciclos Python (O(n log n)).
+        
+        Args:
+            absences_df: DataFrame com id_colaborador, data_inicio e data_fim
+            period_start: Data de início do período
+            period_end: Data de fim do período
+            busdaycal: Calendário de dias úteis com feriados (opcional)
+        
+        Returns:
+            DataFrame com um registo por período de ausência e respetivos dias úteis
+        """
+        columns = ['id_colaborador', 'data_inicio', 'data_fim', 'registros', 'dias_ausencia']
+        if absences_df.empty:
+            return pd.DataFrame(columns=columns)
+        if busdaycal is None:
+            busdaycal = np.busdaycalendar()
+        
+        spells = pd.DataFrame({
+            'id_colaborador': absences_df['id_colaborador'].to_numpy(),
+            'data_inicio': pd.to_datetime(absences_df['data_inicio']).to_numpy(dtype='datetime64[D]'),
+            'data_fim': pd.to_datetime(absences_df['data_fim']).to_numpy(dtype='datetime64[D]')
+        }).sort_values(['id_colaborador', 'data_inicio'], kind='mergesort', ignore_index=True)
+        
+        # Maior data de fim vista até ao registo anterior do mesmo colaborador
+        by_employee = spells.groupby('id_colaborador', sort=False)['data_fim']
+        prev_end = by_employee.cummax().groupby(spells['id_colaborador'], sort=False).shift()
+        
+        starts = spells['data_inicio'].to_numpy(dtype='datetime64[D]')
+        prev_end_np = prev_end.to_numpy(dtype='datetime64[D]')
+        has_prev = ~np.isnat(prev_end_np)
+        
+        # Dias úteis entre o fim anterior e o novo início (0 = contíguo ou sobreposto)
+        gap = np.zeros(len(spells), dtype=np.int64)
+        gap[has_prev] = np.busday_count(
+            prev_end_np[has_prev] + np.timedelta64(1, 'D'),
+            starts[has_prev],
+            busdaycal=busdaycal
+        )
+        new_spell = ~has_prev | ((starts > prev_end_np) & (gap > 0))
+        
+        spells = spells.groupby(np.cumsum(new_spell), sort=False).agg(
+            id_colaborador=('id_colaborador', 'first'),
+            data_inicio=('data_inicio', 'min'),
+            data_fim=('data_fim', 'max'),
+            registros=('data_inicio', 'size')
+        ).reset_index(drop=True)
+        
+        spells['dias_ausencia'] = self._calculate_business_days_vectorized(
+            spells['data_inicio'],
+            spells['data_fim'],
+            period_start,
+            period_end,
+            busdaycal
+        )
+        
+        return spells[columns]
+    
     def _calculate_bradford_factor(self, absences_df: pd.DataFrame) -> pd.DataFrame:
         """
         Calcula o Fator de Bradford para cada colaborador.
@@ -165,7 +415,7 @@ class AbsenteeismProcessor:
         Onde S = nÃºmero de perÃ­odos de ausÃªncia, D = total de dias ausentes
         
         Args:
-            absences_df: DataFrame com ausÃªncias jÃ¡ processadas
+            absences_df: DataFrame com os perÃ­odos de ausÃªncia jÃ¡ agrupados
         
         Returns:
             DataFrame com o Fator de Bradford por colaborador
@@ -183,6 +433,45 @@ class AbsenteeismProcessor:
         
         return bradford_df
     
+    def _prepare_absences(
+        self,
+        df: pd.DataFrame,
+        column_mapping: Dict[str, str]
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Renomeia as colunas, converte as datas e remove registros inválidos.
+        
+        Args:
+            df: DataFrame com os dados brutos
+            column_mapping: Mapeamento das colunas
+        
+        Returns:
+            Tupla (DataFrame com ausências válidas, número de linhas removidas por datas inválidas)
+        """
+        # Renomeia as colunas de acordo com o mapeamento
+        df_processed = df.rename(columns=column_mapping).copy()
+        
+        # Converte datas de forma robusta (formato detetado fica em cache por mapeamento)
+        format_cache_key = tuple(sorted(column_mapping.items()))
+        df_processed['data_inicio'] = self._parse_dates_robust(df_processed, 'data_inicio', format_cache_key)
+        df_processed['data_fim'] = self._parse_dates_robust(df_processed, 'data_fim', format_cache_key)
+        
+        # Remove linhas com datas invÃ¡lidas
+        initial_rows = len(df_processed)
+        df_processed.dropna(subset=['data_inicio', 'data_fim'], inplace=True)
+        removed_rows = initial_rows - len(df_processed)
+        
+        if removed_rows > 0:
+            logger.warning(f"{removed_rows} linhas removidas por datas invÃ¡lidas")
+        
+        # Remove registros onde data_fim < data_inicio
+        invalid_ranges = df_processed['data_fim'] < df_processed['data_inicio']
+        if invalid_ranges.any():
+            logger.warning(f"{invalid_ranges.sum()} registros com intervalo de datas invÃ¡lido removidos")
+            df_processed = df_processed[~invalid_ranges]
+        
+        return df_processed, removed_rows
+    
     def process(
         self,
         df: pd.DataFrame,
@@ -191,7 +480,9 @@ class AbsenteeismProcessor:
         period_end: date,
         total_employees: int,
         setor: str,
-        column_mapping: Dict[str, str]
+        column_mapping: Dict[str, str],
+        uf: Optional[str] = None,
+        municipio: Optional[str] = None
     ) -> AnalysisResult:
         """
         Processa os dados de absentismo e calcula todas as mÃ©tricas.
@@ -204,6 +495,8 @@ class AbsenteeismProcessor:
             total_employees: Total de colaboradores na organizaÃ§Ã£o
             setor: Setor da empresa (para benchmark)
             column_mapping: Mapeamento das colunas
+            uf: UF para o calendário de feriados estaduais (opcional)
+            municipio: Município para o calendário de feriados municipais (opcional)
         
         Returns:
             AnalysisResult com os resultados da anÃ¡lise
@@ -213,58 +506,126 @@ class AbsenteeismProcessor:
         if not validation.is_valid:
             raise ValueError(f"Dados invÃ¡lidos: {'; '.join(validation.errors)}")
         
-        # Renomeia as colunas de acordo com o mapeamento
-        df_processed = df.rename(columns=column_mapping).copy()
+        df_processed, removed_rows = self._prepare_absences(df, column_mapping)
+        df_filtered = self._filter_period(df_processed, period_start, period_end)
         
-        # Converte datas de forma robusta
-        df_processed['data_inicio'] = self._parse_dates_robust(df_processed, 'data_inicio')
-        df_processed['data_fim'] = self._parse_dates_robust(df_processed, 'data_fim')
+        return self._build_result(
+            df_filtered, removed_rows, validation.quality, name,
+            period_start, period_end, total_employees, setor, uf, municipio
+        )
+    
+    def process_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        name: str,
+        period_start: date,
+        period_end: date,
+        total_employees: int,
+        setor: str,
+        column_mapping: Dict[str, str],
+        uf: Optional[str] = None,
+        municipio: Optional[str] = None
+    ) -> AnalysisResult:
+        """
+        Processa os dados de absentismo a partir de um iterador de blocos (ver
+        FileValidator.read_file_chunked), sem carregar o arquivo inteiro em memória.
         
-        # Remove linhas com datas invÃ¡lidas
-        initial_rows = len(df_processed)
-        df_processed.dropna(subset=['data_inicio', 'data_fim'], inplace=True)
-        removed_rows = initial_rows - len(df_processed)
+        Cada bloco é convertido e filtrado ao período assim que é lido; apenas as
+        colunas id_colaborador/data_inicio/data_fim das ausências do período são
+        mantidas até ao cálculo final.
         
-        if removed_rows > 0:
-            logger.warning(f"{removed_rows} linhas removidas por datas invÃ¡lidas")
+        Args:
+            chunks: Iterador de DataFrames com os dados brutos
+            (restantes argumentos iguais a process)
         
-        # Remove registros onde data_fim < data_inicio
-        invalid_ranges = df_processed['data_fim'] < df_processed['data_inicio']
-        if invalid_ranges.any():
-            logger.warning(f"{invalid_ranges.sum()} registros com intervalo de datas invÃ¡lido removidos")
-            df_processed = df_processed[~invalid_ranges]
+        Returns:
+            AnalysisResult com os resultados da anÃ¡lise
+        """
+        filtered_parts = []
+        removed_rows = 0
+        null_cells = 0
+        total_cells = 0
+        
+        for chunk in chunks:
+            if total_cells == 0:
+                validation = self.validate(chunk, column_mapping)
+                if not validation.is_valid:
+                    raise ValueError(f"Dados invÃ¡lidos: {'; '.join(validation.errors)}")
+            
+            null_cells += int(chunk.isnull().sum().sum())
+            total_cells += chunk.size
+            
+            df_processed, removed = self._prepare_absences(chunk, column_mapping)
+            removed_rows += removed
+            filtered_parts.append(
+                self._filter_period(df_processed, period_start, period_end)[
+                    ['id_colaborador', 'data_inicio', 'data_fim']
+                ]
+            )
         
-        # Filtra apenas ausÃªncias que se sobrepÃµem ao perÃ­odo analisado
-        df_filtered = df_processed[
-            (df_processed['data_inicio'] <= period_end) & 
-            (df_processed['data_fim'] >= period_start)
-        ].copy()
+        if total_cells == 0:
+            raise ValueError("Dados invÃ¡lidos: O arquivo estÃ¡ vazio ou nÃ£o contÃ©m dados vÃ¡lidos")
         
-        # Calcula dias de ausÃªncia para cada registro
-        dias_ausencia = []
-        for _, row in df_filtered.iterrows():
-            # Ajusta as datas para o perÃ­odo analisado
-            start = max(row['data_inicio'], period_start)
-            end = min(row['data_fim'], period_end)
-            
-            days = self._calculate_business_days(start, end)
-            dias_ausencia.append(days)
+        df_filtered = pd.concat(filtered_parts, ignore_index=True)
+        quality_score = max(0, 100 - null_cells / total_cells * 100)
+        quality = ValidationResult(
+            is_valid=True, errors=[], warnings=[], suggestions=[], quality_score=quality_score
+        ).quality
         
-        df_filtered['dias_ausencia'] = dias_ausencia
+        return self._build_result(
+            df_filtered, removed_rows, quality, name,
+            period_start, period_end, total_employees, setor, uf, municipio
+        )
+    
+    def _filter_period(self, df_processed: pd.DataFrame, period_start: date, period_end: date) -> pd.DataFrame:
+        """Filtra apenas ausÃªncias que se sobrepÃµem ao perÃ­odo analisado."""
+        return df_processed[
+            (df_processed['data_inicio'] <= pd.Timestamp(period_end)) & 
+            (df_processed['data_fim'] >= pd.Timestamp(period_start))
+        ].copy()
+    
+    def _build_result(
+        self,
+        df_filtered: pd.DataFrame,
+        removed_rows: int,
+        quality: DataQuality,
+        name: str,
+        period_start: date,
+        period_end: date,
+        total_employees: int,
+        setor: str,
+        uf: Optional[str],
+        municipio: Optional[str]
+    ) -> AnalysisResult:
+        """Calcula as métricas a partir das ausências já filtradas ao período."""
+        # Calendário de dias úteis da localidade (partilhado via cache LRU)
+        busdaycal = get_business_calendar(period_start.year, period_end.year, uf, municipio)
+        
+        # Calcula dias de ausência para todos os registros de uma só vez
+        df_filtered['dias_ausencia'] = self._calculate_business_days_vectorized(
+            df_filtered['data_inicio'],
+            df_filtered['data_fim'],
+            period_start,
+            period_end,
+            busdaycal
+        )
         
         # Remove ausÃªncias com 0 dias (podem ser fins de semana ou feriados)
         df_filtered = df_filtered[df_filtered['dias_ausencia'] > 0]
         
-        # Calcula mÃ©tricas principais
-        total_dias_uteis = self._calculate_business_days(period_start, period_end)
+        # Agrupa atestados sobrepostos/consecutivos em períodos únicos de ausência
+        spells_df = self._merge_absence_spells(df_filtered, period_start, period_end, busdaycal)
+        
+        # Calcula mÃ©tricas principais (dias sobrepostos contam uma única vez)
+        total_dias_uteis = self._calculate_business_days(period_start, period_end, busdaycal)
         total_dias_possiveis = total_employees * total_dias_uteis
-        total_dias_ausencia = int(df_filtered['dias_ausencia'].sum()) if not df_filtered.empty else 0
+        total_dias_ausencia = int(spells_df['dias_ausencia'].sum()) if not spells_df.empty else 0
         
         # Taxa de absentismo (percentual)
         taxa_absentismo = (total_dias_ausencia / total_dias_possiveis * 100) if total_dias_possiveis > 0 else 0
         
         # Calcula Fator de Bradford
-        bradford_df = self._calculate_bradford_factor(df_filtered)
+        bradford_df = self._calculate_bradford_factor(spells_df)
         fator_bradford_medio = bradford_df['fator_bradford'].mean() if not bradford_df.empty else 0
         
         # Determina nÃ­vel de risco
@@ -288,6 +649,7 @@ class AbsenteeismProcessor:
                 'taxa_absentismo': round(taxa_absentismo, 2),
                 'fator_bradford_medio': round(fator_bradford_medio, 2),
                 'df_bradford': bradford_df,
+                'df_spells': spells_df,
                 'total_dias_ausencia': total_dias_ausencia
             },
             metadata={
@@ -297,14 +659,214 @@ class AbsenteeismProcessor:
                 'benchmark_setor': benchmark,
                 'setor': setor,
                 'registros_processados': len(df_filtered),
+                'periodos_ausencia': len(spells_df),
                 'total_dias_uteis_periodo': total_dias_uteis,
+                'uf': uf,
+                'municipio': municipio,
+                'feriados_periodo': [
+                    (d, nome) for d, nome in list_holidays(period_start.year, period_end.year, uf, municipio).items()
+                    if period_start <= d <= period_end and d.weekday() < 5
+                ],
                 'registros_removidos': removed_rows
             },
-            quality=validation.quality,
+            quality=quality,
             risk_level=risk_level,
             insights=insights
         )
     
+    @staticmethod
+    def build_periods(start: date, end: date, frequency: str = 'mensal') -> List[Tuple[date, date]]:
+        """
+        Gera janelas de calendário consecutivas (meses, trimestres ou anos) entre duas datas.
+        
+        Args:
+            start: Data dentro da primeira janela
+            end: Data dentro da última janela
+            frequency: 'mensal', 'trimestral' ou 'anual'
+        
+        Returns:
+            Lista de tuplas (início, fim) de cada janela
+        """
+        if frequency not in PERIOD_FREQUENCIES:
+            raise ValueError(f"Frequência invÃ¡lida: {frequency}. Use uma de: {', '.join(PERIOD_FREQUENCIES)}")
+        
+        periods = pd.period_range(start, end, freq=PERIOD_FREQUENCIES[frequency])
+        return [(p.start_time.date(), p.end_time.date()) for p in periods]
+    
+    def process_periods(
+        self,
+        df: pd.DataFrame,
+        periods: List[Tuple[date, date]],
+        total_employees: int,
+        column_mapping: Dict[str, str],
+        uf: Optional[str] = None,
+        municipio: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Calcula taxa de absentismo, dias perdidos e Fator de Bradford para várias janelas
+        numa única passagem sobre os dados (ex.: tendência de 24 meses).
+        
+        Os dados são lidos, convertidos e agrupados em períodos de ausência uma só vez;
+        depois cada par (janela, período de ausência) sobreposto é recortado e contado
+        com uma única chamada a np.busday_count.
+        
+        Args:
+            df: DataFrame com os dados brutos
+            periods: Lista de janelas (início, fim); ver build_periods
+            total_employees: Total de colaboradores na organizaÃ§Ã£o
+            column_mapping: Mapeamento das colunas
+            uf: UF para o calendário de feriados estaduais (opcional)
+            municipio: Município para o calendário de feriados municipais (opcional)
+        
+        Returns:
+            DataFrame com uma linha por janela, pronto para gráficos de tendência
+        """
+        validation = self.validate(df, column_mapping)
+        if not validation.is_valid:
+            raise ValueError(f"Dados invÃ¡lidos: {'; '.join(validation.errors)}")
+        
+        if not periods:
+            raise ValueError("Nenhum perÃ­odo informado")
+        
+        # Prepara e agrupa as ausências uma única vez para todo o intervalo
+        df_processed, _ = self._prepare_absences(df, column_mapping)
+        range_start, range_end = self._periods_range(periods)
+        df_range = self._filter_period(df_processed, range_start, range_end)
+        
+        return self._build_periods(df_range, periods, total_employees, uf, municipio)
+    
+    def process_periods_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        periods: List[Tuple[date, date]],
+        total_employees: int,
+        column_mapping: Dict[str, str],
+        uf: Optional[str] = None,
+        municipio: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Equivalente a process_periods a partir de um iterador de blocos (ver
+        FileValidator.read_file_chunked), sem carregar o arquivo inteiro em memória.
+        
+        Cada bloco é convertido e filtrado ao intervalo das janelas assim que é lido;
+        apenas as colunas id_colaborador/data_inicio/data_fim dessas ausências são
+        mantidas até ao agrupamento final em períodos de ausência.
+        
+        Args:
+            chunks: Iterador de DataFrames com os dados brutos
+            (restantes argumentos iguais a process_periods)
+        
+        Returns:
+            DataFrame com uma linha por janela, pronto para gráficos de tendência
+        """
+        if not periods:
+            raise ValueError("Nenhum perÃ­odo informado")
+        
+        range_start, range_end = self._periods_range(periods)
+        range_parts = []
+        
+        for chunk in chunks:
+            if not range_parts:
+                validation = self.validate(chunk, column_mapping)
+                if not validation.is_valid:
+                    raise ValueError(f"Dados invÃ¡lidos: {'; '.join(validation.errors)}")
+            
+            df_processed, _ = self._prepare_absences(chunk, column_mapping)
+            range_parts.append(
+                self._filter_period(df_processed, range_start, range_end)[
+                    ['id_colaborador', 'data_inicio', 'data_fim']
+                ]
+            )
+        
+        if not range_parts:
+            raise ValueError("Dados invÃ¡lidos: O arquivo estÃ¡ vazio ou nÃ£o contÃ©m dados vÃ¡lidos")
+        
+        df_range = pd.concat(range_parts, ignore_index=True)
+        return self._build_periods(df_range, periods, total_employees, uf, municipio)
+    
+    @staticmethod
+    def _periods_range(periods: List[Tuple[date, date]]) -> Tuple[date, date]:
+        """Primeiro e último dia cobertos pelas janelas."""
+        return min(start for start, _ in periods), max(end for _, end in periods)
+    
+    def _build_periods(
+        self,
+        df_range: pd.DataFrame,
+        periods: List[Tuple[date, date]],
+        total_employees: int,
+        uf: Optional[str],
+        municipio: Optional[str]
+    ) -> pd.DataFrame:
+        """Calcula as métricas de cada janela a partir das ausências já filtradas ao intervalo."""
+        window_starts = np.array([np.datetime64(start, 'D') for start, _ in periods])
+        window_ends = np.array([np.datetime64(end, 'D') for _, end in periods])
+        range_start, range_end = self._periods_range(periods)
+        
+        busdaycal = get_business_calendar(range_start.year, range_end.year, uf, municipio)
+        
+        df_range['dias_ausencia'] = self._calculate_business_days_vectorized(
+            df_range['data_inicio'], df_range['data_fim'], range_start, range_end, busdaycal
+        )
+        df_range = df_range[df_range['dias_ausencia'] > 0]
+        spells_df = self._merge_absence_spells(df_range, range_start, range_end, busdaycal)
+        
+        spell_starts = spells_df['data_inicio'].to_numpy(dtype='datetime64[D]')
+        spell_ends = spells_df['data_fim'].to_numpy(dtype='datetime64[D]')
+        
+        # Pares (janela, período de ausência) que se sobrepõem
+        overlaps = (
+            (spell_starts[None, :] <= window_ends[:, None]) & 
+            (spell_ends[None, :] >= window_starts[:, None])
+        )
+        window_idx, spell_idx = np.nonzero(overlaps)
+        
+        pair_days = np.busday_count(
+            np.maximum(spell_starts[spell_idx], window_starts[window_idx]),
+            np.minimum(spell_ends[spell_idx], window_ends[window_idx]) + np.timedelta64(1, 'D'),
+            busdaycal=busdaycal
+        )
+        pairs = pd.DataFrame({
+            'janela': window_idx,
+            'id_colaborador': spells_df['id_colaborador'].to_numpy()[spell_idx],
+            'dias_ausencia': pair_days
+        })
+        pairs = pairs[pairs['dias_ausencia'] > 0]
+        
+        # Bradford por (janela, colaborador) e agregação por janela
+        per_employee = pairs.groupby(['janela', 'id_colaborador']).agg(
+            S=('dias_ausencia', 'size'),
+            D=('dias_ausencia', 'sum')
+        )
+        per_employee['fator_bradford'] = (per_employee['S'] ** 2) * per_employee['D']
+        per_window = per_employee.groupby(level='janela').agg(
+            total_dias_ausencia=('D', 'sum'),
+            periodos_ausencia=('S', 'sum'),
+            colaboradores_ausentes=('S', 'size'),
+            fator_bradford_medio=('fator_bradford', 'mean')
+        ).reindex(range(len(periods)), fill_value=0)
+        
+        dias_uteis = np.busday_count(
+            window_starts, window_ends + np.timedelta64(1, 'D'), busdaycal=busdaycal
+        )
+        dias_possiveis = total_employees * dias_uteis
+        taxa = np.divide(
+            per_window['total_dias_ausencia'].to_numpy() * 100.0,
+            dias_possiveis,
+            out=np.zeros(len(periods)),
+            where=dias_possiveis > 0
+        )
+        
+        return pd.DataFrame({
+            'periodo_inicio': pd.to_datetime(window_starts),
+            'periodo_fim': pd.to_datetime(window_ends),
+            'dias_uteis': dias_uteis,
+            'total_dias_ausencia': per_window['total_dias_ausencia'].to_numpy().astype(int),
+            'taxa_absentismo': np.round(taxa, 2),
+            'fator_bradford_medio': np.round(per_window['fator_bradford_medio'].to_numpy(dtype=float), 2),
+            'colaboradores_ausentes': per_window['colaboradores_ausentes'].to_numpy().astype(int),
+            'periodos_ausencia': per_window['periodos_ausencia'].to_numpy().astype(int)
+        })
+    
     def _calculate_risk_level(self, taxa: float, benchmark: float) -> RiskLevel:
         """Determina o nÃ­vel de risco baseado na comparaÃ§Ã£o com o benchmark."""
         if taxa > benchmark * 1.5:
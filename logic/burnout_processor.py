@@ -2,79 +2,123 @@
 # Responsabilidade: Conter a lógica de negócio para a análise de Esgotamento (CBI).
 
 import numpy as np
+import pandas as pd
 import hashlib
+import re
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 
 # Importa os modelos e enums da nossa nova arquitetura
 from models.analysis import AnalysisResult
 from models.enums import AnalysisType, RiskLevel
+from models.instrument import InstrumentDefinition
+from logic.copsoq_processor import normalize_answer
+
+# Questões do CBI por dimensão (itens invertidos: quanto mais frequente, menor o esgotamento)
+CBI_QUESTIONS = {
+    "Burnout Pessoal": [
+        {"question": "Com que frequência você se sente esgotado(a) física e emocionalmente?", "inverted": False},
+        {"question": "Com que frequência você se sente exausto(a) ao final de um dia de trabalho?", "inverted": False},
+        {"question": "Com que frequência você se sente cansado(a) pela manhã, só de pensar em mais um dia de trabalho?", "inverted": False},
+        {"question": "Você tem energia para sua família e amigos durante seu tempo livre?", "inverted": True},
+        {"question": "Com que frequência você se sente desgastado(a)?", "inverted": False},
+        {"question": "Com que frequência você se sente fraco(a) e suscetível a doenças?", "inverted": False}
+    ],
+    "Burnout Relacionado ao Trabalho": [
+        {"question": "Você se sente esgotado(a) pelo seu trabalho?", "inverted": False},
+        {"question": "Você se sente frustrado(a) com seu trabalho?", "inverted": False},
+        {"question": "O seu trabalho te cansa emocionalmente?", "inverted": False},
+        {"question": "O seu trabalho te cansa fisicamente?", "inverted": False},
+        {"question": "Você acha que está a trabalhar demais?", "inverted": False},
+        {"question": "Você tem pique para trabalhar?", "inverted": True},
+        {"question": "Você duvida que seu trabalho tenha algum significado?", "inverted": False}
+    ],
+    "Burnout Relacionado ao Cliente": [
+        {"question": "Você acha desgastante trabalhar com clientes?", "inverted": False},
+        {"question": "Você se sente farto(a) de trabalhar com clientes?", "inverted": False},
+        {"question": "Você se pergunta por quanto tempo ainda conseguirá trabalhar com clientes?", "inverted": False},
+        {"question": "Você acha que dá mais do que recebe ao trabalhar com clientes?", "inverted": False},
+        {"question": "Você se sente esgotado(a) por ter que se relacionar com clientes no seu trabalho?", "inverted": False},
+        {"question": "Você tem energia para trabalhar com clientes?", "inverted": True}
+    ]
+}
+
+# Pontuação 0-100 de cada opção (os itens invertidos pontuam 100 - valor)
+CBI_RESPONSE_OPTIONS = {
+    "Sempre / Quase Sempre": 100,
+    "Frequentemente": 75,
+    "Às vezes": 50,
+    "Raramente": 25,
+    "Nunca / Quase Nunca": 0
+}
+
+
+def cbi_item_key(dimension: str, question: str) -> str:
+    """Chave da resposta a uma questão do CBI (a mesma usada no formulário)."""
+    q_hash = hashlib.md5(question.encode()).hexdigest()[:8]
+    return f"cbi_{dimension.replace(' ', '')}_{q_hash}"
+
+
+# Definição declarativa e núcleo de pontuação compilado (as chaves são calculadas uma única vez)
+CBI_DEFINITION = InstrumentDefinition.from_dimensions(
+    "CBI",
+    {
+        dimension: [(cbi_item_key(dimension, item['question']), item['inverted']) for item in items]
+        for dimension, items in CBI_QUESTIONS.items()
+    },
+    scale_min=0,
+    scale_max=100,
+    responses=CBI_RESPONSE_OPTIONS
+)
+CBI_KERNEL = CBI_DEFINITION.compile()
+
+# Colunas acrescentadas aos resultados por respondente
+OVERALL_COLUMN = "Pontuação Geral"
+RISK_COLUMN = "Nível de Risco"
+
+
+def _canonical_text(text) -> str:
+    """Texto normalizado para comparação (minúsculas, sem acentos, espaços uniformes)."""
+    return re.sub(r'\s*/\s*', '/', ' '.join(normalize_answer(text).split()))
+
+
+# Variantes de escrita das opções usadas por ferramentas de formulário externas
+CBI_LABEL_ALIASES = {_canonical_text(label): label for label in CBI_RESPONSE_OPTIONS}
+CBI_LABEL_ALIASES.update({
+    "sempre": "Sempre / Quase Sempre",
+    "quase sempre": "Sempre / Quase Sempre",
+    "quase sempre/sempre": "Sempre / Quase Sempre",
+    "as vezes": "Às vezes",
+    "nunca": "Nunca / Quase Nunca",
+    "quase nunca": "Nunca / Quase Nunca",
+    "quase nunca/nunca": "Nunca / Quase Nunca",
+})
+
+# Cabeçalhos aceites para cada item: chave do formulário, texto da questão ou Q1..Q19
+CBI_COLUMN_ALIASES = {}
+for _position, _item in enumerate(CBI_DEFINITION.items, start=1):
+    CBI_COLUMN_ALIASES[_canonical_text(_item.key)] = _item.key
+    CBI_COLUMN_ALIASES[f"q{_position}"] = _item.key
+for _dimension, _items in CBI_QUESTIONS.items():
+    for _item in _items:
+        CBI_COLUMN_ALIASES[_canonical_text(_item['question'])] = cbi_item_key(_dimension, _item['question'])
+
+
+def _canonical_answer(value) -> Optional[str]:
+    """Opção do CBI correspondente a uma resposta exportada (None se não reconhecida)."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return CBI_LABEL_ALIASES.get(_canonical_text(value))
+
 
 class BurnoutProcessor:
     """Processa os dados do questionário de Esgotamento (CBI)."""
 
     def process(self, name: str, responses: Dict) -> AnalysisResult:
         """Calcula os scores de burnout a partir das respostas do formulário."""
-        # CORREÇÃO: Usar constantes locais
-        cbi_questions = {
-            "Burnout Pessoal": [
-                {"question": "Com que frequência você se sente esgotado(a) física e emocionalmente?", "inverted": False},
-                {"question": "Com que frequência você se sente exausto(a) ao final de um dia de trabalho?", "inverted": False},
-                {"question": "Com que frequência você se sente cansado(a) pela manhã, só de pensar em mais um dia de trabalho?", "inverted": False},
-                {"question": "Você tem energia para sua família e amigos durante seu tempo livre?", "inverted": True},
-                {"question": "Com que frequência você se sente desgastado(a)?", "inverted": False},
-                {"question": "Com que frequência você se sente fraco(a) e suscetível a doenças?", "inverted": False}
-            ],
-            "Burnout Relacionado ao Trabalho": [
-                {"question": "Você se sente esgotado(a) pelo seu trabalho?", "inverted": False},
-                {"question": "Você se sente frustrado(a) com seu trabalho?", "inverted": False},
-                {"question": "O seu trabalho te cansa emocionalmente?", "inverted": False},
-                {"question": "O seu trabalho te cansa fisicamente?", "inverted": False},
-                {"question": "Você acha que está a trabalhar demais?", "inverted": False},
-                {"question": "Você tem pique para trabalhar?", "inverted": True},
-                {"question": "Você duvida que seu trabalho tenha algum significado?", "inverted": False}
-            ],
-            "Burnout Relacionado ao Cliente": [
-                {"question": "Você acha desgastante trabalhar com clientes?", "inverted": False},
-                {"question": "Você se sente farto(a) de trabalhar com clientes?", "inverted": False},
-                {"question": "Você se pergunta por quanto tempo ainda conseguirá trabalhar com clientes?", "inverted": False},
-                {"question": "Você acha que dá mais do que recebe ao trabalhar com clientes?", "inverted": False},
-                {"question": "Você se sente esgotado(a) por ter que se relacionar com clientes no seu trabalho?", "inverted": False},
-                {"question": "Você tem energia para trabalhar com clientes?", "inverted": True}
-            ]
-        }
-
-        cbi_response_options = {
-            "Sempre / Quase Sempre": 100, 
-            "Frequentemente": 75, 
-            "Às vezes": 50, 
-            "Raramente": 25, 
-            "Nunca / Quase Nunca": 0
-        }
-
-        cbi_inverted_options = {
-            "Sempre / Quase Sempre": 0, 
-            "Frequentemente": 25, 
-            "Às vezes": 50, 
-            "Raramente": 75, 
-            "Nunca / Quase Nunca": 100
-        }
-
-        scores = {}
-        for dimension, questions_data in cbi_questions.items():
-            dim_scores = []
-            for item in questions_data:
-                q_hash = hashlib.md5(item['question'].encode()).hexdigest()[:8]
-                key = f"cbi_{dimension.replace(' ', '')}_{q_hash}"
-                
-                if key in responses:  # CORREÇÃO: Verificar se a chave existe
-                    # Seleciona o mapa de pontuação correto (normal ou invertido)
-                    score_map = cbi_inverted_options if item['inverted'] else cbi_response_options
-                    dim_scores.append(score_map[responses[key]])
-            
-            if dim_scores:  # CORREÇÃO: Evitar divisão por zero
-                scores[dimension] = np.mean(dim_scores)
-        
+        # Média das respostas de cada dimensão (apenas dimensões com respostas)
+        scores = CBI_KERNEL.score_one(responses)
+
         if scores:  # CORREÇÃO: Verificar se há scores calculados
             overall = np.mean(list(scores.values()))
             risk = self._calculate_risk_level(overall)
@@ -92,6 +136,112 @@ class BurnoutProcessor:
             risk_level=risk
         )
 
+    def resolve_columns(self, columns) -> Dict[str, str]:
+        """
+        Associa cada item do CBI a uma coluna do arquivo exportado.
+
+        Args:
+            columns: Cabeçalhos do arquivo (chave do formulário, texto da questão ou Q1..Q19)
+
+        Returns:
+            Dicionário {chave do item: coluna}, apenas para os itens encontrados
+        """
+        resolved = {}
+        for column in columns:
+            key = CBI_COLUMN_ALIASES.get(_canonical_text(column))
+            if key is not None and key not in resolved:
+                resolved[key] = column
+        return resolved
+
+    def _encode(self, data: pd.DataFrame):
+        """Matriz bruta (respondentes x itens) e colunas usadas de um arquivo exportado."""
+        columns = self.resolve_columns(data.columns)
+        if not columns:
+            raise ValueError(
+                "Nenhuma coluna do CBI encontrada. Use como cabeçalho o texto das questões ou Q1..Q19."
+            )
+        return CBI_KERNEL.encode_frame(data, columns, _canonical_answer), columns
+
+    def _respondent_frame(self, raw: np.ndarray, index: pd.Index) -> pd.DataFrame:
+        """Scores por dimensão, pontuação geral e nível de risco de cada respondente."""
+        scores = pd.DataFrame(CBI_KERNEL.score_matrix(raw), index=index, columns=list(CBI_KERNEL.dimensions))
+
+        values = scores.to_numpy()
+        answered = (~np.isnan(values)).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            overall = np.where(answered > 0, np.nansum(values, axis=1) / answered, np.nan)
+
+        scores[OVERALL_COLUMN] = overall
+        scores[RISK_COLUMN] = np.select(
+            [overall >= 75, overall >= 50, overall < 50],
+            [RiskLevel.HIGH.label, RiskLevel.MODERATE.label, RiskLevel.LOW.label],
+            default="N/A"
+        )
+        return scores
+
+    def score_respondents(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Pontua de uma vez todos os respondentes de um arquivo exportado.
+
+        Cada coluna é convertida por consulta vetorizada: só os valores distintos passam
+        pela normalização de texto e pela tabela de opções.
+
+        Args:
+            data: DataFrame com uma linha por respondente
+
+        Returns:
+            DataFrame com o índice de data, uma coluna por dimensão (0-100, NaN sem respostas),
+            a pontuação geral (média das dimensões) e o nível de risco
+        """
+        raw, _ = self._encode(data)
+        return self._respondent_frame(raw, data.index)
+
+    def process_batch(self, name: str, data: pd.DataFrame) -> AnalysisResult:
+        """
+        Pontua um arquivo exportado (ex.: CSV de uma ferramenta de formulários) e agrega os resultados.
+
+        Args:
+            name: Nome da análise
+            data: DataFrame com uma linha por respondente
+
+        Returns:
+            AnalysisResult com a média de cada dimensão; os resultados por respondente
+            ficam disponíveis em score_respondents
+        """
+        raw, columns = self._encode(data)
+        respondents = self._respondent_frame(raw, data.index)
+        answered = respondents[respondents[OVERALL_COLUMN].notna()]
+        if answered.empty:
+            raise ValueError("Nenhum respondente com respostas reconhecidas.")
+
+        dimensions = [dim for dim in CBI_KERNEL.dimensions if answered[dim].notna().any()]
+        scores = {dim: float(answered[dim].mean()) for dim in dimensions}
+        overall = float(np.mean(list(scores.values())))
+
+        # Respostas preenchidas que não correspondem a nenhuma opção do CBI
+        positions = [CBI_KERNEL.key_index[key] for key in columns]
+        filled = data[list(columns.values())].notna().to_numpy()
+        unrecognised = int((filled & np.isnan(raw[:, positions])).sum())
+
+        return AnalysisResult(
+            id=hashlib.md5(f"cbi_{datetime.now()}".encode()).hexdigest()[:8],
+            type=AnalysisType.BURNOUT_CBI,
+            name=name,
+            timestamp=datetime.now(),
+            data=scores,
+            metadata={
+                'overall_score': overall,
+                'n_respondents': len(answered),
+                'desvios_padrao': {dim: float(answered[dim].std()) for dim in dimensions},
+                'distribuicao_risco': {
+                    level: int(count) for level, count in answered[RISK_COLUMN].value_counts().items()
+                },
+                'itens_em_falta': len(CBI_KERNEL.keys) - len(columns),
+                'respostas_nao_reconhecidas': unrecognised
+            },
+            risk_level=self._calculate_risk_level(overall)
+        )
+
     def _calculate_risk_level(self, overall_score: float) -> RiskLevel:
         """Determina o nível de risco com base na pontuação geral."""
         # CORREÇÃO: Retornar apenas o enum, não tuplas
@@ -0,0 +1,138 @@
+# logic/business_calendar.py
+# Responsabilidade: Construir calendários de dias úteis com feriados nacionais, estaduais e municipais.
+
+import unicodedata
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+
+from config.feriados import (
+    FERIADOS_NACIONAIS_FIXOS,
+    FERIADOS_NACIONAIS_FIXOS_DESDE,
+    FERIADOS_NACIONAIS_MOVEIS,
+    FERIADOS_ESTADUAIS,
+    FERIADOS_ESTADUAIS_DESDE,
+    FERIADOS_MUNICIPAIS,
+    FERIADOS_MUNICIPAIS_DESDE
+)
+
+
+def _normalize_municipio(municipio: Optional[str]) -> Optional[str]:
+    """Normaliza o nome do município (minúsculas, sem acentos) para consulta na tabela."""
+    if not municipio or not str(municipio).strip():
+        return None
+    text = unicodedata.normalize('NFD', str(municipio).strip().lower())
+    return ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+
+
+def _normalize_uf(uf: Optional[str]) -> Optional[str]:
+    """Normaliza a sigla da UF; siglas desconhecidas são ignoradas."""
+    if not uf or not str(uf).strip():
+        return None
+    uf = str(uf).strip().upper()
+    return uf if uf in FERIADOS_ESTADUAIS else None
+
+
+def calculate_easter(year: int) -> date:
+    """Calcula o Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def list_holidays(
+    year_start: int,
+    year_end: int,
+    uf: Optional[str] = None,
+    municipio: Optional[str] = None
+) -> Dict[date, str]:
+    """
+    Lista os feriados aplicáveis a uma localidade num intervalo de anos.
+
+    Args:
+        year_start: Primeiro ano (inclusive)
+        year_end: Último ano (inclusive)
+        uf: Sigla da UF (opcional)
+        municipio: Nome do município (opcional, requer UF)
+
+    Returns:
+        Dicionário {data: nome do feriado} ordenado por data
+    """
+    uf = _normalize_uf(uf)
+    municipio = _normalize_municipio(municipio)
+
+    fixed = dict(FERIADOS_NACIONAIS_FIXOS)
+    fixed_since = [FERIADOS_NACIONAIS_FIXOS_DESDE]
+    if uf:
+        fixed.update(FERIADOS_ESTADUAIS.get(uf, {}))
+        fixed_since.append(FERIADOS_ESTADUAIS_DESDE.get(uf, {}))
+        if municipio:
+            fixed.update(FERIADOS_MUNICIPAIS.get((uf, municipio), {}))
+            fixed_since.append(FERIADOS_MUNICIPAIS_DESDE.get((uf, municipio), {}))
+
+    holidays = {}
+    for year in range(year_start, year_end + 1):
+        for (month, day), nome in fixed.items():
+            holidays.setdefault(date(year, month, day), nome)
+        for table in fixed_since:
+            for (month, day), (first_year, nome) in table.items():
+                if year >= first_year:
+                    holidays.setdefault(date(year, month, day), nome)
+
+        easter = calculate_easter(year)
+        for offset, nome in FERIADOS_NACIONAIS_MOVEIS.items():
+            holidays.setdefault(easter + timedelta(days=offset), nome)
+
+    return dict(sorted(holidays.items()))
+
+
+@lru_cache(maxsize=64)
+def _build_business_calendar(
+    uf: Optional[str],
+    municipio: Optional[str],
+    year_start: int,
+    year_end: int
+) -> np.busdaycalendar:
+    """Constrói o np.busdaycalendar (chamado apenas em caso de falha da cache)."""
+    holidays = list_holidays(year_start, year_end, uf, municipio)
+    return np.busdaycalendar(
+        weekmask='1111100',
+        holidays=np.array(list(holidays.keys()), dtype='datetime64[D]')
+    )
+
+
+def get_business_calendar(
+    year_start: int,
+    year_end: int,
+    uf: Optional[str] = None,
+    municipio: Optional[str] = None
+) -> np.busdaycalendar:
+    """
+    Retorna o calendário de dias úteis (segunda a sexta, sem feriados) para uma localidade.
+
+    O calendário é construído uma única vez por (UF, município, intervalo de anos)
+    e mantido numa cache LRU partilhada por todos os módulos.
+
+    Args:
+        year_start: Primeiro ano coberto pelo calendário
+        year_end: Último ano coberto pelo calendário
+        uf: Sigla da UF (opcional)
+        municipio: Nome do município (opcional, requer UF)
+
+    Returns:
+        np.busdaycalendar pronto a usar em np.busday_count
+    """
+    uf = _normalize_uf(uf)
+    municipio = _normalize_municipio(municipio) if uf else None
+    return _build_business_calendar(uf, municipio, year_start, year_end)
+
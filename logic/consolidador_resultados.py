@@ -87,7 +87,7 @@ class ConsolidadorResultados:
         Adiciona resultados do DUWAS (Workaholism)
         
         Args:
-            resultados_duwas: Dicionário com resultados DUWAS
+            resultados_duwas: Dicionário com resultados DUWAS (ex.: WorkaholismProcessor.consolidator_summary)
         """
         if not resultados_duwas:
             return
@@ -96,7 +96,10 @@ class ConsolidadorResultados:
             'ferramenta': 'DUWAS - Workaholism',
             'num_respondentes': resultados_duwas.get('num_respondentes', 0),
             'score_medio': resultados_duwas.get('score_medio', 0),
-            'nivel_risco': resultados_duwas.get('nivel_risco', 'Baixo')
+            'nivel_risco': resultados_duwas.get('nivel_risco', 'Baixo'),
+            # Resumo em lote (WorkaholismProcessor.consolidator_summary)
+            'quadrantes': resultados_duwas.get('quadrantes', {}),
+            'grupos': resultados_duwas.get('grupos', [])
         }
         
         # Se detectou workaholism, adicionar aos riscos
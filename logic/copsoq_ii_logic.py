@@ -13,6 +13,7 @@ if root_dir not in sys.path:
 # --- FIM DA CORREÇÃO ---
 
 from models.copsoq_ii_model import CopsoqII
+from models.instrument import InstrumentDefinition, normalize_item_scores
 
 # --- CONSTANTES DE PONTUAÇÃO ---
 
@@ -97,25 +98,37 @@ DIMENSOES_MAP = {
 }
 
 
+# O núcleo compilado usa uma única escala para todos os itens: vem de DIMENSOES_MAP
+_ESCALAS = {(min_escala, max_escala) for questoes in DIMENSOES_MAP.values()
+            for _, _, min_escala, max_escala in questoes}
+if len(_ESCALAS) != 1:
+    raise ValueError(f"DIMENSOES_MAP tem escalas diferentes entre questões: {sorted(_ESCALAS)}")
+(ESCALA_MIN, ESCALA_MAX), = _ESCALAS
+
+# Definição declarativa e núcleo de pontuação compilado (uma vez por processo)
+COPSOQ_II_DEFINITION = InstrumentDefinition.from_dimensions(
+    "COPSOQ II",
+    {dimensao: [(q_id, reverter) for q_id, reverter, _, _ in questoes]
+     for dimensao, questoes in DIMENSOES_MAP.items()},
+    scale_min=ESCALA_MIN,
+    scale_max=ESCALA_MAX
+)
+COPSOQ_II_KERNEL = COPSOQ_II_DEFINITION.compile()
+
+
 def normalizar_pontuacao(valor: int, min_escala: int, max_escala: int, reverter: bool = False) -> float:
     """
     Normaliza uma pontuação da escala Likert (1-5) para uma escala de risco (0-100).
     0 = Risco Mínimo (Melhor)
     100 = Risco Máximo (Pior)
+
+    Reverter=True: 5 é 'bom' e 1 é 'ruim' (ex: Influência) -> (5 - valor) / (5 - 1) * 100
+    Reverter=False: 5 é 'ruim' e 1 é 'bom' (ex: Carga de Trabalho) -> (valor - 1) / (5 - 1) * 100
     """
     if valor is None:
         return None
 
-    if reverter:
-        # Se 5 é 'bom' e 1 é 'ruim' (ex: Influência)
-        # (5 - valor) / (5 - 1) * 100
-        pontuacao = ((max_escala - valor) / (max_escala - min_escala)) * 100
-    else:
-        # Se 5 é 'ruim' e 1 é 'bom' (ex: Carga de Trabalho)
-        # (valor - 1) / (5 - 1) * 100
-        pontuacao = ((valor - min_escala) / (max_escala - min_escala)) * 100
-    
-    return round(pontuacao)
+    return round(float(normalize_item_scores(valor, reverter, min_escala, max_escala)))
 
 def get_cor_risco(pontuacao: float) -> str:
     """
@@ -139,21 +152,14 @@ def calcular_pontuacao_copsoq_ii(respostas: CopsoqII) -> pd.DataFrame:
     resultados = []
     respostas_dict = respostas.model_dump()
 
-    for dimensao, questoes in DIMENSOES_MAP.items():
-        pontuacoes_norm = []
-        for q_id, reverter, min_escala, max_escala in questoes:
-            valor_bruto = respostas_dict.get(q_id)
-            if valor_bruto is not None:
-                pontuacoes_norm.append(
-                    normalizar_pontuacao(valor_bruto, min_escala, max_escala, reverter)
-                )
-        
-        # Calcula a pontuação final da dimensão (média das questões)
-        if pontuacoes_norm:
-            pontuacao_final = round(sum(pontuacoes_norm) / len(pontuacoes_norm))
-        else:
-            pontuacao_final = None
-            
+    pontuacoes = COPSOQ_II_KERNEL.score_one(respostas_dict)
+
+    for dimensao in COPSOQ_II_KERNEL.dimensions:
+        # Pontuação final da dimensão: média das questões respondidas
+        pontuacao_final = pontuacoes.get(dimensao)
+        if pontuacao_final is not None:
+            pontuacao_final = round(pontuacao_final)
+
         resultados.append({
             "Dimensão": dimensao,
             "Pontuação (0-100)": pontuacao_final,
@@ -167,4 +173,17 @@ def calcular_pontuacao_copsoq_ii(respostas: CopsoqII) -> pd.DataFrame:
         "Nível de Risco": "N/A" # Não se aplica semáforo aqui
     })
 
-    return pd.DataFrame(resultados)
\ No newline at end of file
+    return pd.DataFrame(resultados)
+
+
+def calcular_pontuacoes_copsoq_ii_lote(df_respostas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pontua de uma vez um conjunto de respondentes do COPSOQ II.
+
+    Args:
+        df_respostas: DataFrame com uma linha por respondente e as colunas q1..q41 (valores 1-5)
+
+    Returns:
+        DataFrame (respondentes x dimensões) com as pontuações 0-100 (NaN sem respostas)
+    """
+    return COPSOQ_II_KERNEL.score_frame(df_respostas).round()
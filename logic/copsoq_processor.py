@@ -1,4 +1,4 @@
-# logic/copsoq_processor.py
+﻿# logic/copsoq_processor.py
 # Responsabilidade: Conter toda a lógica de negócio para processar e validar dados do COPSOQ.
 # Versão: Atualizada com suporte flexível a prefixos (P, Q, Resp_Q) e limpeza de dados.
 
@@ -6,11 +6,115 @@ import pandas as pd
 import numpy as np
 import hashlib
 import unicodedata
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
 
 # Importa os modelos de dados
 from models.analysis import AnalysisResult, ValidationResult
 from models.enums import AnalysisType, RiskLevel, DataQuality
+from models.instrument import dimension_means, normalize_item_scores
+from logic.copsoq_statistics import cronbach_alpha, bootstrap_ci
+
+# Tamanho mínimo de um grupo nos resultados segmentados (anonimato)
+MIN_GROUP_SIZE = 5
+
+# Limites dos tercis do semáforo COPSOQ (escala 0-100)
+TERTILE_LIMITS = (100 / 3, 200 / 3)
+
+# Quantil da normal para intervalos de confiança a 95%
+Z_95 = 1.959964
+
+
+@lru_cache(maxsize=4096)
+def normalize_answer(text) -> str:
+    """
+    Normaliza uma resposta textual (minúsculas, sem espaços nas pontas nem acentos).
+    
+    Um questionário tem poucas respostas distintas, pelo que o resultado fica em cache
+    e é partilhado por todas as colunas e uploads.
+    """
+    if not isinstance(text, str): return str(text).lower().strip()
+    return ''.join(c for c in unicodedata.normalize('NFD', text.strip().lower()) if unicodedata.category(c) != 'Mn')
+
+
+@dataclass(frozen=True)
+class CompiledLayout:
+    """Layout do questionário resolvido para um conjunto de colunas concreto."""
+    prefix: str
+    scale_names: Tuple[str, ...]
+    items: Tuple[str, ...]         # Itens presentes no arquivo, pela ordem das escalas
+    positions: np.ndarray          # Posição de cada item em data.columns
+    inverted: np.ndarray           # Máscara (bool) dos itens invertidos
+    membership: np.ndarray         # Pertença itens x escalas (0/1)
+    scale_index: Dict[str, np.ndarray]  # Escala -> índices em items
+    coverage: float                # % de escalas com pelo menos um item no arquivo
+
+
+@lru_cache(maxsize=32)
+def compile_layout(
+    scale_map: Tuple[Tuple[str, Tuple[int, ...]], ...],
+    inverted_idx: Tuple[int, ...],
+    prefix: str,
+    columns: Tuple[str, ...]
+) -> CompiledLayout:
+    """
+    Resolve as escalas para posições de colunas, uma única vez por
+    (versão, prefixo, conjunto de colunas).
+    
+    Args:
+        scale_map: Pares (escala, números das perguntas)
+        inverted_idx: Números das perguntas invertidas
+        prefix: Prefixo das colunas de perguntas (P, Q ou Resp_Q)
+        columns: Colunas do arquivo
+    
+    Returns:
+        CompiledLayout (partilhado entre chamadas; os arrays são só de leitura)
+    """
+    column_position = {}
+    for position, column in enumerate(columns):
+        column_position.setdefault(column, position)
+    
+    scale_names = tuple(scale for scale, _ in scale_map)
+    inverted_names = {f"{prefix}{i}" for i in inverted_idx}
+    
+    items, item_index, scale_index = [], {}, {}
+    for scale, idx in scale_map:
+        indices = []
+        for i in idx:
+            item = f"{prefix}{i}"
+            if item not in column_position:
+                continue
+            if item not in item_index:
+                item_index[item] = len(items)
+                items.append(item)
+            indices.append(item_index[item])
+        scale_index[scale] = np.array(indices, dtype=np.intp)
+    
+    membership = np.zeros((len(items), len(scale_names)))
+    for j, scale in enumerate(scale_names):
+        membership[scale_index[scale], j] = 1.0
+    
+    positions = np.array([column_position[item] for item in items], dtype=np.intp)
+    inverted = np.array([item in inverted_names for item in items], dtype=bool)
+    for array in (positions, inverted, membership, *scale_index.values()):
+        array.setflags(write=False)
+    
+    covered = sum(1 for indices in scale_index.values() if len(indices))
+    coverage = covered / len(scale_names) * 100 if scale_names else 0
+    
+    return CompiledLayout(
+        prefix=prefix,
+        scale_names=scale_names,
+        items=tuple(items),
+        positions=positions,
+        inverted=inverted,
+        membership=membership,
+        scale_index=scale_index,
+        coverage=coverage
+    )
 
 class COPSOQProcessor:
     """Processa e analisa dados do questionário COPSOQ com alta tolerância a formatos de entrada."""
@@ -72,16 +176,49 @@ class COPSOQProcessor:
             self.inverted_idx = []
             self.positive_scales = ["Influência"]
         
+        self.scale_names = list(self.scale_map)
+        # Forma imutável (e hashable) do mapa de escalas, usada como chave de compile_layout
+        self._scale_key = tuple((scale, tuple(idx)) for scale, idx in self.scale_map.items())
+        self._inverted_key = tuple(self.inverted_idx)
+        self.layout = None
+        
         self.text_to_score = {
             "nunca": 1, "raramente": 2, "às vezes": 3, "frequentemente": 4, "sempre": 5,
             "nada": 1, "um pouco": 2, "moderadamente": 3, "muito": 4, "extremamente": 5,
             "discordo totalmente": 1, "discordo parcialmente": 2, "neutro": 3, 
             "concordo parcialmente": 4, "concordo totalmente": 5
         }
+        # Vocabulário com as mesmas regras de _normalize_text (ex.: "às vezes" -> "as vezes")
+        self._text_scores = {self._normalize_text(k): v for k, v in self.text_to_score.items()}
+        # Resposta original -> score (0 = não mapeada), reutilizado entre colunas e chamadas
+        self._answer_scores: Dict[object, int] = {}
+        # Variantes não mapeadas encontradas no último processamento (resposta -> ocorrências)
+        self.unmapped_answers: Counter = Counter()
 
     def _normalize_text(self, text: str) -> str:
-        if not isinstance(text, str): return str(text).lower().strip()
-        return ''.join(c for c in unicodedata.normalize('NFD', text.strip().lower()) if unicodedata.category(c) != 'Mn')
+        return normalize_answer(text)
+
+    def _score_answer(self, value) -> int:
+        """Score (1-5) de uma resposta textual, ou 0 se não constar de text_to_score."""
+        score = self._answer_scores.get(value)
+        if score is None:
+            score = self._text_scores.get(self._normalize_text(value), 0)
+            self._answer_scores[value] = score
+        return score
+
+    def unmapped_report(self) -> pd.DataFrame:
+        """
+        Relatório das respostas textuais que não constam de text_to_score no último
+        processamento (contam como resposta em falta). Útil para completar o vocabulário.
+        
+        Returns:
+            DataFrame com as colunas resposta, normalizada e ocorrencias
+        """
+        rows = [
+            {'resposta': value, 'normalizada': self._normalize_text(value), 'ocorrencias': count}
+            for value, count in self.unmapped_answers.most_common()
+        ]
+        return pd.DataFrame(rows, columns=['resposta', 'normalizada', 'ocorrencias'])
 
     def _get_question_cols(self, columns):
         """Detecta colunas que seguem os padrões conhecidos (P1, Q1, Resp_Q1)."""
@@ -116,12 +253,8 @@ class COPSOQProcessor:
         if len(p_cols) < 10:
             errors.append(f"Poucas colunas de perguntas ({len(p_cols)}) detectadas.")
             
-        # Detecta o prefixo utilizado (Resp_Q ou P) para montar as escalas
-        prefix = "Resp_Q" if any(str(c).startswith("Resp_Q") for c in data.columns) else "P"
-        self.scales = {s: [f"{prefix}{i}" for i in idx] for s, idx in self.scale_map.items()}
-        self.inverted_items = [f"{prefix}{i}" for i in self.inverted_idx]
-        
-        coverage = sum(1 for _, items in self.scales.items() if any(item in data.columns for item in items)) / len(self.scales) * 100 if self.scales else 0
+        self.layout = self.layout_for(data.columns)
+        coverage = self.layout.coverage
         
         if coverage < 30:
             errors.append(f"Cobertura de escalas crítica ({coverage:.1f}%). Verifique os nomes das colunas.")
@@ -146,23 +279,291 @@ class COPSOQProcessor:
             raise ValueError(f"Falha na validação: {', '.join(validation.errors)}")
 
         fmt = self._detect_format(data)
-        results = {}
-        for scale, items in self.scales.items():
-            vals = []
-            for item in items:
-                if item in data.columns:
-                    # Converte para numérico (0-5)
-                    num = pd.to_numeric(data[item], errors='coerce') if fmt == "numeric" else data[item].apply(self._normalize_text).map(self.text_to_score)
-                    
-                    if item in self.inverted_items: 
-                        num = 6 - num # Inverte a lógica (5 vira 1, 1 vira 5)
-                    
-                    # Normaliza para escala 0-100
-                    vals.extend(((num - 1) * 25).dropna().tolist())
+        self.unmapped_answers = Counter()
+        sums = self._scale_sums(data, fmt)
+        results = {scale: total / count for scale, (total, count) in sums.items() if count > 0}
+        
+        return self.build_result(name, results, len(data), validation.quality_score)
+
+    def process_chunks(self, chunks: Iterable[pd.DataFrame], name: str) -> AnalysisResult:
+        """
+        Processa as respostas a partir de um iterador de blocos (ver FileValidator.read_file_chunked).
+        
+        Cada bloco contribui apenas com somas e contagens por escala, pelo que a memória
+        usada não depende do tamanho do arquivo.
+        """
+        totals: Dict[str, Tuple[float, int]] = {}
+        n_responses = 0
+        null_cells = 0
+        total_cells = 0
+        fmt = None
+        self.unmapped_answers = Counter()
+        
+        for chunk in chunks:
+            chunk.columns = [str(c).strip() for c in chunk.columns]
+            
+            # O primeiro bloco define o layout (prefixo, escalas) e o formato das respostas
+            if fmt is None:
+                validation = self.validate(chunk)
+                if not validation.is_valid:
+                    raise ValueError(f"Falha na validação: {', '.join(validation.errors)}")
+                fmt = self._detect_format(chunk)
+            
+            for scale, (total, count) in self._scale_sums(chunk, fmt).items():
+                prev_total, prev_count = totals.get(scale, (0.0, 0))
+                totals[scale] = (prev_total + total, prev_count + count)
             
-            if vals:
-                results[scale] = np.mean(vals)
+            n_responses += len(chunk)
+            null_cells += int(chunk.isnull().sum().sum())
+            total_cells += chunk.size
+        
+        if fmt is None:
+            raise ValueError("Falha na validação: arquivo sem respostas")
+        
+        results = {scale: total / count for scale, (total, count) in totals.items() if count > 0}
+        quality_score = max(0, 100 - null_cells / total_cells * 100 - (100 - self.layout.coverage) / 2)
+        
+        return self.build_result(name, results, n_responses, quality_score)
+
+    def _scale_sums(self, data: pd.DataFrame, fmt: str) -> Dict[str, Tuple[float, int]]:
+        """Soma e contagem dos itens (escala 0-100) por escala, para agregação por médias."""
+        scores, layout = self._score_matrix(data, fmt)
+        if not layout.items:
+            return {}
+        
+        valid = ~np.isnan(scores)
+        
+        # Uma única redução matricial: (respostas x itens) @ (itens x escalas)
+        totals = np.where(valid, scores, 0.0).sum(axis=0) @ layout.membership
+        counts = valid.sum(axis=0) @ layout.membership
+        
+        return {
+            scale: (float(totals[j]), int(counts[j]))
+            for j, scale in enumerate(layout.scale_names) if counts[j]
+        }
+
+    def score_respondents(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula o score (0-100) de cada respondente em cada escala.
+        
+        Args:
+            data: DataFrame com as respostas brutas (uma linha por respondente)
         
+        Returns:
+            DataFrame (respondentes x escalas) com o mesmo índice de data; NaN quando o
+            respondente não respondeu a nenhum item da escala
+        """
+        data.columns = [str(c).strip() for c in data.columns]
+        self.validate(data)
+        self.unmapped_answers = Counter()
+        
+        scores, layout = self.score_items(data)
+        means = dimension_means(scores, layout.membership)
+        
+        answered = ~np.isnan(means).all(axis=0)
+        return pd.DataFrame(
+            means[:, answered],
+            index=data.index,
+            columns=[scale for scale, keep in zip(layout.scale_names, answered) if keep]
+        )
+
+    def reliability(
+        self,
+        data: pd.DataFrame,
+        n_resamples: int = 1000,
+        confidence: float = 0.95,
+        n_jobs: int = 1,
+        seed: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Fiabilidade (alfa de Cronbach) e intervalo de confiança bootstrap de cada escala.
+        
+        Args:
+            data: DataFrame com as respostas brutas
+            n_resamples: Número de reamostragens bootstrap
+            confidence: Nível de confiança do intervalo
+            n_jobs: Processos usados no bootstrap (as escalas são repartidas entre eles)
+            seed: Semente para resultados reprodutíveis
+        
+        Returns:
+            DataFrame com as colunas escala, n_itens, n, alfa, media, ic_inferior e
+            ic_superior (média e IC sobre os scores por respondente)
+        """
+        data.columns = [str(c).strip() for c in data.columns]
+        self.validate(data)
+        self.unmapped_answers = Counter()
+        
+        item_scores, layout = self.score_items(data)
+        respondent_scores = dimension_means(item_scores, layout.membership)
+        
+        answered = np.flatnonzero(~np.isnan(respondent_scores).all(axis=0)).tolist()
+        respondent_scores = respondent_scores[:, answered]
+        lower, upper = bootstrap_ci(respondent_scores, n_resamples, confidence, seed, n_jobs)
+        
+        rows = []
+        for k, j in enumerate(answered):
+            scale = layout.scale_names[j]
+            indices = layout.scale_index[scale]
+            rows.append({
+                'escala': scale,
+                'n_itens': len(indices),
+                'n': int((~np.isnan(respondent_scores[:, k])).sum()),
+                'alfa': cronbach_alpha(item_scores[:, indices]),
+                'media': float(np.nanmean(respondent_scores[:, k])),
+                'ic_inferior': float(lower[k]),
+                'ic_superior': float(upper[k])
+            })
+        return pd.DataFrame(
+            rows, columns=['escala', 'n_itens', 'n', 'alfa', 'media', 'ic_inferior', 'ic_superior']
+        )
+
+    def aggregate_by(
+        self,
+        data: pd.DataFrame,
+        group_col: str,
+        min_group_size: int = MIN_GROUP_SIZE
+    ) -> pd.DataFrame:
+        """
+        Resultados por escala segmentados por uma coluna demográfica (setor, cargo, unidade...).
+        
+        Numa única passagem agrupada calcula a média, o intervalo de confiança a 95% e a
+        prevalência dos tercis do semáforo (verde/amarelo/vermelho) de cada escala. Grupos
+        com menos de min_group_size respondentes são suprimidos para preservar o anonimato.
+        
+        Args:
+            data: DataFrame com as respostas brutas e a coluna demográfica
+            group_col: Nome da coluna usada para segmentar
+            min_group_size: Número mínimo de respondentes por grupo
+        
+        Returns:
+            DataFrame com as colunas grupo, escala, n, media, ic_inferior, ic_superior,
+            pct_verde, pct_amarelo e pct_vermelho
+        """
+        if group_col not in data.columns:
+            raise ValueError(f"Coluna de segmentação '{group_col}' não encontrada")
+        
+        scores = self.score_respondents(data)
+        groups = data[group_col].astype('string').fillna('(sem valor)')
+        
+        # Grupos pequenos são excluídos antes de qualquer agregação
+        sizes = groups.value_counts()
+        kept = groups.isin(sizes[sizes >= min_group_size].index)
+        scores, groups = scores[kept], groups[kept]
+        
+        columns = ['grupo', 'escala', 'n', 'media', 'ic_inferior', 'ic_superior',
+                   'pct_verde', 'pct_amarelo', 'pct_vermelho']
+        if scores.empty:
+            return pd.DataFrame(columns=columns)
+        
+        # Tercil de risco: nas escalas positivas, scores altos são favoráveis
+        low, high = TERTILE_LIMITS
+        values = scores.to_numpy()
+        positive = np.isin(scores.columns, self.positive_scales)
+        risk = np.where(positive, 100 - values, values)
+        
+        frames = {
+            'n': scores.notna(),
+            'soma': scores,
+            'soma_quadrados': scores ** 2,
+            'verde': pd.DataFrame(risk < low, index=scores.index, columns=scores.columns),
+            'vermelho': pd.DataFrame(risk > high, index=scores.index, columns=scores.columns),
+        }
+        stacked = pd.concat(frames, axis=1).groupby(groups.to_numpy()).sum()
+        
+        n = stacked['n']
+        mean = stacked['soma'] / n
+        variance = (stacked['soma_quadrados'] - n * mean ** 2) / (n - 1)
+        half_width = Z_95 * np.sqrt(variance.clip(lower=0)) / np.sqrt(n)
+        
+        metrics = {
+            'n': n,
+            'media': mean,
+            'ic_inferior': (mean - half_width).clip(lower=0),
+            'ic_superior': (mean + half_width).clip(upper=100),
+            'pct_verde': stacked['verde'] / n * 100,
+            'pct_vermelho': stacked['vermelho'] / n * 100,
+        }
+        # Formato longo (grupo, escala) com melt, estável entre versões do pandas
+        long = {
+            name: frame.rename_axis(index='grupo', columns='escala').reset_index()
+                       .melt(id_vars='grupo', var_name='escala', value_name=name)
+            for name, frame in metrics.items()
+        }
+        result = long['n'][['grupo', 'escala']].assign(
+            **{name: frame[name].to_numpy() for name, frame in long.items()}
+        )
+        # melt percorre escala a escala: reordena por grupo, mantendo a ordem das escalas
+        result = result.sort_values('grupo', kind='mergesort', ignore_index=True)
+        
+        result['pct_amarelo'] = 100 - result['pct_verde'] - result['pct_vermelho']
+        
+        # Escalas com poucas respostas dentro de um grupo também ficam suprimidas
+        result = result[result['n'] >= min_group_size]
+        result['n'] = result['n'].astype(int)
+        return result[columns].reset_index(drop=True)
+
+    def _score_matrix(self, data: pd.DataFrame, fmt: str) -> Tuple[np.ndarray, CompiledLayout]:
+        """
+        Converte o bloco de itens das escalas numa matriz (respostas x itens) de scores 0-100.
+        
+        No formato textual, o vocabulário é normalizado uma única vez (valores únicos ->
+        códigos) e o bloco de itens é mapeado para uma matriz int8 (0 = sem resposta).
+        A inversão é aplicada com uma máscara pré-calculada sobre as colunas.
+        
+        Returns:
+            Tupla (matriz float com NaN nas respostas em falta, layout com as colunas da matriz)
+        """
+        layout = self.layout_for(data.columns)
+        items = layout.items
+        if not items:
+            return np.empty((len(data), 0)), layout
+        
+        block = data.iloc[:, layout.positions]
+        if fmt == "numeric":
+            if all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+                raw = block.to_numpy(dtype=float, copy=True)
+            else:
+                raw = block.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, copy=True)
+        else:
+            # Só os valores distintos de cada coluna são normalizados e pontuados
+            coded = np.zeros(block.shape, dtype=np.int8)
+            for j in range(len(items)):
+                codes, uniques = pd.factorize(block.iloc[:, j])
+                lookup = np.zeros(len(uniques) + 1, dtype=np.int8)  # índice -1 (NaN) -> 0
+                lookup[:-1] = [self._score_answer(value) for value in uniques]
+                coded[:, j] = lookup[codes]
+                
+                unmapped = np.flatnonzero(lookup[:-1] == 0)
+                if len(unmapped):
+                    occurrences = np.bincount(codes[codes >= 0], minlength=len(uniques))
+                    for code in unmapped:
+                        self.unmapped_answers[uniques[code]] += int(occurrences[code])
+            raw = np.where(coded > 0, coded, np.nan)
+        
+        # Inverte os itens marcados (5 vira 1, 1 vira 5) e normaliza para escala 0-100
+        return normalize_item_scores(raw, layout.inverted, 1, 5), layout
+
+    def score_items(self, data: pd.DataFrame) -> Tuple[np.ndarray, CompiledLayout]:
+        """
+        Scores 0-100 de cada resposta a cada item das escalas (formato detetado em data).
+        
+        Args:
+            data: DataFrame com as respostas brutas
+        
+        Returns:
+            Tupla (matriz respostas x itens com NaN nas respostas em falta, layout da matriz)
+        """
+        return self._score_matrix(data, self._detect_format(data))
+
+    def layout_for(self, columns) -> CompiledLayout:
+        """Layout compilado (e memoizado) para as colunas dadas."""
+        columns = tuple(str(c) for c in columns)
+        # Detecta o prefixo utilizado (Resp_Q ou P) para montar as escalas
+        prefix = "Resp_Q" if any(c.startswith("Resp_Q") for c in columns) else "P"
+        return compile_layout(self._scale_key, self._inverted_key, prefix, columns)
+
+    def build_result(self, name: str, results: dict, n_responses: int, quality_score: float) -> AnalysisResult:
+        """AnalysisResult a partir dos scores médios por escala (0-100)."""
         risk = self._calculate_risk_level(results)
         return AnalysisResult(
             id=hashlib.md5(f"{datetime.now()}".encode()).hexdigest()[:8],
@@ -170,7 +571,12 @@ class COPSOQProcessor:
             name=name,
             timestamp=datetime.now(),
             data=results,
-            metadata={'version': self.version, 'n_responses': len(data), 'coverage': validation.quality_score},
+            metadata={
+                'version': self.version,
+                'n_responses': n_responses,
+                'coverage': quality_score,
+                'respostas_nao_mapeadas': dict(self.unmapped_answers.most_common(20))
+            },
             risk_level=risk
         )
 
@@ -0,0 +1,127 @@
+# logic/copsoq_statistics.py
+# Responsabilidade: Estatísticas de fiabilidade e incerteza das escalas COPSOQ (alfa de Cronbach, IC bootstrap).
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Memória máxima (em células) da matriz de pesos de cada bloco de reamostragens
+BOOTSTRAP_BLOCK_CELLS = 4_000_000
+
+
+def cronbach_alpha(items: np.ndarray) -> float:
+    """
+    Alfa de Cronbach de uma escala (respondentes com todos os itens respondidos).
+
+    Args:
+        items: Matriz (respondentes x itens) com NaN nas respostas em falta
+
+    Returns:
+        Alfa de Cronbach, ou NaN se a escala tiver menos de 2 itens ou de 2 respostas completas
+    """
+    n_items = items.shape[1]
+    complete = items[~np.isnan(items).any(axis=1)]
+    if n_items < 2 or len(complete) < 2:
+        return float('nan')
+
+    item_variance = complete.var(axis=0, ddof=1).sum()
+    total_variance = complete.sum(axis=1).var(ddof=1)
+    if total_variance == 0:
+        return float('nan')
+    return float(n_items / (n_items - 1) * (1 - item_variance / total_variance))
+
+
+def bootstrap_means(
+    scores: np.ndarray,
+    n_resamples: int = 1000,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Médias bootstrap de todas as colunas de uma vez.
+
+    Cada bloco de reamostragens é uma matriz de índices (reamostragens x respondentes),
+    convertida em pesos por contagem; as médias de todas as colunas saem de um único
+    produto matricial por bloco, sem ciclo Python por reamostragem.
+
+    Args:
+        scores: Matriz (respondentes x colunas) com NaN nas respostas em falta
+        n_resamples: Número de reamostragens
+        seed: Semente do gerador (a mesma semente gera as mesmas reamostragens)
+
+    Returns:
+        Matriz (reamostragens x colunas) com as médias
+    """
+    rng = np.random.default_rng(seed)
+    n = scores.shape[0]
+    valid = ~np.isnan(scores)
+    filled = np.where(valid, scores, 0.0)
+    valid = valid.astype(float)
+
+    block = max(1, min(n_resamples, BOOTSTRAP_BLOCK_CELLS // max(n, 1)))
+    means = np.empty((n_resamples, scores.shape[1]))
+
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        indices = rng.integers(0, n, size=(size, n))
+        # Quantas vezes cada respondente foi sorteado em cada reamostragem
+        offsets = indices + (np.arange(size) * n)[:, None]
+        weights = np.bincount(offsets.ravel(), minlength=size * n).reshape(size, n).astype(float)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[start:start + size] = (weights @ filled) / (weights @ valid)
+
+    return means
+
+
+def _bootstrap_worker(args) -> np.ndarray:
+    scores, n_resamples, seed = args
+    return bootstrap_means(scores, n_resamples, seed)
+
+
+def bootstrap_ci(
+    scores: np.ndarray,
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    n_jobs: int = 1
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intervalos de confiança bootstrap (percentis) da média de cada coluna.
+
+    Args:
+        scores: Matriz (respondentes x colunas) com NaN nas respostas em falta
+        n_resamples: Número de reamostragens
+        confidence: Nível de confiança (ex.: 0.95)
+        seed: Semente do gerador
+        n_jobs: Processos usados (as colunas são repartidas entre eles)
+
+    Returns:
+        Tupla (limites inferiores, limites superiores), um valor por coluna
+    """
+    n_columns = scores.shape[1]
+    # Sem semente explícita, fixa uma para que todos os processos usem as mesmas reamostragens
+    if seed is None:
+        seed = int(np.random.default_rng().integers(2 ** 31))
+
+    if n_jobs > 1 and n_columns > 1:
+        splits = np.array_split(np.arange(n_columns), min(n_jobs, n_columns))
+        try:
+            with ProcessPoolExecutor(max_workers=len(splits)) as pool:
+                parts = list(pool.map(
+                    _bootstrap_worker,
+                    [(scores[:, cols], n_resamples, seed) for cols in splits]
+                ))
+            means = np.hstack(parts)
+        except Exception as e:
+            logger.warning(f"Bootstrap em paralelo indisponível ({e}). A calcular num só processo.")
+            means = bootstrap_means(scores, n_resamples, seed)
+    else:
+        means = bootstrap_means(scores, n_resamples, seed)
+
+    alpha = (1 - confidence) / 2 * 100
+    lower, upper = np.nanpercentile(means, [alpha, 100 - alpha], axis=0)
+    return lower, upper
@@ -0,0 +1,302 @@
+# logic/copsoq_stream.py
+# Responsabilidade: Agregar respostas COPSOQ que chegam continuamente (campanhas online), lote a lote.
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from logic.copsoq_processor import COPSOQProcessor, MIN_GROUP_SIZE
+from models.analysis import AnalysisResult
+from models.instrument import dimension_means
+from utils.file_lock import bloqueio_exclusivo
+
+# Grupo que acumula todas as respostas
+TOTAL_GROUP = "(Total)"
+
+# Arquivo (no diretório de dados) com o estado da recolha contínua
+STREAM_STATE_FILE = "copsoq_recolha_continua.json"
+
+# Versão do formato do estado gravado
+STATE_VERSION = 1
+
+
+class COPSOQStreamAggregator:
+    """
+    Mantém somas, contagens e variâncias (Welford) por escala e por grupo, de forma que
+    cada novo lote de respostas é incorporado em O(lote) e não em O(total).
+
+    Os scores por escala de AnalysisResult.data são idênticos aos de COPSOQProcessor.process
+    aplicado ao arquivo completo (média de todas as respostas aos itens da escala).
+    As variâncias são calculadas sobre os scores por respondente. O estado é serializável
+    (to_dict / save / load), pelo que a recolha continua entre sessões e reinícios.
+    """
+
+    def __init__(
+        self,
+        processor: Optional[COPSOQProcessor] = None,
+        group_col: Optional[str] = None,
+        name: str = "COPSOQ III (recolha contínua)"
+    ):
+        self.processor = processor or COPSOQProcessor(version="III")
+        self.group_col = group_col
+        self.name = name
+
+        # Somas e contagens das respostas aos itens, por escala
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+        # Estatísticas de Welford por (grupo, escala): matrizes G x S
+        self.groups: Dict[str, int] = {}
+        self.scale_names = list(self.processor.scale_names)
+        n_scales = len(self.scale_names)
+        self._n = np.zeros((0, n_scales))
+        self._mean = np.zeros((0, n_scales))
+        self._m2 = np.zeros((0, n_scales))
+
+        # Identificadores dos lotes já incorporados (um lote não é contado duas vezes)
+        self.batch_ids: List[str] = []
+        self.n_responses = 0
+        self.null_cells = 0
+        self.total_cells = 0
+        self.coverage = 0.0
+
+    def update(self, batch: pd.DataFrame, batch_id: Optional[str] = None):
+        """
+        Incorpora um novo lote de respostas.
+
+        Args:
+            batch: DataFrame com as novas respostas (mesmo layout das anteriores)
+            batch_id: Identificador do lote (ex.: hash do arquivo); um lote já incorporado é recusado
+
+        Raises:
+            ValueError: Se o lote já foi incorporado ou a cobertura de escalas for crítica
+        """
+        if batch_id is not None and batch_id in self.batch_ids:
+            raise ValueError("Este lote já foi incorporado na recolha contínua.")
+        if batch.empty:
+            return
+
+        batch.columns = [str(c).strip() for c in batch.columns]
+        processor = self.processor
+        layout = processor.layout_for(batch.columns)
+        if layout.coverage < 30:
+            raise ValueError(
+                f"Falha na validação: Cobertura de escalas crítica ({layout.coverage:.1f}%). "
+                "Verifique os nomes das colunas."
+            )
+        processor.layout = layout
+        self.coverage = layout.coverage
+
+        # O lote é pontuado uma única vez: somas por escala e scores por respondente
+        item_scores, layout = processor.score_items(batch)
+        valid = ~np.isnan(item_scores)
+        filled = np.where(valid, item_scores, 0.0)
+
+        item_totals = filled.sum(axis=0) @ layout.membership
+        item_counts = valid.sum(axis=0) @ layout.membership
+        for j, scale in enumerate(layout.scale_names):
+            self.totals[scale] = self.totals.get(scale, 0.0) + float(item_totals[j])
+            self.counts[scale] = self.counts.get(scale, 0) + int(item_counts[j])
+
+        respondent_means = dimension_means(item_scores, layout.membership)
+        scores = pd.DataFrame(respondent_means, index=batch.index, columns=list(layout.scale_names))
+
+        self._merge_group(TOTAL_GROUP, scores)
+        if self.group_col and self.group_col in batch.columns:
+            groups = batch[self.group_col].astype('string').fillna('(sem valor)')
+            for group, group_scores in scores.groupby(groups.to_numpy()):
+                self._merge_group(str(group), group_scores)
+
+        if batch_id is not None:
+            self.batch_ids.append(batch_id)
+        self.n_responses += len(batch)
+        self.null_cells += int(batch.isnull().sum().sum())
+        self.total_cells += batch.size
+
+    def _merge_group(self, group: str, scores: pd.DataFrame):
+        """Combina as estatísticas do lote com as acumuladas (algoritmo paralelo de Chan/Welford)."""
+        if group not in self.groups:
+            self.groups[group] = len(self.groups)
+            empty = np.zeros((1, len(self.scale_names)))
+            self._n = np.vstack([self._n, empty])
+            self._mean = np.vstack([self._mean, empty])
+            self._m2 = np.vstack([self._m2, empty])
+        g = self.groups[group]
+
+        values = scores.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        n_b = valid.sum(axis=0).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_b = np.where(n_b > 0, np.where(valid, values, 0.0).sum(axis=0) / n_b, 0.0)
+        m2_b = np.where(valid, (values - mean_b) ** 2, 0.0).sum(axis=0)
+
+        n_a, mean_a, m2_a = self._n[g], self._mean[g], self._m2[g]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self._mean[g] = np.where(n > 0, mean_a + delta * n_b / n, 0.0)
+            self._m2[g] = np.where(n > 0, m2_a + m2_b + delta ** 2 * n_a * n_b / n, 0.0)
+        self._n[g] = n
+
+    def result(self) -> AnalysisResult:
+        """Constrói o AnalysisResult com o estado atual (sem reprocessar respostas)."""
+        if self.n_responses < 5:
+            raise ValueError(
+                f"Falha na validação: Volume insuficiente ({self.n_responses} respostas). Mínimo de 5 exigido."
+            )
+
+        results = {
+            scale: self.totals[scale] / self.counts[scale]
+            for scale in self.scale_names if self.counts.get(scale)
+        }
+        quality_score = max(0, 100 - self.null_cells / self.total_cells * 100 - (100 - self.coverage) / 2)
+
+        analysis = self.processor.build_result(self.name, results, self.n_responses, quality_score)
+        stats = self.group_stats()
+        total = stats[stats['grupo'] == TOTAL_GROUP].set_index('escala')
+        analysis.metadata['desvios_padrao'] = total['desvio_padrao'].round(4).to_dict()
+        analysis.metadata['recolha_continua'] = True
+        analysis.metadata['lotes'] = len(self.batch_ids)
+        return analysis
+
+    def group_stats(self, min_group_size: int = MIN_GROUP_SIZE) -> pd.DataFrame:
+        """
+        Estatísticas acumuladas por grupo e escala (scores por respondente).
+
+        Args:
+            min_group_size: Número mínimo de respondentes para um grupo ser mostrado
+
+        Returns:
+            DataFrame com as colunas grupo, escala, n, media e desvio_padrao
+        """
+        columns = ['grupo', 'escala', 'n', 'media', 'desvio_padrao']
+        if not self.groups:
+            return pd.DataFrame(columns=columns)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.where(self._n > 1, self._m2 / (self._n - 1), np.nan))
+
+        group_names = list(self.groups.keys())
+        rows = pd.DataFrame({
+            'grupo': np.repeat(group_names, len(self.scale_names)),
+            'escala': np.tile(self.scale_names, len(group_names)),
+            'n': self._n.ravel().astype(int),
+            'media': self._mean.ravel(),
+            'desvio_padrao': std.ravel()
+        })
+        return rows[rows['n'] >= min_group_size].reset_index(drop=True)
+
+    def to_dict(self) -> Dict:
+        """Estado acumulado num dicionário serializável em JSON."""
+        return {
+            'versao': STATE_VERSION,
+            'versao_copsoq': self.processor.version,
+            'nome': self.name,
+            'group_col': self.group_col,
+            'escalas': self.scale_names,
+            'totais': self.totals,
+            'contagens': self.counts,
+            'grupos': list(self.groups),
+            'n': self._n.tolist(),
+            'media': self._mean.tolist(),
+            'm2': self._m2.tolist(),
+            'lotes': self.batch_ids,
+            'n_respostas': self.n_responses,
+            'celulas_nulas': self.null_cells,
+            'celulas_total': self.total_cells,
+            'cobertura': self.coverage
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict, processor: Optional[COPSOQProcessor] = None) -> "COPSOQStreamAggregator":
+        """
+        Reconstrói o agregador a partir de to_dict.
+
+        Raises:
+            ValueError: Se o estado for de outra versão ou de outro conjunto de escalas
+        """
+        processor = processor or COPSOQProcessor(version=state.get('versao_copsoq', "III"))
+        aggregator = cls(processor, state.get('group_col'), state.get('nome', "COPSOQ III (recolha contínua)"))
+        if state.get('versao') != STATE_VERSION or state.get('escalas') != aggregator.scale_names:
+            raise ValueError("Estado da recolha contínua incompatível com esta versão do COPSOQ.")
+
+        n_scales = len(aggregator.scale_names)
+        aggregator.totals = {scale: float(v) for scale, v in state['totais'].items()}
+        aggregator.counts = {scale: int(v) for scale, v in state['contagens'].items()}
+        aggregator.groups = {group: g for g, group in enumerate(state['grupos'])}
+        for attr, key in (('_n', 'n'), ('_mean', 'media'), ('_m2', 'm2')):
+            setattr(aggregator, attr, np.array(state[key], dtype=float).reshape(-1, n_scales))
+        aggregator.batch_ids = list(state['lotes'])
+        aggregator.n_responses = int(state['n_respostas'])
+        aggregator.null_cells = int(state['celulas_nulas'])
+        aggregator.total_cells = int(state['celulas_total'])
+        aggregator.coverage = float(state['cobertura'])
+        return aggregator
+
+    def save(self, path: Path):
+        """Grava o estado de forma atómica (arquivo temporário + fsync + replace)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, processor: Optional[COPSOQProcessor] = None) -> Optional["COPSOQStreamAggregator"]:
+        """Carrega o estado gravado por save (None se ainda não existir)."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f), processor)
+
+
+def add_batch(
+    path: Path,
+    batch: pd.DataFrame,
+    batch_id: Optional[str] = None,
+    group_col: Optional[str] = None,
+    processor: Optional[COPSOQProcessor] = None
+) -> COPSOQStreamAggregator:
+    """
+    Incorpora um lote na recolha contínua persistida em path.
+
+    Ler, atualizar e gravar o estado acontece sob um bloqueio exclusivo, pelo que lotes
+    enviados ao mesmo tempo por sessões ou processos diferentes são todos contados.
+
+    Args:
+        path: Arquivo do estado (ver STREAM_STATE_FILE)
+        batch: DataFrame com as novas respostas brutas
+        batch_id: Identificador do lote (ex.: hash do arquivo)
+        group_col: Coluna de segmentação, usada apenas ao iniciar uma nova recolha
+        processor: Processador COPSOQ (opcional)
+
+    Returns:
+        O agregador atualizado
+
+    Raises:
+        ValueError: Se o lote já foi incorporado ou não for válido
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with bloqueio_exclusivo(path.with_name(path.name + ".lock")):
+        aggregator = COPSOQStreamAggregator.load(path, processor)
+        if aggregator is None:
+            aggregator = COPSOQStreamAggregator(processor, group_col)
+        aggregator.update(batch, batch_id)
+        aggregator.save(path)
+    return aggregator
+
+
+def reset_stream(path: Path):
+    """Apaga o estado da recolha contínua (a próxima recolha começa do zero)."""
+    path = Path(path)
+    with bloqueio_exclusivo(path.with_name(path.name + ".lock")):
+        path.unlink(missing_ok=True)
@@ -0,0 +1,393 @@
+"""
+Agregação 360° das Avaliações de Toxicidade por Liderança e Unidade
+Projeto SER | Marcos Simões Bellini, CRP 04/37811
+"""
+
+import json
+import math
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models.toxicidade_model import classificar_niveis_risco
+from logic.toxicidade_store import ArmazemJSONL
+
+# Tipos de agregação e o campo de dados_participante que os identifica
+CAMPOS_AGREGACAO = {
+    "lider": "lider",
+    "unidade": "departamento"
+}
+
+# Agregado de todas as avaliações (base das estatísticas gerais)
+TIPO_GERAL = "geral"
+CHAVE_GERAL = "todas"
+
+# Base SQLite dos agregados, dentro do diretório de dados da avaliação
+ARQUIVO_AGREGADOS = "agregados_liderancas.db"
+
+# Número mínimo de avaliadores para mostrar o perfil detalhado (anonimato)
+MIN_AVALIADORES = 3
+
+
+def _agregado_vazio() -> Dict:
+    return {
+        "n": 0,
+        "somas": {},
+        "somas_quadrados": {},
+        "contagens": {},
+        "soma_total": 0.0,
+        "distribuicao": {},
+        "ultima_avaliacao": None
+    }
+
+
+def _agregados_vazios() -> Dict[str, Dict[str, Dict]]:
+    return {tipo: {} for tipo in (*CAMPOS_AGREGACAO, TIPO_GERAL)}
+
+
+def _chaves_avaliacao(avaliacao: Dict) -> List[Tuple[str, str]]:
+    """Agregados afetados por uma avaliação: o geral, o do seu líder e o da sua unidade"""
+    dados = avaliacao.get("dados_participante") or {}
+    chaves = [(TIPO_GERAL, CHAVE_GERAL)]
+    for tipo, campo in CAMPOS_AGREGACAO.items():
+        chave = str(dados.get(campo) or "").strip()
+        if chave:
+            chaves.append((tipo, chave))
+    return chaves
+
+
+def _somar(agregado: Dict, avaliacao: Dict):
+    """Soma uma avaliação a um agregado, em O(dimensões)"""
+    agregado["n"] += 1
+    agregado["soma_total"] += avaliacao["pontuacao_total"]
+    for dimensao, pontuacao in avaliacao["pontuacoes_dimensoes"].items():
+        agregado["somas"][dimensao] = agregado["somas"].get(dimensao, 0.0) + pontuacao
+        agregado["somas_quadrados"][dimensao] = (
+            agregado["somas_quadrados"].get(dimensao, 0.0) + pontuacao ** 2
+        )
+        agregado["contagens"][dimensao] = agregado["contagens"].get(dimensao, 0) + 1
+    nivel = avaliacao["nivel_risco_geral"]
+    agregado["distribuicao"][nivel] = agregado["distribuicao"].get(nivel, 0) + 1
+    agregado["ultima_avaliacao"] = max(
+        agregado["ultima_avaliacao"] or avaliacao["timestamp"], avaliacao["timestamp"]
+    )
+
+
+def agregar(avaliacoes: Iterable[Dict]) -> Dict[str, Dict[str, Dict]]:
+    """
+    Calcula do zero os agregados de um conjunto de avaliações
+
+    Args:
+        avaliacoes: Avaliações no formato gravado por salvar_resultado
+
+    Returns:
+        Dict {tipo: {chave: agregado}}
+    """
+    agregados = _agregados_vazios()
+    for avaliacao in avaliacoes:
+        for tipo, chave in _chaves_avaliacao(avaliacao):
+            _somar(agregados[tipo].setdefault(chave, _agregado_vazio()), avaliacao)
+    return agregados
+
+
+def _divergencias(atual: Any, esperado: Any, caminho: str = "") -> List[str]:
+    """Diferenças entre dois agregados (números comparados com tolerância)"""
+    if isinstance(atual, dict) and isinstance(esperado, dict):
+        diferencas = []
+        for chave in sorted(set(atual) | set(esperado), key=str):
+            diferencas += _divergencias(
+                atual.get(chave), esperado.get(chave), f"{caminho}/{chave}" if caminho else str(chave)
+            )
+        return diferencas
+    numeros = (int, float)
+    if isinstance(atual, numeros) and isinstance(esperado, numeros):
+        if math.isclose(atual, esperado, rel_tol=1e-9, abs_tol=1e-9):
+            return []
+    elif atual == esperado:
+        return []
+    return [f"{caminho}: {atual!r} (esperado {esperado!r})"]
+
+
+def _perfil(chave: str, tipo: str, agregado: Dict) -> Dict:
+    """Perfil (médias, desvios, nível de risco) a partir das somas de um agregado"""
+    n = agregado["n"]
+    # Agregados gravados antes das contagens por dimensão assumem todas respondidas
+    contagens = {dim: agregado.get("contagens", {}).get(dim, n) for dim in agregado["somas"]}
+    medias = {dim: soma / contagens[dim] for dim, soma in agregado["somas"].items()}
+    desvios = {}
+    for dim, media in medias.items():
+        k = contagens[dim]
+        if k > 1:
+            variancia = (agregado["somas_quadrados"][dim] - k * media ** 2) / (k - 1)
+            desvios[dim] = math.sqrt(max(variancia, 0.0))
+        else:
+            desvios[dim] = 0.0
+
+    media_total = agregado["soma_total"] / n
+    return {
+        "chave": chave,
+        "tipo": tipo,
+        "n_avaliadores": n,
+        "anonimato_garantido": n >= MIN_AVALIADORES,
+        "medias_dimensoes": medias,
+        "desvios_dimensoes": desvios,
+        "media_total": media_total,
+        "nivel_risco": str(classificar_niveis_risco([media_total])[0]),
+        "distribuicao_niveis_risco": dict(agregado["distribuicao"]),
+        "dimensoes_criticas": sorted(medias.items(), key=lambda x: x[1], reverse=True)[:3],
+        "ultima_avaliacao": agregado["ultima_avaliacao"]
+    }
+
+
+class AgregadorLiderancas:
+    """
+    Mantém somas acumuladas de todas as avaliações, por liderança e por unidade.
+
+    Cada agregado é uma linha SQLite (tipo, chave, estado JSON): uma avaliação salva
+    atualiza, numa única transação, apenas as linhas do geral, do seu líder e da sua
+    unidade, em O(dimensões). As leituras consultam a base, pelo que refletem as
+    gravações de outras sessões e processos sem recarregar tudo.
+    """
+
+    def __init__(self, caminho: Path):
+        """
+        Inicializa o agregador
+
+        Args:
+            caminho: Base SQLite onde os agregados são persistidos
+
+        Raises:
+            sqlite3.DatabaseError: Se o arquivo existir mas não for uma base válida
+        """
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        # Partilhado entre sessões do Streamlit: uma ligação, protegida por lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.caminho, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS agregados ("
+            "tipo TEXT NOT NULL, chave TEXT NOT NULL, estado TEXT NOT NULL, "
+            "PRIMARY KEY (tipo, chave))"
+        )
+        # Perfil geral em cache, válido enquanto a base não mudar (ver _versao)
+        self._geral: Optional[Dict] = None
+        self._versao_geral: Optional[Tuple[int, int]] = None
+
+    def _versao(self) -> Tuple[int, int]:
+        # data_version muda com commits de outras ligações; total_changes com os desta
+        return (
+            self._conn.execute("PRAGMA data_version").fetchone()[0],
+            self._conn.total_changes
+        )
+
+    @contextmanager
+    def _transacao(self):
+        """Transação de escrita (BEGIN IMMEDIATE serializa escritores entre processos)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _ler(self, tipo: str, chave: str) -> Optional[Dict]:
+        linha = self._conn.execute(
+            "SELECT estado FROM agregados WHERE tipo = ? AND chave = ?", (tipo, chave)
+        ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def _gravar(self, tipo: str, chave: str, agregado: Dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO agregados (tipo, chave, estado) VALUES (?, ?, ?)",
+            (tipo, chave, json.dumps(agregado, ensure_ascii=False))
+        )
+
+    def _todos(self) -> Dict[str, Dict[str, Dict]]:
+        agregados = _agregados_vazios()
+        for tipo, chave, estado in self._conn.execute("SELECT tipo, chave, estado FROM agregados"):
+            agregados.setdefault(tipo, {})[chave] = json.loads(estado)
+        return agregados
+
+    @property
+    def existe(self) -> bool:
+        """Indica se os agregados já foram construídos (existe o agregado geral)"""
+        with self._lock:
+            return self._ler(TIPO_GERAL, CHAVE_GERAL) is not None
+
+    def registar(self, avaliacao: Dict):
+        """
+        Incorpora uma avaliação salva no agregado geral e nos do seu líder e da sua unidade
+
+        Args:
+            avaliacao: Avaliação no formato gravado por salvar_resultado
+        """
+        with self._transacao():
+            for tipo, chave in _chaves_avaliacao(avaliacao):
+                agregado = self._ler(tipo, chave) or _agregado_vazio()
+                _somar(agregado, avaliacao)
+                self._gravar(tipo, chave, agregado)
+
+    def reconstruir(self, avaliacoes: Iterable[Dict]):
+        """
+        Recalcula todos os agregados a partir das avaliações gravadas
+
+        Args:
+            avaliacoes: Avaliações no formato gravado por salvar_resultado
+        """
+        agregados = agregar(avaliacoes)
+        # Garante a linha geral mesmo sem avaliações (marca os agregados como construídos)
+        agregados[TIPO_GERAL].setdefault(CHAVE_GERAL, _agregado_vazio())
+        with self._transacao():
+            self._conn.execute("DELETE FROM agregados")
+            for tipo, por_chave in agregados.items():
+                for chave, agregado in por_chave.items():
+                    self._gravar(tipo, chave, agregado)
+
+    def verificar(self, avaliacoes: Iterable[Dict]) -> List[str]:
+        """
+        Compara os agregados persistidos com um recálculo completo
+
+        Args:
+            avaliacoes: Avaliações no formato gravado por salvar_resultado
+
+        Returns:
+            Lista de divergências "tipo/chave/campo: atual (esperado ...)"; vazia se coincidem
+        """
+        esperado = agregar(avaliacoes)
+        with self._lock:
+            atual = self._todos()
+        # Um agregado geral vazio equivale à ausência de avaliações
+        if not atual[TIPO_GERAL].get(CHAVE_GERAL, {}).get("n", 1):
+            del atual[TIPO_GERAL][CHAVE_GERAL]
+        return _divergencias(atual, esperado)
+
+    def listar(self, tipo: str = "lider", min_avaliadores: int = MIN_AVALIADORES) -> List[str]:
+        """
+        Retorna as chaves (líderes ou unidades) por ordem alfabética
+
+        Args:
+            tipo: "lider" ou "unidade"
+            min_avaliadores: Só são listadas as chaves com pelo menos este número de
+                avaliações (por omissão o limiar de anonimato; 1 lista todas)
+
+        Returns:
+            Lista de chaves
+        """
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT chave, estado FROM agregados WHERE tipo = ? ORDER BY chave", (tipo,)
+            ).fetchall()
+        return [
+            chave for chave, estado in linhas
+            if json.loads(estado)["n"] >= max(min_avaliadores, 1)
+        ]
+
+    def geral(self) -> Optional[Dict]:
+        """
+        Perfil do agregado de todas as avaliações (base das estatísticas gerais)
+
+        Só volta a ler a linha geral quando a base mudou desde a última leitura, pelo
+        que renderizar as estatísticas repetidamente não lê nem analisa nada.
+
+        Returns:
+            Mesmo formato de perfil, ou None se não houver avaliações
+        """
+        with self._lock:
+            versao = self._versao()
+            if versao != self._versao_geral:
+                self._geral = self.perfil(CHAVE_GERAL, TIPO_GERAL)
+                self._versao_geral = versao
+            return self._geral
+
+    def perfil(self, chave: str, tipo: str = "lider") -> Optional[Dict]:
+        """
+        Perfil 360° de um líder ou unidade
+
+        Args:
+            chave: Nome do líder ou da unidade
+            tipo: "lider" ou "unidade"
+
+        Returns:
+            Dict com n, médias e desvios por dimensão, média total, nível de risco e
+            distribuição dos avaliadores por nível (None se não houver avaliações).
+            Abaixo de MIN_AVALIADORES (exceto no agregado geral) contém apenas chave,
+            tipo, n_avaliadores e anonimato_garantido=False
+        """
+        with self._lock:
+            agregado = self._ler(tipo, chave)
+        if not agregado or not agregado["n"]:
+            return None
+        if tipo != TIPO_GERAL and agregado["n"] < MIN_AVALIADORES:
+            # O anonimato é garantido aqui e não apenas na interface
+            return {
+                "chave": chave,
+                "tipo": tipo,
+                "n_avaliadores": agregado["n"],
+                "anonimato_garantido": False
+            }
+        return _perfil(chave, tipo, agregado)
+
+    def resumo(self, tipo: str = "lider") -> List[Dict]:
+        """
+        Resumo de todos os líderes ou unidades, do maior para o menor risco
+
+        Abaixo de MIN_AVALIADORES a pontuação não é revelada: media_total e nivel_risco
+        são None e essas chaves vêm no fim, por ordem alfabética (a posição no ranking
+        também identificaria a pontuação).
+
+        Returns:
+            Lista de dicts com chave, n_avaliadores, media_total e nivel_risco
+        """
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT chave, estado FROM agregados WHERE tipo = ?", (tipo,)
+            ).fetchall()
+        resumo = []
+        for chave, estado in linhas:
+            agregado = json.loads(estado)
+            if not agregado["n"]:
+                continue
+            linha = {"chave": chave, "n_avaliadores": agregado["n"], "media_total": None, "nivel_risco": None}
+            if agregado["n"] >= MIN_AVALIADORES:
+                linha["media_total"] = agregado["soma_total"] / agregado["n"]
+                linha["nivel_risco"] = str(classificar_niveis_risco([linha["media_total"]])[0])
+            resumo.append(linha)
+        return sorted(
+            resumo,
+            key=lambda x: (x["media_total"] is None, -(x["media_total"] or 0.0), x["chave"])
+        )
+
+    def limpar(self):
+        """Remove todos os agregados"""
+        with self._transacao():
+            self._conn.execute("DELETE FROM agregados")
+
+    def fechar(self):
+        """Fecha a ligação à base"""
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    # Uso: python -m logic.toxicidade_agregacao [diretório] [--apenas-verificar]
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    data_dir = Path(argumentos[0] if argumentos else "data/toxicidade")
+    armazem = ArmazemJSONL(data_dir / "avaliacoes.jsonl")
+    agregador = AgregadorLiderancas(data_dir / ARQUIVO_AGREGADOS)
+
+    divergencias = agregador.verificar(armazem.iterar())
+    print(f"{len(divergencias)} divergência(s) encontradas")
+    for divergencia in divergencias:
+        print(f"  {divergencia}")
+    if "--apenas-verificar" in sys.argv:
+        sys.exit(1 if divergencias else 0)
+    agregador.reconstruir(armazem.iterar())
+    print("Agregados reconstruídos")
@@ -0,0 +1,181 @@
+"""
+Exportação em Streaming das Avaliações de Toxicidade (JSON, CSV, XLSX, Parquet)
+Projeto SER | Marcos Simões Bellini, CRP 04/37811
+"""
+
+import csv
+import json
+import logging
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from models.toxicidade_model import QuestionarioToxicidade
+
+logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+    logger.warning("openpyxl não instalado. Exportação XLSX desativada.")
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("pyarrow não instalado. Exportação Parquet desativada.")
+
+FORMATOS_EXPORTACAO = ("json", "csv", "xlsx", "parquet")
+
+# Colunas fixas; seguem-se as pontuações de cada dimensão do questionário
+COLUNAS_BASE = ["id", "timestamp", "pontuacao_total", "nivel_risco_geral"]
+
+# Avaliações convertidas e escritas de cada vez (a memória usada não cresce com o total)
+TAMANHO_LOTE = 10_000
+
+# Linhas de dados por folha XLSX (limite do Excel: 1 048 576 linhas, incluindo o cabeçalho)
+LINHAS_POR_FOLHA_XLSX = 1_048_575
+
+
+def colunas_exportacao(questionario: QuestionarioToxicidade) -> List[str]:
+    """
+    Colunas exportadas, definidas pela estrutura do questionário
+
+    Args:
+        questionario: Questionário cujas dimensões dão as colunas de pontuação
+
+    Returns:
+        Lista com as colunas fixas seguidas dos nomes das dimensões
+    """
+    return COLUNAS_BASE + [dimensao.nome for dimensao in questionario.dimensoes]
+
+
+def _lotes(avaliacoes: Iterable[Dict], dimensoes: List[str], tamanho: int) -> Iterator[List[list]]:
+    """Converte as avaliações em linhas, agrupadas em lotes de `tamanho`"""
+    linhas = (
+        [
+            avaliacao["id"],
+            avaliacao["timestamp"],
+            avaliacao["pontuacao_total"],
+            avaliacao["nivel_risco_geral"],
+            *(avaliacao["pontuacoes_dimensoes"].get(dimensao) for dimensao in dimensoes)
+        ]
+        for avaliacao in avaliacoes
+    )
+    while True:
+        lote = list(islice(linhas, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def _exportar_json(avaliacoes: Iterable[Dict], caminho: Path) -> int:
+    # Lista JSON escrita avaliação a avaliação, com o mesmo aspeto de json.dump(indent=2)
+    total = 0
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write("[")
+        for avaliacao in avaliacoes:
+            texto = json.dumps(avaliacao, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            f.write(("," if total else "") + "\n  " + texto)
+            total += 1
+        f.write("\n]" if total else "]")
+    return total
+
+
+def _exportar_csv(lotes: Iterator[List[list]], colunas: List[str], caminho: Path) -> int:
+    total = 0
+    with open(caminho, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(colunas)
+        for lote in lotes:
+            writer.writerows(lote)
+            total += len(lote)
+    return total
+
+
+def _exportar_xlsx(lotes: Iterator[List[list]], colunas: List[str], caminho: Path) -> int:
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError("openpyxl não instalado: exportação XLSX indisponível")
+
+    # Modo write-only: as linhas vão diretamente para o arquivo, sem modelo em memória
+    workbook = openpyxl.Workbook(write_only=True)
+    folha, linhas_na_folha, total = None, 0, 0
+    for lote in lotes:
+        for linha in lote:
+            if folha is None or linhas_na_folha == LINHAS_POR_FOLHA_XLSX:
+                numero = len(workbook.worksheets) + 1
+                folha = workbook.create_sheet("Avaliações" if numero == 1 else f"Avaliações ({numero})")
+                folha.append(colunas)
+                linhas_na_folha = 0
+            folha.append(linha)
+            linhas_na_folha += 1
+        total += len(lote)
+    if folha is None:
+        workbook.create_sheet("Avaliações").append(colunas)
+    workbook.save(caminho)
+    return total
+
+
+def _exportar_parquet(lotes: Iterator[List[list]], colunas: List[str], caminho: Path) -> int:
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow não instalado: exportação Parquet indisponível")
+
+    esquema = pa.schema(
+        [
+            ("id", pa.string()),
+            ("timestamp", pa.string()),
+            ("pontuacao_total", pa.float64()),
+            ("nivel_risco_geral", pa.string())
+        ]
+        + [(coluna, pa.float64()) for coluna in colunas[len(COLUNAS_BASE):]]
+    )
+    total = 0
+    # Cada lote é um row group: nunca há mais do que um lote em memória
+    with pq.ParquetWriter(caminho, esquema) as writer:
+        for lote in lotes:
+            arrays = [
+                pa.array(valores, type=campo.type)
+                for valores, campo in zip(zip(*lote), esquema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=esquema))
+            total += len(lote)
+    return total
+
+
+def exportar_avaliacoes(
+    avaliacoes: Iterable[Dict],
+    questionario: QuestionarioToxicidade,
+    caminho: Path,
+    formato: str = "csv",
+    tamanho_lote: int = TAMANHO_LOTE
+) -> int:
+    """
+    Exporta avaliações lidas de forma incremental (ex.: ArmazemJSONL.iterar)
+
+    Args:
+        avaliacoes: Avaliações no formato gravado por salvar_resultado
+        questionario: Questionário que define as colunas de pontuação
+        caminho: Arquivo de destino
+        formato: "json", "csv", "xlsx" ou "parquet"
+        tamanho_lote: Avaliações escritas de cada vez
+
+    Returns:
+        int: Número de avaliações exportadas
+    """
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(
+            f"Formato não suportado: {formato} (use {', '.join(FORMATOS_EXPORTACAO)})"
+        )
+
+    caminho = Path(caminho)
+    if formato == "json":
+        return _exportar_json(avaliacoes, caminho)
+
+    colunas = colunas_exportacao(questionario)
+    lotes = _lotes(avaliacoes, colunas[len(COLUNAS_BASE):], tamanho_lote)
+    exportadores = {"csv": _exportar_csv, "xlsx": _exportar_xlsx, "parquet": _exportar_parquet}
+    return exportadores[formato](lotes, colunas, caminho)
@@ -3,8 +3,8 @@ Lógica de Negócio para Avaliação de Toxicidade em Lideranças
 Projeto SER | Marcos Simões Bellini, CRP 04/37811
 """
 
-import json
-import os
+import logging
+import sqlite3
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -12,7 +12,23 @@ from pathlib import Path
 from models.toxicidade_model import (
     QuestionarioToxicidade,
     ResultadoAvaliacao,
-    RespostaAvaliacao
+    ResultadoAvaliacaoLote,
+    RespostaAvaliacao,
+    gerar_id_avaliacao
+)
+from logic.toxicidade_agregacao import AgregadorLiderancas, ARQUIVO_AGREGADOS
+from logic.toxicidade_export import exportar_avaliacoes
+from logic.toxicidade_store import ArmazemJSONL
+
+logger = logging.getLogger(__name__)
+
+# Campos das avaliações mantidos no índice (filtros e ordenação do histórico)
+CAMPOS_INDICE_AVALIACOES = (
+    "timestamp",
+    "pontuacao_total",
+    "nivel_risco_geral",
+    "dados_participante.lider",
+    "dados_participante.departamento"
 )
 
 
@@ -31,9 +47,41 @@ class GerenciadorAvaliacaoToxicidade:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        # Arquivos de dados
-        self.arquivo_avaliacoes = self.data_dir / "avaliacoes.json"
-        self.arquivo_historico = self.data_dir / "historico.json"
+        # Arquivos de dados (só de acréscimo: cada gravação é um append com fsync)
+        self.armazem = ArmazemJSONL(
+            self.data_dir / "avaliacoes.jsonl",
+            campos_indice=CAMPOS_INDICE_AVALIACOES
+        )
+        self.armazem_historico = ArmazemJSONL(self.data_dir / "historico.jsonl")
+        self.arquivo_avaliacoes = self.armazem.caminho
+        self.arquivo_historico = self.armazem_historico.caminho
+        
+        # Migração única dos arquivos JSON do formato anterior
+        self.armazem.migrar_json(self.data_dir / "avaliacoes.json")
+        self.armazem_historico.migrar_json(self.data_dir / "historico.json")
+        
+        # Agregados geral, por liderança e por unidade (reconstruídos uma vez a partir do histórico)
+        self.agregador = self._abrir_agregador()
+        if not self.agregador.existe and self.armazem.existe():
+            self.agregador.reconstruir(self.armazem.iterar())
+        # Agregados do formato anterior (um único JSON), substituídos pela base SQLite
+        (self.data_dir / "agregados_liderancas.json").unlink(missing_ok=True)
+    
+    def _abrir_agregador(self) -> AgregadorLiderancas:
+        """
+        Abre a base dos agregados; se estiver corrompida, guarda-a à parte e começa
+        uma nova, que é reconstruída a partir das avaliações (nada do histórico se perde)
+        """
+        caminho = self.data_dir / ARQUIVO_AGREGADOS
+        try:
+            return AgregadorLiderancas(caminho)
+        except sqlite3.DatabaseError as e:
+            corrompido = caminho.with_name(f"{caminho.name}.corrompido")
+            logger.error(f"Agregados ilegíveis em {caminho} ({e}); movidos para {corrompido}")
+            caminho.replace(corrompido)
+            for auxiliar in (f"{caminho.name}-wal", f"{caminho.name}-shm"):
+                caminho.with_name(auxiliar).unlink(missing_ok=True)
+            return AgregadorLiderancas(caminho)
     
     def iniciar_avaliacao(self) -> Dict[str, any]:
         """
@@ -42,10 +90,8 @@ class GerenciadorAvaliacaoToxicidade:
         Returns:
             Dict com informações da avaliação iniciada
         """
-        avaliacao_id = f"avaliacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
         return {
-            "id": avaliacao_id,
+            "id": gerar_id_avaliacao(),
             "timestamp_inicio": datetime.now().isoformat(),
             "status": "em_andamento",
             "questionario_versao": self.questionario.versao,
@@ -93,6 +139,19 @@ class GerenciadorAvaliacaoToxicidade:
         
         return resultado
     
+    def processar_avaliacoes_lote(self, respostas, ids_questoes=None) -> ResultadoAvaliacaoLote:
+        """
+        Processa muitas avaliações de uma só vez (ex.: relatório de lideranças)
+        
+        Args:
+            respostas: Matriz ou DataFrame (avaliações x questões) com valores de 1 a 5
+            ids_questoes: ID da questão de cada coluna (opcional)
+            
+        Returns:
+            ResultadoAvaliacaoLote: Pontuações e níveis de risco de todas as avaliações
+        """
+        return self.questionario.calcular_resultados_lote(respostas, ids_questoes)
+    
     def salvar_resultado(self, resultado: ResultadoAvaliacao) -> str:
         """
         Salva o resultado da avaliação
@@ -102,10 +161,10 @@ class GerenciadorAvaliacaoToxicidade:
             
         Returns:
             str: ID do resultado salvo
+            
+        Raises:
+            ValueError: Se já existir uma avaliação salva com o mesmo ID
         """
-        # Carrega resultados existentes
-        resultados_existentes = self._carregar_avaliacoes()
-        
         # Converte resultado para dicionário
         resultado_dict = {
             "id": resultado.resposta.id,
@@ -119,15 +178,16 @@ class GerenciadorAvaliacaoToxicidade:
             "recomendacoes": resultado.recomendacoes
         }
         
-        # Adiciona à lista
-        resultados_existentes.append(resultado_dict)
-        
-        # Salva
-        self._salvar_avaliacoes(resultados_existentes)
+        # Acrescenta ao arquivo (O(1), sem reescrever as avaliações anteriores);
+        # um ID já gravado (ex.: o mesmo resultado salvo duas vezes) é recusado
+        self.armazem.anexar(resultado_dict, exigir_id_unico=True)
         
         # Atualiza histórico
         self._atualizar_historico(resultado_dict)
         
+        # Atualiza os agregados do líder e da unidade avaliados
+        self.agregador.registar(resultado_dict)
+        
         return resultado.resposta.id
     
     def carregar_resultado(self, avaliacao_id: str) -> Optional[Dict]:
@@ -140,13 +200,7 @@ class GerenciadorAvaliacaoToxicidade:
         Returns:
             Dict ou None se não encontrado
         """
-        avaliacoes = self._carregar_avaliacoes()
-        
-        for avaliacao in avaliacoes:
-            if avaliacao["id"] == avaliacao_id:
-                return avaliacao
-        
-        return None
+        return self.armazem.obter(avaliacao_id)
     
     def listar_avaliacoes(
         self, 
@@ -163,30 +217,80 @@ class GerenciadorAvaliacaoToxicidade:
         Returns:
             Lista de avaliações
         """
-        avaliacoes = self._carregar_avaliacoes()
+        # O índice já está ordenado por timestamp: só as avaliações devolvidas são lidas
+        avaliacoes, _ = self.armazem.paginar(1, limite or None, reverso=ordem_reversa)
+        return avaliacoes
+    
+    def contar_avaliacoes(self) -> int:
+        """Número de avaliações gravadas"""
+        return self.armazem.contar()
+    
+    def paginar_avaliacoes(
+        self,
+        pagina: int = 1,
+        tamanho_pagina: int = 10,
+        nivel_risco: Optional[str] = None,
+        lider: Optional[str] = None,
+        unidade: Optional[str] = None,
+        ordenar_por: str = "timestamp",
+        ordem_reversa: bool = True
+    ) -> Dict:
+        """
+        Uma página do histórico, filtrada e ordenada pelo índice
         
-        # Ordena por timestamp
-        avaliacoes_ordenadas = sorted(
-            avaliacoes,
-            key=lambda x: x["timestamp"],
-            reverse=ordem_reversa
+        Args:
+            pagina: Número da página (a partir de 1; ajustado ao intervalo válido)
+            tamanho_pagina: Avaliações por página
+            nivel_risco: Filtra pelo nível de risco geral
+            lider: Filtra pela liderança avaliada
+            unidade: Filtra pela unidade (departamento)
+            ordenar_por: "timestamp" ou "pontuacao_total"
+            ordem_reversa: Se True, ordem decrescente
+            
+        Returns:
+            Dict com avaliacoes, total, pagina, total_paginas e tamanho_pagina
+        """
+        filtros = {}
+        if nivel_risco:
+            filtros["nivel_risco_geral"] = nivel_risco
+        if lider:
+            filtros["dados_participante.lider"] = lider
+        if unidade:
+            filtros["dados_participante.departamento"] = unidade
+        
+        pagina = max(pagina, 1)
+        avaliacoes, total = self.armazem.paginar(
+            pagina, tamanho_pagina, filtros, ordenar_por, ordem_reversa
         )
+        total_paginas = max(-(-total // tamanho_pagina), 1)
+        if pagina > total_paginas:
+            # Página além do fim (ex.: filtro mais restrito): mostra a última
+            pagina = total_paginas
+            avaliacoes, _ = self.armazem.paginar(
+                pagina, tamanho_pagina, filtros, ordenar_por, ordem_reversa
+            )
         
-        if limite:
-            return avaliacoes_ordenadas[:limite]
-        
-        return avaliacoes_ordenadas
+        return {
+            "avaliacoes": avaliacoes,
+            "total": total,
+            "pagina": pagina,
+            "total_paginas": total_paginas,
+            "tamanho_pagina": tamanho_pagina
+        }
     
     def obter_estatisticas(self) -> Dict:
         """
         Calcula estatísticas gerais das avaliações
         
+        Lidas do agregado geral mantido por salvar_resultado, sem reler as avaliações
+        (e sem reler a base de agregados se nada foi gravado desde a última chamada).
+        
         Returns:
             Dict com estatísticas
         """
-        avaliacoes = self._carregar_avaliacoes()
+        perfil = self.agregador.geral()
         
-        if not avaliacoes:
+        if not perfil:
             return {
                 "total_avaliacoes": 0,
                 "media_pontuacao_geral": 0.0,
@@ -194,42 +298,55 @@ class GerenciadorAvaliacaoToxicidade:
                 "dimensoes_mais_criticas": []
             }
         
-        # Calcula médias
-        pontuacoes_totais = [a["pontuacao_total"] for a in avaliacoes]
-        media_geral = sum(pontuacoes_totais) / len(pontuacoes_totais)
-        
-        # Distribui níveis de risco
-        distribuicao_risco = {}
-        for avaliacao in avaliacoes:
-            nivel = avaliacao["nivel_risco_geral"]
-            distribuicao_risco[nivel] = distribuicao_risco.get(nivel, 0) + 1
-        
-        # Identifica dimensões mais problemáticas
-        pontuacoes_por_dimensao = {}
-        for avaliacao in avaliacoes:
-            for dimensao, pontuacao in avaliacao["pontuacoes_dimensoes"].items():
-                if dimensao not in pontuacoes_por_dimensao:
-                    pontuacoes_por_dimensao[dimensao] = []
-                pontuacoes_por_dimensao[dimensao].append(pontuacao)
-        
-        medias_dimensoes = {
-            dim: sum(ponts) / len(ponts)
-            for dim, ponts in pontuacoes_por_dimensao.items()
+        return {
+            "total_avaliacoes": perfil["n_avaliadores"],
+            "media_pontuacao_geral": perfil["media_total"],
+            "distribuicao_niveis_risco": perfil["distribuicao_niveis_risco"],
+            "medias_por_dimensao": perfil["medias_dimensoes"],
+            "desvios_por_dimensao": perfil["desvios_dimensoes"],
+            "dimensoes_mais_criticas": perfil["dimensoes_criticas"]
         }
+    
+    def reconstruir_estatisticas(self, verificar: bool = True) -> List[str]:
+        """
+        Recalcula os agregados (estatísticas e perfis 360°) a partir das avaliações gravadas
         
-        dimensoes_ordenadas = sorted(
-            medias_dimensoes.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        Args:
+            verificar: Se True, compara antes os agregados atuais com o recálculo
+            
+        Returns:
+            Divergências encontradas (vazia se coincidiam ou se verificar=False)
+        """
+        divergencias = self.agregador.verificar(self.armazem.iterar()) if verificar else []
+        self.agregador.reconstruir(self.armazem.iterar())
+        return divergencias
+    
+    def listar_liderancas(self, tipo: str = "lider") -> List[Dict]:
+        """
+        Lista líderes (ou unidades) avaliados, do maior para o menor risco
         
-        return {
-            "total_avaliacoes": len(avaliacoes),
-            "media_pontuacao_geral": media_geral,
-            "distribuicao_niveis_risco": distribuicao_risco,
-            "medias_por_dimensao": medias_dimensoes,
-            "dimensoes_mais_criticas": dimensoes_ordenadas[:3]
-        }
+        Args:
+            tipo: "lider" ou "unidade"
+            
+        Returns:
+            Lista de dicts com chave, n_avaliadores, media_total e nivel_risco
+            (media_total e nivel_risco são None abaixo de MIN_AVALIADORES)
+        """
+        return self.agregador.resumo(tipo)
+    
+    def obter_perfil_lideranca(self, chave: str, tipo: str = "lider") -> Optional[Dict]:
+        """
+        Perfil 360° de um líder ou unidade, lido dos agregados (sem reler o histórico)
+        
+        Args:
+            chave: Nome do líder ou da unidade
+            tipo: "lider" ou "unidade"
+            
+        Returns:
+            Dict com médias por dimensão e distribuição dos avaliadores, ou None;
+            abaixo de MIN_AVALIADORES apenas o número de avaliadores
+        """
+        return self.agregador.perfil(chave, tipo)
     
     def exportar_resultados(
         self, 
@@ -239,93 +356,36 @@ class GerenciadorAvaliacaoToxicidade:
         """
         Exporta todos os resultados
         
+        As avaliações são lidas do arquivo e escritas em lotes, com memória constante;
+        as colunas de pontuação vêm das dimensões do questionário.
+        
         Args:
-            formato: Formato de exportação (json, csv)
+            formato: Formato de exportação (json, csv, xlsx, parquet)
             caminho: Caminho do arquivo (None = gera automaticamente)
             
         Returns:
             str: Caminho do arquivo gerado
         """
-        avaliacoes = self._carregar_avaliacoes()
-        
         if not caminho:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             caminho = str(self.data_dir / f"export_{timestamp}.{formato}")
         
-        if formato == "json":
-            with open(caminho, 'w', encoding='utf-8') as f:
-                json.dump(avaliacoes, f, indent=2, ensure_ascii=False)
-        
-        elif formato == "csv":
-            import csv
-            
-            with open(caminho, 'w', newline='', encoding='utf-8') as f:
-                if not avaliacoes:
-                    return caminho
-                
-                # Define campos
-                campos = [
-                    'id', 'timestamp', 'pontuacao_total', 'nivel_risco_geral'
-                ]
-                
-                # Adiciona dimensões
-                primeira_avaliacao = avaliacoes[0]
-                campos.extend(primeira_avaliacao['pontuacoes_dimensoes'].keys())
-                
-                writer = csv.DictWriter(f, fieldnames=campos)
-                writer.writeheader()
-                
-                for avaliacao in avaliacoes:
-                    linha = {
-                        'id': avaliacao['id'],
-                        'timestamp': avaliacao['timestamp'],
-                        'pontuacao_total': avaliacao['pontuacao_total'],
-                        'nivel_risco_geral': avaliacao['nivel_risco_geral']
-                    }
-                    linha.update(avaliacao['pontuacoes_dimensoes'])
-                    writer.writerow(linha)
+        exportar_avaliacoes(self.armazem.iterar(), self.questionario, Path(caminho), formato)
         
         return caminho
     
     def _carregar_avaliacoes(self) -> List[Dict]:
-        """Carrega avaliações do arquivo JSON"""
-        if not self.arquivo_avaliacoes.exists():
-            return []
-        
-        try:
-            with open(self.arquivo_avaliacoes, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
-    
-    def _salvar_avaliacoes(self, avaliacoes: List[Dict]):
-        """Salva avaliações no arquivo JSON"""
-        with open(self.arquivo_avaliacoes, 'w', encoding='utf-8') as f:
-            json.dump(avaliacoes, f, indent=2, ensure_ascii=False)
+        """Carrega todas as avaliações gravadas"""
+        return self.armazem.listar()
     
     def _atualizar_historico(self, resultado: Dict):
-        """Atualiza arquivo de histórico"""
-        historico = []
-        
-        if self.arquivo_historico.exists():
-            try:
-                with open(self.arquivo_historico, 'r', encoding='utf-8') as f:
-                    historico = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                historico = []
-        
-        # Adiciona resumo ao histórico
-        resumo = {
+        """Acrescenta o resumo da avaliação ao histórico"""
+        self.armazem_historico.anexar({
             "id": resultado["id"],
             "timestamp": resultado["timestamp"],
             "pontuacao_total": resultado["pontuacao_total"],
             "nivel_risco": resultado["nivel_risco_geral"]
-        }
-        
-        historico.append(resumo)
-        
-        with open(self.arquivo_historico, 'w', encoding='utf-8') as f:
-            json.dump(historico, f, indent=2, ensure_ascii=False)
+        })
     
     def limpar_dados(self, confirmar: bool = False):
         """
@@ -337,11 +397,10 @@ class GerenciadorAvaliacaoToxicidade:
         if not confirmar:
             raise ValueError("É necessário confirmar a exclusão de dados")
         
-        if self.arquivo_avaliacoes.exists():
-            self.arquivo_avaliacoes.unlink()
+        self.armazem.limpar()
+        self.armazem_historico.limpar()
         
-        if self.arquivo_historico.exists():
-            self.arquivo_historico.unlink()
+        self.agregador.limpar()
 
 
 def criar_gerenciador(questionario: QuestionarioToxicidade) -> GerenciadorAvaliacaoToxicidade:
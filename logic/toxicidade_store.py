@@ -0,0 +1,450 @@
+"""
+Armazenamento Append-Only (JSONL) das Avaliações de Toxicidade
+Projeto SER | Marcos Simões Bellini, CRP 04/37811
+"""
+
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from utils.file_lock import bloqueio_exclusivo
+
+logger = logging.getLogger(__name__)
+
+
+def _valor_campo(registo: Dict, campo: str) -> Any:
+    """Valor de um campo do registo; "a.b" percorre dicionários aninhados"""
+    valor = registo
+    for parte in campo.split("."):
+        if not isinstance(valor, dict):
+            return None
+        valor = valor.get(parte)
+    return valor
+
+
+def _chave_ordenacao(valor: Any) -> Tuple:
+    """Chave comparável mesmo com valores em falta (None fica antes de tudo)"""
+    return (0, 0) if valor is None else (1, valor)
+
+
+class ArmazemJSONL:
+    """
+    Registos JSON, um por linha, num arquivo só de acréscimo.
+
+    Cada gravação é um único write em modo append, seguido de fsync, feito sob um
+    bloqueio exclusivo: custa O(1) independentemente do tamanho do histórico e duas
+    submissões simultâneas nunca se sobrepõem.
+
+    Ao lado dos dados fica um índice (.idx, também só de acréscimo) com o offset de
+    cada registo e alguns campos leves: obter() lê um único registo por posição e
+    paginar() filtra e ordena o índice em memória, lendo só os registos da página.
+    """
+
+    def __init__(
+        self,
+        caminho: Path,
+        campos_indice: Iterable[str] = (),
+        campo_ordem: str = "timestamp"
+    ):
+        """
+        Inicializa o armazém
+
+        Args:
+            caminho: Arquivo .jsonl (criado na primeira gravação)
+            campos_indice: Campos guardados no índice para filtrar/ordenar ("a.b" para aninhados)
+            campo_ordem: Campo pelo qual o índice é mantido ordenado
+        """
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.caminho_bloqueio = self.caminho.with_name(self.caminho.name + ".lock")
+        self.caminho_indice = self.caminho.with_name(self.caminho.name + ".idx")
+        self.campo_ordem = campo_ordem
+        self.campos_indice = tuple(dict.fromkeys((campo_ordem, *campos_indice)))
+        # Uma instância pode ser partilhada por várias sessões (threads) do Streamlit
+        self._lock = threading.RLock()
+        self._dentro_bloqueio = False
+        self._reiniciar_indice()
+
+    def existe(self) -> bool:
+        """Indica se o arquivo já tem registos"""
+        return self.caminho.exists() and self.caminho.stat().st_size > 0
+
+    @contextmanager
+    def _bloqueio(self):
+        """Bloqueio exclusivo entre threads e entre processos (arquivo .lock ao lado dos dados)"""
+        with self._lock:
+            if self._dentro_bloqueio:
+                # Reentrada na mesma thread: o arquivo .lock já está bloqueado
+                yield
+                return
+            self._dentro_bloqueio = True
+            try:
+                with bloqueio_exclusivo(self.caminho_bloqueio):
+                    yield
+            finally:
+                self._dentro_bloqueio = False
+
+    def anexar(self, registo: Dict, exigir_id_unico: bool = False) -> int:
+        """
+        Acrescenta um registo ao fim do arquivo (com fsync)
+
+        Args:
+            registo: Dicionário serializável em JSON
+            exigir_id_unico: Se True, recusa um "id" já gravado (verificado sob o bloqueio)
+
+        Returns:
+            int: Posição (offset em bytes) onde o registo começa
+
+        Raises:
+            ValueError: Se exigir_id_unico e o id já existir
+        """
+        linha = (json.dumps(registo, ensure_ascii=False) + "\n").encode('utf-8')
+        with self._bloqueio():
+            if exigir_id_unico:
+                self._atualizar_indice()
+                if registo.get("id") in self._posicoes:
+                    raise ValueError(f"Já existe um registo com o ID {registo.get('id')}")
+            with open(self.caminho, 'a+b') as f:
+                offset = f.seek(0, os.SEEK_END)
+                # Uma gravação interrompida pode ter deixado a última linha incompleta
+                if offset > 0:
+                    f.seek(offset - 1)
+                    if f.read(1) != b"\n":
+                        linha = b"\n" + linha
+                        offset += 1
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._indice_carregado:
+                self._atualizar_indice()
+        return offset
+
+    def iterar(self) -> Iterator[Dict]:
+        """
+        Percorre os registos pela ordem de gravação
+
+        Linhas corrompidas (ex.: gravação interrompida a meio) são ignoradas com aviso.
+        """
+        if not self.caminho.exists():
+            return
+        with open(self.caminho, 'rb') as f:
+            for numero, linha in enumerate(f, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    yield json.loads(linha)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    logger.warning(f"Registo inválido ignorado em {self.caminho}:{numero}")
+
+    def listar(self) -> List[Dict]:
+        """Retorna todos os registos pela ordem de gravação"""
+        return list(self.iterar())
+
+    def obter(self, registo_id: str) -> Optional[Dict]:
+        """
+        Procura um registo pelo campo "id" (consulta ao índice e uma única leitura)
+
+        Args:
+            registo_id: ID do registo
+
+        Returns:
+            Dict ou None se não encontrado
+        """
+        with self._lock:
+            self.sincronizar_indice()
+            offset = self._posicoes.get(registo_id)
+            if offset is None:
+                return None
+            return self._ler([offset])[0]
+
+    def contar(self) -> int:
+        """Número de registos gravados"""
+        with self._lock:
+            self.sincronizar_indice()
+            return len(self._ordenadas)
+
+    def paginar(
+        self,
+        pagina: int = 1,
+        tamanho_pagina: Optional[int] = 20,
+        filtros: Optional[Mapping[str, Any]] = None,
+        ordenar_por: Optional[str] = None,
+        reverso: bool = True
+    ) -> Tuple[List[Dict], int]:
+        """
+        Uma página de registos, filtrada e ordenada apenas através do índice
+
+        Args:
+            pagina: Número da página (a partir de 1)
+            tamanho_pagina: Registos por página (None: todos)
+            filtros: {campo indexado: valor exigido}
+            ordenar_por: Campo indexado (padrão: campo_ordem, que dispensa ordenação)
+            reverso: Se True, ordem decrescente
+
+        Returns:
+            (registos da página, total de registos que passam os filtros)
+        """
+        filtros = dict(filtros or {})
+        ordenar_por = ordenar_por or self.campo_ordem
+        for campo in (*filtros, ordenar_por):
+            if campo not in self.campos_indice:
+                raise ValueError(f"Campo não indexado: {campo}")
+
+        with self._lock:
+            self.sincronizar_indice()
+            return self._paginar_indice(pagina, tamanho_pagina, filtros, ordenar_por, reverso)
+
+    def _paginar_indice(
+        self,
+        pagina: int,
+        tamanho_pagina: Optional[int],
+        filtros: Dict[str, Any],
+        ordenar_por: str,
+        reverso: bool
+    ) -> Tuple[List[Dict], int]:
+        entradas = self._ordenadas
+        if filtros:
+            entradas = [
+                e for e in entradas
+                if all(e.get(campo) == valor for campo, valor in filtros.items())
+            ]
+        if ordenar_por != self.campo_ordem:
+            # sorted é estável: empates mantêm a ordem cronológica
+            entradas = sorted(entradas, key=lambda e: _chave_ordenacao(e.get(ordenar_por)))
+
+        total = len(entradas)
+        inicio = max(pagina - 1, 0) * (tamanho_pagina or 0)
+        fim = total if tamanho_pagina is None else min(inicio + tamanho_pagina, total)
+        if reverso:
+            selecionadas = entradas[max(total - fim, 0):max(total - inicio, 0)][::-1]
+        else:
+            selecionadas = entradas[inicio:fim]
+        return self._ler([e["o"] for e in selecionadas]), total
+
+    def limpar(self):
+        """Remove o arquivo de registos e o seu índice"""
+        with self._bloqueio():
+            if self.caminho.exists():
+                self.caminho.unlink()
+            self._descartar_indice()
+
+    # ------------------------------------------------------------------
+    # Índice id -> offset e ordem por campo_ordem
+    # ------------------------------------------------------------------
+
+    def _reiniciar_indice(self):
+        self._posicoes: Dict[str, int] = {}
+        self._ordenadas: List[Dict] = []
+        self._chaves: List[Tuple] = []
+        self._fim = 0               # Bytes do arquivo de dados já indexados
+        self._tamanho_indice = 0    # Bytes do .idx já lidos ou escritos por esta instância
+        self._inode = None          # Deteta a substituição do arquivo (migração, limpeza)
+        self._indice_carregado = False
+
+    def _descartar_indice(self):
+        """Apaga o índice persistido (chamar sob bloqueio, após reescrever os dados)"""
+        if self.caminho_indice.exists():
+            self.caminho_indice.unlink()
+        self._reiniciar_indice()
+
+    def _estado_arquivo(self) -> Tuple[Optional[int], int]:
+        try:
+            estado = self.caminho.stat()
+        except FileNotFoundError:
+            return None, 0
+        return estado.st_ino, estado.st_size
+
+    def sincronizar_indice(self):
+        """Carrega o índice e indexa registos gravados entretanto (por este ou outro processo)"""
+        with self._lock:
+            inode, tamanho = self._estado_arquivo()
+            if self._indice_carregado and inode == self._inode and tamanho == self._fim:
+                return
+            with self._bloqueio():
+                self._atualizar_indice()
+
+    def _atualizar_indice(self):
+        """
+        Sob bloqueio: lê as entradas do .idx acrescentadas por outras instâncias e só
+        depois indexa os registos que ficaram para lá da última entrada do .idx
+        """
+        inode, tamanho = self._estado_arquivo()
+        try:
+            tamanho_indice = self.caminho_indice.stat().st_size
+        except FileNotFoundError:
+            tamanho_indice = 0
+        if (not self._indice_carregado or inode != self._inode or tamanho < self._fim
+                or tamanho_indice < self._tamanho_indice):
+            # Dados ou índice substituídos: recomeça a partir do .idx
+            self._reiniciar_indice()
+            self._inode = inode
+            self._indice_carregado = True
+        if tamanho_indice > self._tamanho_indice:
+            self._ler_indice(inode, tamanho)
+        if tamanho > self._fim:
+            self._indexar_pendentes()
+
+    def _ler_indice(self, inode: Optional[int], tamanho: int):
+        """Sob bloqueio: incorpora as entradas do .idx a partir de self._tamanho_indice"""
+        ultima = None
+        with open(self.caminho_indice, 'rb') as f:
+            f.seek(self._tamanho_indice)
+            for linha in f:
+                try:
+                    entrada = json.loads(linha) if linha.endswith(b"\n") else None
+                    # As entradas seguem a ordem do arquivo e não podem ultrapassar o seu fim
+                    valido = self._fim <= entrada["o"] < entrada["f"] <= tamanho
+                except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+                    valido = False
+                if not valido:
+                    break
+                self._incluir(entrada)
+                self._tamanho_indice += len(linha)
+                ultima = entrada
+            else:
+                # Um .idx de outro arquivo pode ter offsets plausíveis: confere a última entrada
+                if ultima is None or self._confere_entrada(ultima):
+                    return
+        # Índice de outro arquivo ou interrompido a meio: reconstrói do zero
+        logger.warning(f"Índice {self.caminho_indice} inconsistente; a reconstruir")
+        self._descartar_indice()
+        self._inode = inode
+        self._indice_carregado = True
+
+    def _confere_entrada(self, entrada: Dict) -> bool:
+        """Indica se a entrada do índice aponta para uma linha completa com o mesmo id"""
+        with open(self.caminho, 'rb') as f:
+            f.seek(entrada["o"])
+            linha = f.read(entrada["f"] - entrada["o"])
+        if not linha.endswith(b"\n"):
+            return False
+        try:
+            registo = json.loads(linha)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return False
+        return isinstance(registo, dict) and registo.get("id") == entrada.get("id")
+
+    def _incluir(self, entrada: Dict):
+        if entrada.get("id") is not None:
+            if entrada["id"] in self._posicoes:
+                # Só possível em dados antigos: anexar(exigir_id_unico=True) recusa repetições
+                logger.warning(f"ID repetido em {self.caminho}: {entrada['id']} (mantido o primeiro)")
+            self._posicoes.setdefault(entrada["id"], entrada["o"])
+        chave = (_chave_ordenacao(entrada.get(self.campo_ordem)), entrada["o"])
+        posicao = bisect.bisect_right(self._chaves, chave)
+        self._chaves.insert(posicao, chave)
+        self._ordenadas.insert(posicao, entrada)
+        self._fim = max(self._fim, entrada["f"])
+
+    def _indexar_pendentes(self):
+        """Sob bloqueio: indexa as linhas completas gravadas depois de self._fim"""
+        with open(self.caminho, 'rb') as dados, open(self.caminho_indice, 'ab') as indice:
+            dados.seek(self._fim)
+            offset = self._fim
+            for linha in dados:
+                if not linha.endswith(b"\n"):
+                    break  # Última linha ainda incompleta
+                fim = offset + len(linha)
+                try:
+                    registo = json.loads(linha) if linha.strip() else None
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    registo = None
+                if isinstance(registo, dict):
+                    entrada = {"id": registo.get("id"), "o": offset, "f": fim}
+                    entrada.update({campo: _valor_campo(registo, campo) for campo in self.campos_indice})
+                    self._incluir(entrada)
+                    linha_indice = (json.dumps(entrada, ensure_ascii=False) + "\n").encode('utf-8')
+                    indice.write(linha_indice)
+                    self._tamanho_indice += len(linha_indice)
+                self._fim = offset = fim
+
+    def _ler(self, offsets: List[int]) -> List[Dict]:
+        """Lê os registos que começam nos offsets indicados"""
+        if not offsets:
+            return []
+        with open(self.caminho, 'rb') as f:
+            registos = []
+            for offset in offsets:
+                f.seek(offset)
+                registos.append(json.loads(f.readline()))
+            return registos
+
+    def migrar_json(self, arquivo_json: Path) -> int:
+        """
+        Migra uma única vez um arquivo JSON antigo (lista de registos) para este armazém
+
+        O JSONL é escrito num arquivo temporário e só depois ocupa o lugar definitivo;
+        o JSON original é renomeado para .json.migrado e deixa de ser lido.
+
+        Args:
+            arquivo_json: Arquivo JSON no formato antigo
+
+        Returns:
+            int: Número de registos migrados (0 se não havia nada a migrar ou se outra
+                sessão o fez primeiro)
+        """
+        arquivo_json = Path(arquivo_json)
+        if not arquivo_json.exists():
+            return 0
+
+        with self._bloqueio():
+            # Outra sessão ou processo pode ter migrado entretanto: tudo é revisto sob o bloqueio
+            if not arquivo_json.exists():
+                return 0
+            try:
+                with open(arquivo_json, 'r', encoding='utf-8') as f:
+                    registos = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error(f"Não foi possível migrar {arquivo_json}: {e}")
+                return 0
+
+            # Registos já presentes no JSONL (ex.: migração anterior interrompida) não são duplicados
+            existentes = self.caminho.read_bytes() if self.caminho.exists() else b""
+            ids_existentes = {registo.get("id") for registo in self.iterar()}
+            if existentes and not existentes.endswith(b"\n"):
+                existentes += b"\n"
+            novos = [registo for registo in registos if registo.get("id") not in ids_existentes]
+
+            temporario = self.caminho.with_name(self.caminho.name + ".tmp")
+            with open(temporario, 'wb') as f:
+                for registo in novos:
+                    f.write((json.dumps(registo, ensure_ascii=False) + "\n").encode('utf-8'))
+                f.write(existentes)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.caminho)
+            arquivo_json.rename(arquivo_json.with_name(arquivo_json.name + ".migrado"))
+            # Os offsets mudaram: o índice é refeito na próxima consulta
+            self._descartar_indice()
+
+        logger.info(f"{len(novos)} registos migrados de {arquivo_json} para {self.caminho}")
+        return len(novos)
+
+
+def migrar_diretorio(data_dir: str = "data/toxicidade") -> Dict[str, int]:
+    """
+    Migra avaliacoes.json e historico.json de um diretório para JSONL
+
+    Args:
+        data_dir: Diretório de dados da avaliação de toxicidade
+
+    Returns:
+        Dict com o número de registos migrados por arquivo
+    """
+    data_dir = Path(data_dir)
+    return {
+        nome: ArmazemJSONL(data_dir / f"{nome}.jsonl").migrar_json(data_dir / f"{nome}.json")
+        for nome in ("avaliacoes", "historico")
+    }
+
+
+if __name__ == "__main__":
+    # Uso: python -m logic.toxicidade_store [diretório]
+    logging.basicConfig(level=logging.INFO)
+    print(migrar_diretorio(sys.argv[1] if len(sys.argv) > 1 else "data/toxicidade"))
@@ -3,30 +3,85 @@
 
 import hashlib
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
 
 # CORREÇÃO: Importar do arquivo correto
 from models.analysis import AnalysisResult
 from models.enums import AnalysisType, RiskLevel
+from models.instrument import InstrumentDefinition, SUM
+from logic.copsoq_processor import normalize_answer
+
+# Valores das opções de resposta (inclui os rótulos usados no formulário da página)
+DUWAS_RESPONSE_VALUES = {
+    "(Quase) Nunca": 1,
+    "Ocasionalmente": 2,
+    "Frequentemente": 3,
+    "(Quase) Sempre": 4,
+    "Quase Nunca / Nunca": 1,
+    "Às vezes": 2,
+    "Quase Sempre / Sempre": 4
+}
+
+# Mapeamento das questões por dimensão
+DUWAS_DIMENSIONS = {
+    "Trabalhar Excessivamente": ["TrabalharExcessivamente_0", "TrabalharExcessivamente_1",
+                                 "TrabalharExcessivamente_2", "TrabalharExcessivamente_3"],
+    "Trabalhar Compulsivamente": ["TrabalharCompulsivamente_0", "TrabalharCompulsivamente_1",
+                                  "TrabalharCompulsivamente_2", "TrabalharCompulsivamente_3"]
+}
+
+# Definição declarativa e núcleo de pontuação compilado: soma dos itens (1-4) por dimensão
+DUWAS_DEFINITION = InstrumentDefinition.from_dimensions(
+    "DUWAS",
+    {dimension: [f"duwas_{key}" for key in keys] for dimension, keys in DUWAS_DIMENSIONS.items()},
+    scale_min=1,
+    scale_max=4,
+    responses=DUWAS_RESPONSE_VALUES,
+    aggregation=SUM
+)
+DUWAS_KERNEL = DUWAS_DEFINITION.compile()
+
+EXCESSIVE = "Trabalhar Excessivamente"
+COMPULSIVE = "Trabalhar Compulsivamente"
+
+# Média por item (escala 1-4) a partir da qual uma subescala é considerada alta
+QUADRANT_CUTOFF = 2.5
+
+# Quadrantes indexados por (excessivo alto) + 2 * (compulsivo alto)
+QUADRANTS = ("Relaxado", "Trabalhador Intenso", "Trabalhador Compulsivo", "Workaholic")
+
+# Rótulos normalizados e valores numéricos 1-4 -> opção de resposta
+DUWAS_ANSWER_ALIASES = {normalize_answer(label): label for label in DUWAS_RESPONSE_VALUES}
+for _label, _value in DUWAS_RESPONSE_VALUES.items():
+    DUWAS_ANSWER_ALIASES.setdefault(str(_value), _label)
+
+# Cabeçalhos aceites: chave do formulário (com ou sem prefixo) ou Q1..Q8
+DUWAS_COLUMN_ALIASES = {}
+for _position, _key in enumerate(DUWAS_KERNEL.keys, start=1):
+    DUWAS_COLUMN_ALIASES[normalize_answer(_key)] = _key
+    DUWAS_COLUMN_ALIASES[normalize_answer(_key[len("duwas_"):])] = _key
+    DUWAS_COLUMN_ALIASES[f"q{_position}"] = _key
+
+
+def _canonical_answer(value) -> Optional[str]:
+    """Opção do DUWAS correspondente a uma resposta exportada (None se não reconhecida)."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (int, float, np.number)) and float(value).is_integer():
+        value = int(value)
+    return DUWAS_ANSWER_ALIASES.get(normalize_answer(value))
+
 
 class WorkaholismProcessor:
     """Processador para análise de Workaholism usando DUWAS."""
     
     def __init__(self):
-        self.duwas_response_values = {
-            "(Quase) Nunca": 1,
-            "Ocasionalmente": 2,
-            "Frequentemente": 3,
-            "(Quase) Sempre": 4
-        }
-        
-        # Mapeamento das questões por dimensão
-        self.dimensions = {
-            "Trabalhar Excessivamente": ["TrabalharExcessivamente_0", "TrabalharExcessivamente_1", 
-                                        "TrabalharExcessivamente_2", "TrabalharExcessivamente_3"],
-            "Trabalhar Compulsivamente": ["TrabalharCompulsivamente_0", "TrabalharCompulsivamente_1",
-                                         "TrabalharCompulsivamente_2", "TrabalharCompulsivamente_3"]
-        }
+        self.duwas_response_values = DUWAS_RESPONSE_VALUES
+        self.dimensions = DUWAS_DIMENSIONS
+        self.kernel = DUWAS_KERNEL
     
     def process(self, name: str, responses: Dict[str, str]) -> AnalysisResult:
         """
@@ -80,34 +135,187 @@ class WorkaholismProcessor:
     def _calculate_scores(self, responses: Dict[str, str]) -> Dict[str, float]:
         """
         Calcula os scores para cada dimensão do DUWAS.
+
+        Usa a mesma imputação pro-rata de score_respondents, para que um formulário
+        incompleto tenha a mesma pontuação que a linha equivalente de um arquivo.
         
         Args:
             responses: Dicionário com as respostas
             
         Returns:
-            Dict com os scores por dimensão
+            Dict com os scores por dimensão (apenas dimensões com respostas)
         """
-        scores = {}
-        
-        # Processa cada dimensão
-        for dimension, question_keys in self.dimensions.items():
-            dimension_score = 0
-            valid_questions = 0
-            
-            for key in question_keys:
-                # Procura pela chave no formato esperado
-                full_key = f"duwas_{key}"
-                if full_key in responses:
-                    response_text = responses[full_key]
-                    dimension_score += self.duwas_response_values.get(response_text, 0)
-                    valid_questions += 1
-            
-            # Garante que temos pelo menos uma questão válida
-            if valid_questions > 0:
-                scores[dimension] = dimension_score
-        
-        return scores
+        raw = np.full(len(self.kernel.keys), np.nan)
+        for key, value in responses.items():
+            index = self.kernel.key_index.get(key)
+            if index is not None:
+                raw[index] = self.kernel.encode_value(index, value)
+        _, scores = self._prorated_scores(raw)
+        return {
+            dimension: float(score)
+            for dimension, score in zip(self.kernel.dimensions, scores[0]) if not np.isnan(score)
+        }
+
+    def _prorated_scores(self, raw: np.ndarray):
+        """
+        Médias por item e somas pro-rata de cada subescala.
+
+        Args:
+            raw: Matriz (respondentes x itens) de valores brutos, NaN nos itens em branco
+
+        Returns:
+            Tupla (médias por item, somas pro-rata), ambas (respondentes x dimensões),
+            com NaN nas subescalas sem nenhum item respondido
+        """
+        raw = np.atleast_2d(raw)
+        sums = self.kernel.score_matrix(raw)
+        answered = (~np.isnan(raw)).astype(float) @ self.kernel.membership
+        with np.errstate(invalid='ignore', divide='ignore'):
+            item_means = np.where(answered > 0, sums / answered, np.nan)
+        # Somas pro-rata: a média por item vezes o número de itens da subescala
+        return item_means, item_means * self.kernel.membership.sum(axis=0)
     
+    def score_respondents(
+        self,
+        data: pd.DataFrame,
+        group_col: Optional[str] = None,
+        cutoff: float = QUADRANT_CUTOFF
+    ) -> pd.DataFrame:
+        """
+        Pontua de uma vez todos os respondentes e classifica-os nos quatro quadrantes.
+
+        As subescalas são somadas com o núcleo vetorizado e o quadrante de cada respondente
+        sai de um índice (excessivo alto) + 2 * (compulsivo alto), sem ciclo por linha.
+        Itens em branco são imputados pela média dos restantes itens da subescala
+        (média por item × número de itens), para que os pontos de corte do Total
+        (24/16), definidos para respostas completas, continuem aplicáveis.
+
+        Args:
+            data: DataFrame com uma linha por respondente (cabeçalhos: chave do formulário ou Q1..Q8)
+            group_col: Coluna de agrupamento a copiar para o resultado (ex.: departamento)
+            cutoff: Média por item a partir da qual a subescala é alta
+
+        Returns:
+            DataFrame com as somas das subescalas, o total, o nível de risco e o quadrante
+            (NaN / "N/A" na subescala sem nenhum item respondido e, nesse caso, também
+            no total, no nível de risco e no quadrante)
+        """
+        columns = {}
+        for column in data.columns:
+            key = DUWAS_COLUMN_ALIASES.get(normalize_answer(column))
+            if key is not None and key not in columns:
+                columns[key] = column
+        if not columns:
+            raise ValueError("Nenhuma coluna do DUWAS encontrada. Use como cabeçalho Q1..Q8 ou as chaves do formulário.")
+
+        raw = self.kernel.encode_frame(data, columns, _canonical_answer)
+        item_means, prorated = self._prorated_scores(raw)
+
+        dims = list(self.kernel.dimensions)
+        result = pd.DataFrame(prorated, index=data.index, columns=dims)
+        result['Total'] = result[dims].sum(axis=1, min_count=len(dims))
+
+        total = result['Total'].to_numpy()
+        result['Nível de Risco'] = np.select(
+            [total >= 24, total >= 16, total < 16],
+            [RiskLevel.HIGH.label, RiskLevel.MODERATE.label, RiskLevel.LOW.label],
+            default="N/A"
+        )
+
+        high = item_means >= cutoff
+        quadrant = high[:, dims.index(EXCESSIVE)].astype(int) + 2 * high[:, dims.index(COMPULSIVE)]
+        complete = ~np.isnan(item_means).any(axis=1)
+        result['Quadrante'] = np.where(complete, np.array(QUADRANTS, dtype=object)[quadrant], "N/A")
+
+        if group_col and group_col in data.columns:
+            result[group_col] = data[group_col].astype('string').fillna('(sem valor)').to_numpy()
+        return result
+
+    def summarize_groups(self, respondents: pd.DataFrame, group_col: Optional[str] = None) -> pd.DataFrame:
+        """
+        Contagens por quadrante e médias das subescalas, por grupo.
+
+        Args:
+            respondents: Resultado de score_respondents
+            group_col: Coluna de agrupamento (None: uma única linha com todos os respondentes)
+
+        Returns:
+            DataFrame com grupo, n, médias das subescalas e uma coluna por quadrante
+        """
+        classified = respondents[respondents['Quadrante'] != "N/A"]
+        groups = classified[group_col] if group_col else pd.Series("(Total)", index=classified.index)
+
+        counts = pd.crosstab(groups, classified['Quadrante']).reindex(columns=list(QUADRANTS), fill_value=0)
+        means = classified.groupby(groups)[[EXCESSIVE, COMPULSIVE, 'Total']].mean()
+
+        summary = pd.concat([counts.sum(axis=1).rename('n'), means, counts], axis=1)
+        summary.index.name = 'grupo'
+        return summary.reset_index()
+
+    def consolidator_summary(self, respondents: pd.DataFrame, group_col: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Resumo no formato de ConsolidadorResultados.adicionar_resultados_duwas.
+
+        Args:
+            respondents: Resultado de score_respondents
+            group_col: Coluna de agrupamento para o detalhe por grupo
+
+        Returns:
+            Dicionário com num_respondentes, score_medio, nivel_risco, quadrantes e grupos
+        """
+        classified = respondents[respondents['Total'].notna()]
+        score_medio = float(classified['Total'].mean()) if len(classified) else 0.0
+        quadrantes = respondents['Quadrante'].value_counts()
+        return {
+            'num_respondentes': len(classified),
+            'score_medio': score_medio,
+            'nivel_risco': self._determine_risk_level(score_medio).label,
+            'quadrantes': {quadrant: int(quadrantes.get(quadrant, 0)) for quadrant in QUADRANTS},
+            'grupos': self.summarize_groups(respondents, group_col).to_dict('records') if group_col else []
+        }
+
+    def process_batch(self, name: str, data: pd.DataFrame, group_col: Optional[str] = None) -> AnalysisResult:
+        """
+        Pontua um arquivo de respostas DUWAS e agrega os resultados.
+
+        Args:
+            name: Nome da análise
+            data: DataFrame com uma linha por respondente
+            group_col: Coluna de agrupamento opcional (ex.: departamento)
+
+        Returns:
+            AnalysisResult com a média de cada subescala; os quadrantes e o resumo
+            para o consolidador ficam na metadata
+        """
+        respondents = self.score_respondents(data, group_col)
+        summary = self.consolidator_summary(respondents, group_col)
+        if not summary['num_respondentes']:
+            raise ValueError("Nenhum respondente com respostas reconhecidas.")
+
+        answered = respondents[respondents['Total'].notna()]
+        scores = {
+            dim: float(answered[dim].mean())
+            for dim in self.kernel.dimensions if answered[dim].notna().any()
+        }
+        overall = summary['score_medio']
+
+        return AnalysisResult(
+            id=hashlib.md5(f"duwas_{datetime.now()}".encode()).hexdigest()[:8],
+            name=name,
+            type=AnalysisType.WORKAHOLISM,
+            timestamp=datetime.now(),
+            data=scores,
+            metadata={
+                "overall_score": overall,
+                "max_score": 32,
+                "n_respondents": summary['num_respondentes'],
+                "quadrantes": summary['quadrantes'],
+                "resumo_consolidador": summary,
+                "interpretation": self._generate_interpretation(overall, scores)
+            },
+            risk_level=self._determine_risk_level(overall)
+        )
+
     def _determine_risk_level(self, overall_score: float) -> RiskLevel:
         """
         Determina o nível de risco baseado no score geral.
@@ -11,6 +11,7 @@ from collections import Counter
 from services.storage import get_persistent_storage
 from config.settings import AppConfig
 from utils.backup_manager import render_backup_interface
+from utils.dataset_cache import render_cache_interface
 from utils.visualizations import render_analysis_timeline, render_analysis_distribution
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
@@ -54,6 +55,7 @@ def render_sidebar():
         
         st.markdown("### ⚙️ Administração")
         render_backup_interface()
+        render_cache_interface()
         
         st.divider()
         st.toggle("🐞 Debug Mode", key="debug_mode")
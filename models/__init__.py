@@ -10,13 +10,16 @@ from .toxicidade_model import (
     Questao,
     TipoQuestao,
     RespostaAvaliacao,
-    ResultadoAvaliacao
+    ResultadoAvaliacao,
+    ResultadoAvaliacaoLote
 )
 
 # --- INÍCIO DA ADIÇÃO ---
 from .copsoq_ii_model import CopsoqII
 # --- FIM DA ADIÇÃO ---
 
+from .instrument import InstrumentDefinition, InstrumentKernel, ItemSpec
+
 
 __all__ = [
     'QuestionarioToxicidade',
@@ -25,8 +28,13 @@ __all__ = [
     'TipoQuestao',
     'RespostaAvaliacao',
     'ResultadoAvaliacao',
+    'ResultadoAvaliacaoLote',
     
     # --- INÍCIO DA ADIÇÃO ---
-    'CopsoqII'
+    'CopsoqII',
     # --- FIM DA ADIÇÃO ---
+
+    'InstrumentDefinition',
+    'InstrumentKernel',
+    'ItemSpec'
 ]
\ No newline at end of file
@@ -0,0 +1,227 @@
+# models/instrument.py
+# Responsabilidade: Definição declarativa dos instrumentos (itens, dimensões, inversão, escala) e núcleo de pontuação NumPy.
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Modos de agregação dos itens em cada dimensão
+MEAN_PERCENT = "mean_percent"   # Média dos itens normalizados para 0-100
+SUM = "sum"                     # Soma dos valores brutos (após inversão)
+
+
+@dataclass(frozen=True)
+class ItemSpec:
+    """Um item do instrumento."""
+    key: Union[str, int]                        # Chave da resposta (coluna, id da questão...)
+    dimension: str
+    inverted: bool = False
+    responses: Optional[Mapping[str, float]] = None  # Rótulo -> valor (sobrepõe o da definição)
+
+
+@dataclass(frozen=True)
+class InstrumentDefinition:
+    """Definição declarativa de um instrumento de avaliação."""
+    name: str
+    items: Tuple[ItemSpec, ...]
+    scale_min: float
+    scale_max: float
+    responses: Optional[Mapping[str, float]] = None  # Rótulo -> valor, comum a todos os itens
+    aggregation: str = MEAN_PERCENT
+
+    @classmethod
+    def from_dimensions(
+        cls,
+        name: str,
+        dimensions: Mapping[str, List[Union[str, int, Tuple[Union[str, int], bool]]]],
+        scale_min: float,
+        scale_max: float,
+        responses: Optional[Mapping[str, float]] = None,
+        aggregation: str = MEAN_PERCENT,
+        item_responses: Optional[Mapping[Union[str, int], Mapping[str, float]]] = None
+    ) -> 'InstrumentDefinition':
+        """
+        Constrói a definição a partir de {dimensão: [chave | (chave, invertido)]}.
+
+        Args:
+            name: Nome do instrumento
+            dimensions: Itens de cada dimensão, pela ordem de apresentação
+            scale_min: Valor mínimo da escala de resposta
+            scale_max: Valor máximo da escala de resposta
+            responses: Rótulos de resposta comuns (ex.: {"Nunca": 1, ...})
+            aggregation: MEAN_PERCENT ou SUM
+            item_responses: Rótulos específicos de alguns itens
+
+        Returns:
+            InstrumentDefinition
+        """
+        item_responses = item_responses or {}
+        items = []
+        for dimension, keys in dimensions.items():
+            for entry in keys:
+                key, inverted = entry if isinstance(entry, tuple) else (entry, False)
+                items.append(ItemSpec(key, dimension, inverted, item_responses.get(key)))
+        return cls(name, tuple(items), scale_min, scale_max, responses, aggregation)
+
+    def compile(self) -> 'InstrumentKernel':
+        """Pré-calcula as estruturas de pontuação (uma vez por instrumento)."""
+        return InstrumentKernel(self)
+
+
+def normalize_item_scores(
+    raw: np.ndarray,
+    inverted: Union[np.ndarray, bool],
+    scale_min: float,
+    scale_max: float
+) -> np.ndarray:
+    """
+    Converte valores brutos da escala em pontuações 0-100 (NaN mantém-se NaN).
+
+    Itens invertidos pontuam (max - valor); os restantes (valor - min).
+    """
+    raw = np.asarray(raw, dtype=float)
+    reflected = np.where(inverted, scale_max + scale_min - raw, raw)
+    return (reflected - scale_min) / (scale_max - scale_min) * 100
+
+
+def dimension_means(item_scores: np.ndarray, membership: np.ndarray) -> np.ndarray:
+    """Média dos itens respondidos de cada dimensão (NaN se nenhum): (n x itens) -> (n x dimensões)."""
+    valid = ~np.isnan(item_scores)
+    counts = valid.astype(float) @ membership
+    totals = np.where(valid, item_scores, 0.0) @ membership
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def dimension_sums(item_values: np.ndarray, membership: np.ndarray) -> np.ndarray:
+    """Soma dos itens respondidos de cada dimensão (NaN se nenhum): (n x itens) -> (n x dimensões)."""
+    valid = ~np.isnan(item_values)
+    counts = valid.astype(float) @ membership
+    totals = np.where(valid, item_values, 0.0) @ membership
+    return np.where(counts > 0, totals, np.nan)
+
+
+class InstrumentKernel:
+    """
+    Núcleo de pontuação compilado a partir de uma InstrumentDefinition.
+
+    O mesmo código pontua um respondente (score_one) ou uma matriz/DataFrame com
+    milhões de linhas (score_matrix/score_frame): inversão por máscara, normalização
+    vetorizada e redução por dimensão com um produto pela matriz de pertença.
+    """
+
+    def __init__(self, definition: InstrumentDefinition):
+        self.definition = definition
+        self.keys = tuple(item.key for item in definition.items)
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+        self.dimensions = tuple(dict.fromkeys(item.dimension for item in definition.items))
+
+        dim_index = {dimension: j for j, dimension in enumerate(self.dimensions)}
+        self.inverted = np.array([item.inverted for item in definition.items], dtype=bool)
+        self.membership = np.zeros((len(self.keys), len(self.dimensions)))
+        for i, item in enumerate(definition.items):
+            self.membership[i, dim_index[item.dimension]] = 1.0
+
+        # Tabela de rótulos por item (None: respostas já numéricas)
+        self.lookups = [
+            dict(item.responses) if item.responses is not None
+            else (dict(definition.responses) if definition.responses is not None else None)
+            for item in definition.items
+        ]
+
+    def encode_value(self, index: int, value: Any) -> float:
+        """Valor numérico bruto da resposta ao item (NaN se ausente ou desconhecida)."""
+        if value is None:
+            return np.nan
+        lookup = self.lookups[index]
+        if lookup is not None:
+            return float(lookup.get(value, np.nan))
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def encode_frame(
+        self,
+        df: pd.DataFrame,
+        columns: Optional[Mapping[Any, Any]] = None,
+        normalize: Optional[Callable[[Any], Any]] = None
+    ) -> np.ndarray:
+        """
+        Converte as respostas de um DataFrame na matriz bruta (n x itens).
+
+        Args:
+            df: Respostas, uma linha por respondente
+            columns: Chave do item -> coluna de df (padrão: a própria chave)
+            normalize: Converte cada valor distinto no rótulo da tabela (ex.: variantes de escrita)
+
+        Returns:
+            Matriz float com NaN nas respostas em falta ou desconhecidas
+        """
+        raw = np.full((len(df), len(self.keys)), np.nan)
+        for i, key in enumerate(self.keys):
+            column = columns.get(key, key) if columns else key
+            if column not in df.columns:
+                continue
+            lookup = self.lookups[i]
+            if lookup is None:
+                raw[:, i] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+            else:
+                # Só os valores distintos da coluna passam pela tabela de rótulos
+                codes, uniques = pd.factorize(df[column])
+                if normalize is not None:
+                    uniques = [normalize(value) for value in uniques]
+                table = np.append([lookup.get(value, np.nan) for value in uniques], np.nan)
+                raw[:, i] = table[codes]
+        return raw
+
+    def item_scores(self, raw: np.ndarray) -> np.ndarray:
+        """Pontuação de cada item: 0-100 (MEAN_PERCENT) ou valor bruto invertido (SUM)."""
+        d = self.definition
+        if d.aggregation == SUM:
+            raw = np.asarray(raw, dtype=float)
+            return np.where(self.inverted, d.scale_max + d.scale_min - raw, raw)
+        return normalize_item_scores(raw, self.inverted, d.scale_min, d.scale_max)
+
+    def score_matrix(self, raw: np.ndarray) -> np.ndarray:
+        """Pontuação por dimensão de todos os respondentes: (n x itens) -> (n x dimensões)."""
+        scores = self.item_scores(np.atleast_2d(raw))
+        if self.definition.aggregation == SUM:
+            return dimension_sums(scores, self.membership)
+        return dimension_means(scores, self.membership)
+
+    def score_frame(
+        self,
+        df: pd.DataFrame,
+        columns: Optional[Mapping[Any, Any]] = None,
+        normalize: Optional[Callable[[Any], Any]] = None
+    ) -> pd.DataFrame:
+        """Pontuações por dimensão (colunas) de cada linha de df."""
+        return pd.DataFrame(
+            self.score_matrix(self.encode_frame(df, columns, normalize)),
+            index=df.index,
+            columns=list(self.dimensions)
+        )
+
+    def score_one(self, answers: Mapping[Any, Any]) -> Dict[str, float]:
+        """
+        Pontua um único respondente.
+
+        Args:
+            answers: {chave do item: resposta}; chaves desconhecidas são ignoradas
+
+        Returns:
+            {dimensão: pontuação}, apenas para as dimensões com pelo menos um item respondido
+        """
+        raw = np.full(len(self.keys), np.nan)
+        for key, value in answers.items():
+            index = self.key_index.get(key)
+            if index is not None:
+                raw[index] = self.encode_value(index, value)
+        scores = self.score_matrix(raw)[0]
+        return {
+            dimension: float(score)
+            for dimension, score in zip(self.dimensions, scores) if not np.isnan(score)
+        }
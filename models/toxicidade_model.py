@@ -4,9 +4,34 @@ Projeto SER | Marcos Simões Bellini, CRP 04/37811
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Union
 from enum import Enum
 from datetime import datetime
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from models.instrument import InstrumentDefinition, InstrumentKernel, ItemSpec, normalize_item_scores
+
+# Escala Likert das respostas
+ESCALA_MIN = 1
+ESCALA_MAX = 5
+
+# Níveis de risco e limites superiores (exclusivos) de cada um, na escala 0-100
+NIVEIS_RISCO = ("Excelente", "Baixo", "Moderado", "Alto")
+LIMITES_NIVEL_RISCO = (25.0, 50.0, 75.0)
+
+
+def gerar_id_avaliacao() -> str:
+    """ID de avaliação com data/hora e sufixo aleatório (duas avaliações no mesmo segundo não partilham o ID)."""
+    return f"avaliacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def classificar_niveis_risco(pontuacoes) -> np.ndarray:
+    """Nível de risco de cada pontuação 0-100 (vetorizado)."""
+    indices = np.searchsorted(LIMITES_NIVEL_RISCO, np.asarray(pontuacoes, dtype=float), side='right')
+    return np.array(NIVEIS_RISCO, dtype=object)[indices]
 
 
 class TipoQuestao(Enum):
@@ -33,13 +58,11 @@ class Questao:
         Returns:
             float: Pontuação normalizada (0-100)
         """
-        if self.tipo == TipoQuestao.INVERSA:
-            # Questão inversa: resposta alta (concordo) = comportamento bom = pontuação baixa
-            resposta = 6 - resposta  # Inverte: 5→1, 4→2, 3→3, 2→4, 1→5
-        
-        # Normaliza para escala 0-100
-        # 1 = 0 pontos, 5 = 100 pontos
-        return ((resposta - 1) / 4) * 100
+        # Questão inversa: resposta alta (concordo) = comportamento bom = pontuação baixa
+        # Normaliza para escala 0-100: 1 = 0 pontos, 5 = 100 pontos (invertida: 5 = 0 pontos)
+        return float(normalize_item_scores(
+            resposta, self.tipo == TipoQuestao.INVERSA, ESCALA_MIN, ESCALA_MAX
+        ))
 
 
 @dataclass
@@ -63,16 +86,17 @@ class Dimensao:
         if not self.questoes:
             return 0.0
         
-        pontuacoes = []
-        for questao in self.questoes:
-            if questao.id in respostas:
-                pontuacao = questao.calcular_pontuacao(respostas[questao.id])
-                pontuacoes.append(pontuacao)
-        
-        if not pontuacoes:
+        respondidas = [q for q in self.questoes if q.id in respostas]
+        if not respondidas:
             return 0.0
         
-        return sum(pontuacoes) / len(pontuacoes)
+        pontuacoes = normalize_item_scores(
+            [respostas[q.id] for q in respondidas],
+            np.array([q.tipo == TipoQuestao.INVERSA for q in respondidas]),
+            ESCALA_MIN,
+            ESCALA_MAX
+        )
+        return float(pontuacoes.mean())
     
     def obter_nivel_risco(self, pontuacao: float) -> str:
         """
@@ -163,6 +187,31 @@ class ResultadoAvaliacao:
         return sorted(positivas, key=lambda x: x[1])
 
 
+@dataclass
+class ResultadoAvaliacaoLote:
+    """Resultados de várias avaliações pontuadas de uma só vez"""
+    pontuacoes_dimensoes: pd.DataFrame      # avaliações x dimensões (0-100)
+    niveis_risco_dimensoes: pd.DataFrame    # avaliações x dimensões (nível de risco)
+    pontuacao_total: np.ndarray
+    nivel_risco_geral: np.ndarray
+    
+    def __len__(self) -> int:
+        """Retorna o número de avaliações"""
+        return len(self.pontuacao_total)
+    
+    def para_dataframe(self) -> pd.DataFrame:
+        """
+        Junta tudo numa tabela (uma linha por avaliação)
+        
+        Returns:
+            pd.DataFrame: Pontuações por dimensão, pontuação total e nível de risco geral
+        """
+        df = self.pontuacoes_dimensoes.copy()
+        df["Pontuação Total"] = self.pontuacao_total
+        df["Nível de Risco"] = self.nivel_risco_geral
+        return df
+
+
 @dataclass
 class QuestionarioToxicidade:
     """Representa o questionário completo de toxicidade"""
@@ -170,12 +219,33 @@ class QuestionarioToxicidade:
     descricao: str
     dimensoes: List[Dimensao] = field(default_factory=list)
     versao: str = "1.0"
+    _kernel: Optional[InstrumentKernel] = field(default=None, init=False, repr=False, compare=False)
     
     def adicionar_dimensao(self, dimensao: Dimensao):
         """Adiciona uma dimensão ao questionário"""
         if any(d.id == dimensao.id for d in self.dimensoes):
             raise ValueError(f"Dimensão com ID {dimensao.id} já existe")
         self.dimensoes.append(dimensao)
+        self._kernel = None
+    
+    def definicao_instrumento(self) -> InstrumentDefinition:
+        """Definição declarativa do questionário (itens por ID de questão, dimensões por ID)"""
+        return InstrumentDefinition(
+            name=self.titulo,
+            items=tuple(
+                ItemSpec(q.id, dimensao.id, q.tipo == TipoQuestao.INVERSA)
+                for dimensao in self.dimensoes for q in dimensao.questoes
+            ),
+            scale_min=ESCALA_MIN,
+            scale_max=ESCALA_MAX
+        )
+    
+    @property
+    def kernel(self) -> InstrumentKernel:
+        """Núcleo de pontuação compilado (recompilado quando o questionário muda)"""
+        if self._kernel is None or len(self._kernel.keys) != len(self):
+            self._kernel = self.definicao_instrumento().compile()
+        return self._kernel
     
     def obter_dimensao(self, dimensao_id: str) -> Optional[Dimensao]:
         """Retorna uma dimensão pelo ID"""
@@ -202,8 +272,10 @@ class QuestionarioToxicidade:
         pontuacoes_dimensoes = {}
         niveis_risco_dimensoes = {}
         
+        # Dimensões sem questões respondidas pontuam 0
+        pontuacoes = self.kernel.score_one(respostas)
         for dimensao in self.dimensoes:
-            pontuacao = dimensao.calcular_pontuacao_media(respostas)
+            pontuacao = pontuacoes.get(dimensao.id, 0.0)
             pontuacoes_dimensoes[dimensao.nome] = pontuacao
             niveis_risco_dimensoes[dimensao.nome] = dimensao.obter_nivel_risco(pontuacao)
         
@@ -228,7 +300,7 @@ class QuestionarioToxicidade:
         
         # Cria objeto de resposta
         resposta = RespostaAvaliacao(
-            id=f"avaliacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            id=gerar_id_avaliacao(),
             timestamp=datetime.now(),
             respostas=respostas
         )
@@ -242,6 +314,69 @@ class QuestionarioToxicidade:
             recomendacoes=recomendacoes
         )
     
+    def calcular_resultados_lote(
+        self,
+        respostas: Union[np.ndarray, pd.DataFrame],
+        ids_questoes: Optional[Sequence[int]] = None
+    ) -> ResultadoAvaliacaoLote:
+        """
+        Calcula os resultados de muitas avaliações de uma só vez
+        
+        Usa o vetor de inversão e a matriz de pertença questões x dimensões do núcleo
+        compilado: a pontuação de todos sai de operações sobre a matriz de respostas.
+        Cada linha tem o mesmo resultado que calcular_resultado daria para ela.
+        
+        Args:
+            respostas: Matriz (avaliações x questões) com valores de 1 a 5 e NaN nas
+                respostas em falta; num DataFrame, as colunas são os IDs das questões
+            ids_questoes: ID da questão de cada coluna (padrão: colunas do DataFrame ou
+                a ordem de obter_todas_questoes)
+            
+        Returns:
+            ResultadoAvaliacaoLote: Pontuações e níveis de risco de todas as avaliações
+        """
+        kernel = self.kernel
+        index = respostas.index if isinstance(respostas, pd.DataFrame) else None
+        if ids_questoes is None:
+            ids_questoes = list(respostas.columns) if index is not None else list(kernel.keys)
+        
+        valores = np.asarray(respostas, dtype=float)
+        if valores.ndim != 2 or valores.shape[1] != len(ids_questoes):
+            raise ValueError(
+                f"A matriz de respostas deve ter {len(ids_questoes)} colunas (uma por questão)"
+            )
+        
+        desconhecidas = [q for q in ids_questoes if q not in kernel.key_index]
+        if desconhecidas:
+            raise ValueError(f"Respostas para questões inexistentes: {desconhecidas}")
+        
+        invalidas = ~np.isnan(valores) & ((valores < ESCALA_MIN) | (valores > ESCALA_MAX))
+        if invalidas.any():
+            raise ValueError(
+                f"{int(invalidas.sum())} respostas fora da escala (devem estar entre {ESCALA_MIN} e {ESCALA_MAX})"
+            )
+        
+        # Reordena as colunas pela ordem das questões no núcleo
+        brutas = np.full((len(valores), len(kernel.keys)), np.nan)
+        brutas[:, [kernel.key_index[q] for q in ids_questoes]] = valores
+        
+        # Dimensões sem questões respondidas pontuam 0, como em calcular_resultado
+        pontuacoes_kernel = np.nan_to_num(kernel.score_matrix(brutas), nan=0.0)
+        posicoes = {dimensao_id: j for j, dimensao_id in enumerate(kernel.dimensions)}
+        pontuacoes = np.zeros((len(valores), len(self.dimensoes)))
+        for j, dimensao in enumerate(self.dimensoes):
+            if dimensao.id in posicoes:
+                pontuacoes[:, j] = pontuacoes_kernel[:, posicoes[dimensao.id]]
+        
+        nomes = [dimensao.nome for dimensao in self.dimensoes]
+        pontuacao_total = pontuacoes.mean(axis=1)
+        return ResultadoAvaliacaoLote(
+            pontuacoes_dimensoes=pd.DataFrame(pontuacoes, index=index, columns=nomes),
+            niveis_risco_dimensoes=pd.DataFrame(classificar_niveis_risco(pontuacoes), index=index, columns=nomes),
+            pontuacao_total=pontuacao_total,
+            nivel_risco_geral=classificar_niveis_risco(pontuacao_total)
+        )
+    
     def _gerar_recomendacoes(
         self, 
         pontuacao_total: float, 
@@ -12,6 +12,7 @@ import time
 import numpy as np
 import hashlib
 from datetime import datetime
+from pathlib import Path
 
 # --- Path setup ---
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -20,14 +21,22 @@ if project_root not in sys.path:
 
 from components.ui_components import UIComponents
 from components.ai_assistant import IntegratedAIAssistant, AutoInsightsComponent
-from logic.copsoq_processor import COPSOQProcessor
+from logic.copsoq_processor import COPSOQProcessor, MIN_GROUP_SIZE
+from logic.copsoq_stream import (
+    COPSOQStreamAggregator,
+    STREAM_STATE_FILE,
+    TOTAL_GROUP,
+    add_batch,
+    reset_stream
+)
 from models.enums import AnalysisType
-from services.storage import get_persistent_storage
+from services.storage import get_persistent_storage, STORAGE_DIR
 from services.api_client import APIClient
 
 # Importa validadores
 try:
     from utils.file_validators import FileValidator
+    from utils.dataset_cache import read_file_cached
     from utils.validators import DataValidator
 except ImportError:
     st.error("⚠️ Módulo utils não encontrado.")
@@ -44,6 +53,13 @@ ai_insights = AutoInsightsComponent(ai_assistant)
 
 ANALYSIS_TYPE_FOR_THIS_PAGE = AnalysisType.COPSOQ_III
 
+# Máximo de valores distintos para uma coluna ser oferecida como segmentação
+MAX_GROUPS = 50
+
+# Estado da recolha contínua (lotes acumulados entre sessões) e id fixo da sua análise
+STREAM_STATE_PATH = Path(STORAGE_DIR) / STREAM_STATE_FILE
+STREAM_ANALYSIS_ID = "copsoq3_recolha_continua"
+
 # =========================
 # Regras COPSOQ (importante)
 # =========================
@@ -181,6 +197,20 @@ def render_results(analysis):
             else:
                 st.info(insight)
 
+    # Respostas textuais fora do vocabulário (contadas como resposta em falta)
+    unmapped = (analysis.metadata or {}).get('respostas_nao_mapeadas')
+    if unmapped:
+        st.warning(
+            f"⚠️ {len(unmapped)} variante(s) de resposta não reconhecida(s) foram ignoradas. "
+            "Adicione-as ao vocabulário (text_to_score) se forem respostas válidas."
+        )
+        with st.expander("🔤 Respostas não reconhecidas"):
+            st.dataframe(
+                pd.DataFrame(list(unmapped.items()), columns=['Resposta', 'Ocorrências']),
+                use_container_width=True,
+                hide_index=True
+            )
+
     # Gráfico principal
     st.subheader("📊 Scores por Dimensão")
 
@@ -216,6 +246,25 @@ def render_results(analysis):
             hide_index=True
         )
 
+    # Fiabilidade e incerteza por escala (quando calculadas)
+    reliability = (analysis.metadata or {}).get('fiabilidade')
+    if reliability:
+        with st.expander("📐 Fiabilidade e Intervalos de Confiança (bootstrap)"):
+            st.caption("Alfa de Cronbach ≥ 0,70 indica consistência interna aceitável.")
+            st.dataframe(
+                pd.DataFrame(reliability).rename(columns={
+                    'escala': 'Escala',
+                    'n_itens': 'Itens',
+                    'n': 'Respondentes',
+                    'alfa': 'Alfa de Cronbach',
+                    'media': 'Média',
+                    'ic_inferior': 'IC 95% (inf.)',
+                    'ic_superior': 'IC 95% (sup.)'
+                }).round(2),
+                use_container_width=True,
+                hide_index=True
+            )
+
     # ✅ Top 5 corrigido (usa HealthScore)
     st.divider()
     colA, colB = st.columns(2)
@@ -242,6 +291,49 @@ def render_results(analysis):
     ai_insights.render(analysis)
 
 
+def render_breakdown(group_col: str, df_groups: pd.DataFrame):
+    """Renderiza os resultados segmentados por uma coluna demográfica."""
+    st.divider()
+    st.subheader(f"👥 Resultados por {group_col}")
+
+    if df_groups.empty:
+        st.info(f"Nenhum grupo com pelo menos {MIN_GROUP_SIZE} respondentes.")
+        return
+
+    st.caption(
+        f"Grupos com menos de {MIN_GROUP_SIZE} respondentes são omitidos para preservar o anonimato."
+    )
+
+    heatmap = df_groups.pivot(index='escala', columns='grupo', values='media')
+    fig = px.imshow(
+        heatmap,
+        color_continuous_scale='RdYlGn',
+        zmin=0,
+        zmax=100,
+        text_auto='.0f',
+        aspect='auto',
+        title='Média por escala e grupo (0-100)'
+    )
+    fig.update_layout(height=max(500, len(heatmap) * 25), xaxis_title="", yaxis_title="")
+    st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("📋 Médias, intervalos de confiança (95%) e semáforo"):
+        st.dataframe(
+            df_groups.rename(columns={
+                'grupo': group_col,
+                'escala': 'Escala',
+                'media': 'Média',
+                'ic_inferior': 'IC 95% (inf.)',
+                'ic_superior': 'IC 95% (sup.)',
+                'pct_verde': '% Verde',
+                'pct_amarelo': '% Amarelo',
+                'pct_vermelho': '% Vermelho'
+            }).round(1),
+            use_container_width=True,
+            hide_index=True
+        )
+
+
 # --- Interface Principal ---
 ui.render_header(
     "📈 COPSOQ III",
@@ -275,10 +367,12 @@ errors = []
 file_format = "unknown"
 relevant_cols = []
 nome_analise = None
+group_col = None
+compute_reliability = False
 
 if uploaded_file:
     with st.spinner("A ler o arquivo..."):
-        df, warnings, errors = FileValidator.read_file_robust(uploaded_file)
+        df, warnings, errors = read_file_cached(uploaded_file)
 
     # Mostra avisos e erros de leitura
     for warning in warnings:
@@ -363,6 +457,27 @@ if uploaded_file:
             f"COPSOQ III - {uploaded_file.name.split('.')[0]}"
         )
 
+        # Segmentação por coluna demográfica (apenas para respostas brutas)
+        if file_format == "raw_responses":
+            demographic_cols = [
+                c for c in df.columns
+                if c not in relevant_cols and df[c].nunique(dropna=True) <= MAX_GROUPS
+            ]
+            if demographic_cols:
+                group_choice = st.selectbox(
+                    "Segmentar resultados por",
+                    ["Nenhuma"] + demographic_cols,
+                    key="copsoq3_group_col",
+                    help=f"Grupos com menos de {MIN_GROUP_SIZE} respondentes são omitidos para preservar o anonimato"
+                )
+                group_col = None if group_choice == "Nenhuma" else group_choice
+
+            compute_reliability = st.checkbox(
+                "Calcular fiabilidade (alfa de Cronbach) e intervalos de confiança bootstrap",
+                key="copsoq3_reliability",
+                help="1.000 reamostragens por escala; recomendado para relatórios de conformidade"
+            )
+
 # Botão de análise (com key e width="stretch")
 if st.button("🚀 Executar Análise COPSOQ III", type="primary", key="btn_run_copsoq3", width="stretch"):
     with st.spinner("A processar questionários COPSOQ III..."):
@@ -408,6 +523,15 @@ if st.button("🚀 Executar Análise COPSOQ III", type="primary", key="btn_run_c
                 # Processa respostas brutas (usa processador normal)
                 analysis_result = processor.process(data=df, name=nome_analise)
 
+            if compute_reliability and file_format == "raw_responses":
+                df_reliability = processor.reliability(df, n_resamples=1000)
+                analysis_result.metadata['fiabilidade'] = df_reliability.round(4).to_dict('records')
+
+            # Resultados segmentados (médias, IC 95% e semáforo por grupo)
+            st.session_state.copsoq3_breakdown = None
+            if group_col and file_format == "raw_responses":
+                st.session_state.copsoq3_breakdown = (group_col, processor.aggregate_by(df, group_col))
+
             st.session_state.latest_analysis = analysis_result
             st.session_state.analysis_ready = True
 
@@ -424,9 +548,106 @@ if st.button("🚀 Executar Análise COPSOQ III", type="primary", key="btn_run_c
             st.error(f"❌ Erro inesperado ao processar: {e}")
             st.exception(e)
 
+# --- Recolha contínua (campanhas online) ---
+def show_stream_result(stream: COPSOQStreamAggregator):
+    """Mostra o resultado acumulado e atualiza a sua análise salva (sempre a mesma entrada)."""
+    try:
+        analysis_result = stream.result()
+    except ValueError as e:
+        st.info(f"ℹ️ Resultados disponíveis a partir de 5 respostas acumuladas ({e})")
+        return
+    analysis_result.id = STREAM_ANALYSIS_ID
+    st.session_state.latest_analysis = analysis_result
+    st.session_state.analysis_ready = True
+    st.session_state.copsoq3_breakdown = None
+    try:
+        storage.save_analysis(analysis_result)
+    except Exception as e:
+        st.warning(f"Resultado calculado, mas não foi possível salvar: {e}")
+
+
+st.divider()
+st.subheader("📡 Recolha Contínua")
+st.caption(
+    "Acumula lotes de respostas brutas (ex.: exportações periódicas de um formulário online): "
+    "cada lote é pontuado uma única vez e somado aos anteriores, sem reprocessar as respostas já recebidas."
+)
+
+try:
+    stream = COPSOQStreamAggregator.load(STREAM_STATE_PATH, processor)
+except ValueError as e:
+    st.error(f"❌ {e}")
+    stream = None
+
+if stream is None or not stream.n_responses:
+    st.info("Nenhum lote incorporado. Carregue um arquivo de respostas brutas e adicione-o à recolha.")
+else:
+    st.write(
+        f"**{stream.n_responses}** respostas em **{len(stream.batch_ids)}** lote(s)"
+        + (f" · segmentação por **{stream.group_col}**" if stream.group_col else "")
+    )
+
+col_add, col_view, col_reset = st.columns(3)
+if col_add.button(
+    "➕ Adicionar arquivo à recolha",
+    key="btn_copsoq3_stream_add",
+    disabled=df is None or file_format != "raw_responses",
+    width="stretch"
+):
+    try:
+        stream = add_batch(
+            STREAM_STATE_PATH,
+            df.copy(),
+            batch_id=hashlib.sha256(uploaded_file.getvalue()).hexdigest(),
+            group_col=group_col,
+            processor=processor
+        )
+        st.success(f"✅ Lote adicionado: {stream.n_responses} respostas acumuladas")
+        show_stream_result(stream)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+
+if col_view.button(
+    "📊 Ver resultados acumulados",
+    key="btn_copsoq3_stream_view",
+    disabled=stream is None or not stream.n_responses,
+    width="stretch"
+):
+    show_stream_result(stream)
+
+if col_reset.button(
+    "🗑️ Reiniciar recolha",
+    key="btn_copsoq3_stream_reset",
+    disabled=not STREAM_STATE_PATH.exists(),
+    width="stretch"
+):
+    reset_stream(STREAM_STATE_PATH)
+    st.rerun()
+
+if stream is not None and stream.group_col:
+    with st.expander(f"👥 Resultados acumulados por {stream.group_col}"):
+        df_stream_groups = stream.group_stats()
+        df_stream_groups = df_stream_groups[df_stream_groups['grupo'] != TOTAL_GROUP]
+        if df_stream_groups.empty:
+            st.info(f"Nenhum grupo com pelo menos {MIN_GROUP_SIZE} respondentes.")
+        else:
+            st.dataframe(
+                df_stream_groups.rename(columns={
+                    'grupo': stream.group_col,
+                    'escala': 'Escala',
+                    'media': 'Média',
+                    'desvio_padrao': 'Desvio Padrão'
+                }).round(1),
+                use_container_width=True,
+                hide_index=True
+            )
+
 # --- Renderização de Resultados ---
 if 'latest_analysis' in st.session_state and st.session_state.latest_analysis is not None:
     if st.session_state.latest_analysis.type == ANALYSIS_TYPE_FOR_THIS_PAGE:
         if st.session_state.get('analysis_ready', False):
             st.divider()
             render_results(st.session_state.latest_analysis)
+
+            if st.session_state.get('copsoq3_breakdown'):
+                render_breakdown(*st.session_state.copsoq3_breakdown)
@@ -116,6 +116,16 @@ def render_results(analysis):
     # CORREÇÃO: Exibir nível de risco corretamente
     risk_level, risk_color, risk_text = get_risk_info(overall)
     st.markdown(f"**Nível de Risco:** <span style='color: {risk_color}; font-weight: bold;'>{risk_text}</span>", unsafe_allow_html=True)
+
+    # Análises em lote: média dos respondentes e distribuição individual do risco
+    if 'n_respondents' in analysis.metadata:
+        distribuicao = analysis.metadata.get('distribuicao_risco', {})
+        st.caption(
+            f"Média de {analysis.metadata['n_respondents']} respondentes — "
+            + ", ".join(f"{nivel}: {total}" for nivel, total in distribuicao.items())
+        )
+        if analysis.metadata.get('respostas_nao_reconhecidas'):
+            st.warning(f"{analysis.metadata['respostas_nao_reconhecidas']} respostas não reconhecidas foram ignoradas.")
     
     # Dimensões do burnout
     st.subheader("📈 Dimensões do Esgotamento")
@@ -175,6 +185,42 @@ if submitted:
         except Exception as e:
             st.warning(f"Análise calculada, mas não foi possível salvar: {e}")
 
+# --- Pontuação em lote (exportações de ferramentas de formulários) ---
+with st.expander("📥 Pontuar exportação em lote (CSV/Excel)"):
+    st.caption(
+        "Uma linha por respondente. Os cabeçalhos podem ser o texto das questões ou Q1..Q19 "
+        "(pela ordem do questionário)."
+    )
+    uploaded_batch = st.file_uploader("Arquivo de respostas", type=['csv', 'xlsx', 'xls'], key="cbi_batch_file")
+    nome_lote = st.text_input("Nome da análise em lote:", f"Esgotamento-Lote-{datetime.now().strftime('%Y%m%d-%H%M')}")
+
+    if uploaded_batch and st.button("Pontuar arquivo", type="primary"):
+        from utils.dataset_cache import read_file_cached
+
+        with st.spinner("A pontuar respondentes..."):
+            df_batch, _, errors_batch = read_file_cached(uploaded_batch)
+            if df_batch is None or errors_batch:
+                st.error(f"Não foi possível ler o arquivo: {'; '.join(errors_batch or [])}")
+            else:
+                try:
+                    analysis_result = processor.process_batch(nome_lote, df_batch)
+                    st.session_state.latest_analysis = analysis_result
+                    st.session_state.cbi_respondentes = processor.score_respondents(df_batch)
+                    storage.save_analysis(analysis_result)
+                    st.success(f"✅ {analysis_result.metadata['n_respondents']} respondentes pontuados e análise salva!")
+                except ValueError as e:
+                    st.error(str(e))
+
+    if st.session_state.get('cbi_respondentes') is not None:
+        df_respondentes = st.session_state.cbi_respondentes
+        st.dataframe(df_respondentes.round(1), use_container_width=True)
+        st.download_button(
+            "⬇️ Descarregar resultados por respondente (CSV)",
+            df_respondentes.to_csv(index=True).encode('utf-8'),
+            file_name="cbi_resultados_respondentes.csv",
+            mime="text/csv"
+        )
+
 # --- Lógica de Exibição de Resultados ---
 if 'latest_analysis' in st.session_state and st.session_state.latest_analysis is not None:
     if st.session_state.latest_analysis.type == ANALYSIS_TYPE_FOR_THIS_PAGE:
@@ -73,7 +73,7 @@ def render_results(analysis):
     with col1:
         ui.render_metric_card(
             "Trabalhar Excessivamente",
-            f"{excessive}/20",
+            f"{excessive:g}/20",
             icon="🏃",
             color=analysis.risk_level.color,
             help_text="Mede quanto tempo você dedica ao trabalho"
@@ -92,7 +92,7 @@ def render_results(analysis):
     with col2:
         ui.render_metric_card(
             "Trabalhar Compulsivamente",
-            f"{compulsive}/20",
+            f"{compulsive:g}/20",
             icon="🧠",
             color=analysis.risk_level.color,
             help_text="Mede obsessão e dificuldade em se desligar"
@@ -286,6 +286,55 @@ with st.form(key="duwas_form"):
                     st.error(f"❌ Erro inesperado: {e}")
                     st.exception(e)
 
+# --- Pontuação em lote ---
+with st.expander("📥 Pontuar respostas em lote (CSV/Excel)"):
+    st.caption(
+        "Uma linha por respondente, com as colunas Q1..Q8 (4 itens de cada subescala) "
+        "e respostas em texto ou de 1 a 4."
+    )
+    uploaded_batch = st.file_uploader("Arquivo de respostas", type=['csv', 'xlsx', 'xls'], key="duwas_batch_file")
+
+    if uploaded_batch:
+        from utils.dataset_cache import read_file_cached
+
+        df_batch, _, errors_batch = read_file_cached(uploaded_batch)
+        if df_batch is None or errors_batch:
+            st.error(f"Não foi possível ler o arquivo: {'; '.join(errors_batch or [])}")
+        else:
+            group_options = ["(nenhum)"] + [str(c) for c in df_batch.columns if not str(c).upper().startswith('Q')]
+            group_choice = st.selectbox("Agrupar por", group_options, key="duwas_batch_group")
+            group_col = None if group_choice == "(nenhum)" else group_choice
+            nome_lote = st.text_input("Nome da análise em lote", f"Workaholism - Lote {uploaded_batch.name}")
+
+            if st.button("Pontuar arquivo", type="primary", key="duwas_batch_run"):
+                try:
+                    with st.spinner("A pontuar respondentes..."):
+                        batch_result = processor.process_batch(nome_lote, df_batch, group_col)
+                        respondentes = processor.score_respondents(df_batch, group_col)
+                    storage.save_analysis(batch_result)
+                    st.session_state.duwas_lote = {
+                        'analysis': batch_result,
+                        'respondentes': respondentes,
+                        'grupos': processor.summarize_groups(respondentes, group_col)
+                    }
+                    st.success(f"✅ {batch_result.metadata['n_respondents']} respondentes pontuados e análise salva!")
+                except ValueError as e:
+                    st.error(str(e))
+
+    lote = st.session_state.get('duwas_lote')
+    if lote:
+        quadrantes = lote['analysis'].metadata['quadrantes']
+        cols = st.columns(len(quadrantes))
+        for col, (quadrante, total) in zip(cols, quadrantes.items()):
+            col.metric(quadrante, total)
+        st.dataframe(lote['grupos'].round(1), use_container_width=True)
+        st.download_button(
+            "⬇️ Descarregar resultados por respondente (CSV)",
+            lote['respondentes'].to_csv(index=True).encode('utf-8'),
+            file_name="duwas_resultados_respondentes.csv",
+            mime="text/csv"
+        )
+
 # --- Renderização de Resultados ---
 if 'latest_analysis' in st.session_state and st.session_state.latest_analysis is not None:
     if st.session_state.latest_analysis.type == ANALYSIS_TYPE_FOR_THIS_PAGE:
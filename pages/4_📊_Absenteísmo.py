@@ -3,6 +3,8 @@
 # Responsabilidade: Interface para análise de absentismo com Fator de Bradford.
 
 import streamlit as st
+import pandas as pd
+import plotly.express as px
 import sys
 import os
 from datetime import date, datetime
@@ -19,9 +21,11 @@ from logic.absenteeism_processor import AbsenteeismProcessor
 from models.enums import AnalysisType
 from services.storage import get_persistent_storage
 from services.api_client import APIClient
+from config.feriados import UFS
 
 try:
     from utils.file_validators import FileValidator, ColumnMapper
+    from utils.dataset_cache import read_file_cached
     from utils.validators import DataValidator
 except ImportError:
     st.error("⚠️ Módulo utils.file_validators não encontrado.")
@@ -95,6 +99,12 @@ def render_results(analysis):
             icon="⚡"
         )
     
+    feriados = analysis.metadata.get('feriados_periodo', [])
+    if feriados:
+        with st.expander(f"📅 {len(feriados)} feriado(s) descontado(s) dos dias úteis"):
+            for dia, nome in feriados:
+                st.write(f"{dia.strftime('%d/%m/%Y')} - {nome}")
+    
     # Insights
     if analysis.insights:
         st.subheader("💡 Insights Automáticos")
@@ -157,6 +167,33 @@ def render_results(analysis):
                 st.error(f"❌ Erro ao exportar: {e}")
 
 
+def render_trend(df_trend):
+    """Renderiza a tendência multi-período (taxa e Bradford por janela)."""
+    st.subheader("📈 Tendência de Absentismo")
+    
+    fig = px.line(
+        df_trend,
+        x='periodo_inicio',
+        y='taxa_absentismo',
+        markers=True,
+        title="Taxa de Absentismo por Período (%)"
+    )
+    fig.update_layout(xaxis_title="", yaxis_title="Taxa (%)", height=400)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    fig = px.bar(
+        df_trend,
+        x='periodo_inicio',
+        y='fator_bradford_medio',
+        title="Fator Bradford Médio por Período"
+    )
+    fig.update_layout(xaxis_title="", yaxis_title="Bradford", height=350)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("📋 Tabela da Tendência"):
+        st.dataframe(df_trend, use_container_width=True, hide_index=True)
+
+
 # Interface Principal
 ui.render_header("📊 Análise de Absentismo", "Cálculo da taxa de absentismo e Fator de Bradford")
 
@@ -168,8 +205,15 @@ uploaded_file = st.file_uploader(
 )
 
 if uploaded_file:
+    # Arquivos grandes: lê só uma amostra agora e processa em blocos na análise
+    streaming = FileValidator.should_stream(uploaded_file)
+    
     with st.spinner("📖 Lendo arquivo..."):
-        df, warnings, errors = FileValidator.read_file_robust(uploaded_file)
+        if streaming:
+            preview_chunks, warnings, errors = FileValidator.read_file_chunked(uploaded_file, chunksize=1000)
+            df = next(iter(preview_chunks), None) if preview_chunks is not None else None
+        else:
+            df, warnings, errors = read_file_cached(uploaded_file)
     
     for warning in warnings:
         st.warning(warning)
@@ -178,6 +222,8 @@ if uploaded_file:
     
     if df is not None:
         st.success(f"✅ Arquivo lido com sucesso!")
+        if streaming:
+            st.info("📦 Arquivo grande: a análise será feita em blocos para limitar o uso de memória")
         
         with st.expander("👁️ Pré-visualização"):
             st.dataframe(df.head(10), use_container_width=True)
@@ -220,7 +266,11 @@ if uploaded_file:
         st.divider()
         st.subheader("2️⃣ Parâmetros de Análise")
         
-        period_option = st.selectbox("Selecione o Período", ["Mês Específico", "Período Personalizado"])
+        period_option = st.selectbox(
+            "Selecione o Período",
+            ["Mês Específico", "Período Personalizado", "Tendência (vários períodos)"]
+        )
+        trend_frequency = None
         
         if period_option == "Mês Específico":
             col1, col2 = st.columns(2)
@@ -241,12 +291,20 @@ if uploaded_file:
             
             start_date = date(selected_year, selected_month_num, 1)
             end_date = date(selected_year, selected_month_num, calendar.monthrange(selected_year, selected_month_num)[1])
-        else:
+        elif period_option == "Período Personalizado":
             col1, col2 = st.columns(2)
             with col1:
                 start_date = st.date_input("Início do Período", date.today().replace(day=1))
             with col2:
                 end_date = st.date_input("Fim do Período", date.today())
+        else:
+            col1, col2, col_freq = st.columns(3)
+            with col1:
+                start_date = st.date_input("Início da Tendência", date.today().replace(year=date.today().year - 1, day=1))
+            with col2:
+                end_date = st.date_input("Fim da Tendência", date.today())
+            with col_freq:
+                trend_frequency = st.selectbox("Janela", ["mensal", "trimestral", "anual"])
         
         col3, col4 = st.columns(2)
         
@@ -263,6 +321,22 @@ if uploaded_file:
                 list(BENCHMARK_ABSENTISMO.keys())
             )
         
+        col5, col6 = st.columns(2)
+        
+        with col5:
+            uf = st.selectbox(
+                "UF (feriados estaduais)",
+                ["Nenhuma"] + UFS,
+                help="Feriados nacionais são sempre descontados dos dias úteis"
+            )
+        
+        with col6:
+            municipio = st.text_input(
+                "Município (feriados municipais)",
+                "",
+                disabled=(uf == "Nenhuma")
+            )
+        
         nome_analise = st.text_input(
             "Nome da Análise",
             f"Absentismo - {start_date.strftime('%b %Y')}"
@@ -272,7 +346,9 @@ if uploaded_file:
         
         if st.button("🚀 Executar Análise", type="primary", use_container_width=True):
             validations = [
-                DataValidator.validate_date_range(start_date, end_date, max_days=730),
+                DataValidator.validate_date_range(
+                    start_date, end_date, max_days=3660 if trend_frequency else 730
+                ),
                 DataValidator.validate_employee_count(total_emp, min_val=1, max_val=100000)
             ]
             
@@ -282,19 +358,62 @@ if uploaded_file:
                 st.error("❌ Erros de validação:")
                 for error in validation_errors:
                     st.error(f"  • {error}")
+            elif trend_frequency:
+                with st.spinner("⚙️ Calculando tendência..."):
+                    try:
+                        trend_args = dict(
+                            periods=processor.build_periods(start_date, end_date, trend_frequency),
+                            total_employees=total_emp,
+                            column_mapping=column_mapping,
+                            uf=None if uf == "Nenhuma" else uf,
+                            municipio=municipio or None
+                        )
+                        
+                        if streaming:
+                            # Só as colunas mapeadas (já tipadas) das ausências do intervalo ficam em memória
+                            chunks, _, read_errors = FileValidator.read_file_chunked(
+                                uploaded_file,
+                                usecols=list(column_mapping),
+                                dtype=FileValidator.build_dtype_hints(column_mapping)
+                            )
+                            if chunks is None:
+                                raise ValueError('; '.join(read_errors))
+                            trend = processor.process_periods_chunks(chunks=chunks, **trend_args)
+                        else:
+                            trend = processor.process_periods(df=df, **trend_args)
+                        
+                        st.session_state.absenteeism_trend = trend
+                    except ValueError as e:
+                        st.error(f"❌ Erro: {e}")
+                    except Exception as e:
+                        st.error(f"❌ Erro inesperado: {e}")
+                        st.exception(e)
             else:
                 with st.spinner("⚙️ Processando..."):
                     try:
-                        analysis_result = processor.process(
-                            df=df,
+                        process_args = dict(
                             name=nome_analise,
                             period_start=start_date,
                             period_end=end_date,
                             total_employees=total_emp,
                             setor=setor,
-                            column_mapping=column_mapping
+                            column_mapping=column_mapping,
+                            uf=None if uf == "Nenhuma" else uf,
+                            municipio=municipio or None
                         )
                         
+                        if streaming:
+                            chunks, _, read_errors = FileValidator.read_file_chunked(
+                                uploaded_file,
+                                usecols=list(column_mapping),
+                                dtype=FileValidator.build_dtype_hints(column_mapping)
+                            )
+                            if chunks is None:
+                                raise ValueError('; '.join(read_errors))
+                            analysis_result = processor.process_chunks(chunks=chunks, **process_args)
+                        else:
+                            analysis_result = processor.process(df=df, **process_args)
+                        
                         st.session_state.latest_analysis = analysis_result
                         st.session_state.analysis_ready = True
                         
@@ -311,6 +430,10 @@ if uploaded_file:
                         st.exception(e)
 
 # Renderização de Resultados
+if st.session_state.get('absenteeism_trend') is not None:
+    st.divider()
+    render_trend(st.session_state.absenteeism_trend)
+
 if 'latest_analysis' in st.session_state and st.session_state.latest_analysis is not None:
     if st.session_state.latest_analysis.type == ANALYSIS_TYPE_FOR_THIS_PAGE:
         if st.session_state.get('analysis_ready', False):
@@ -245,7 +245,7 @@ if modo_entrada == "📂 Importar Arquivo":
     
     if uploaded_admissoes or uploaded_demissoes:
         try:
-            from utils.file_validators import FileValidator
+            from utils.dataset_cache import read_file_cached
             
             admissoes_count = 0
             demissoes_count = 0
@@ -253,7 +253,7 @@ if modo_entrada == "📂 Importar Arquivo":
             # Processa arquivo de admissões
             if uploaded_admissoes:
                 with st.spinner("A ler arquivo de admissões..."):
-                    df_adm, warnings_adm, errors_adm = FileValidator.read_file_robust(uploaded_admissoes)
+                    df_adm, warnings_adm, errors_adm = read_file_cached(uploaded_admissoes)
                 
                 if df_adm is not None and not df_adm.empty:
                     df_adm = df_adm.dropna(how='all')
@@ -266,7 +266,7 @@ if modo_entrada == "📂 Importar Arquivo":
             # Processa arquivo de demissões
             if uploaded_demissoes:
                 with st.spinner("A ler arquivo de demissões..."):
-                    df_dem, warnings_dem, errors_dem = FileValidator.read_file_robust(uploaded_demissoes)
+                    df_dem, warnings_dem, errors_dem = read_file_cached(uploaded_demissoes)
                 
                 if df_dem is not None and not df_dem.empty:
                     df_dem = df_dem.dropna(how='all')
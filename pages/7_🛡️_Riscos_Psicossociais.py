@@ -3,6 +3,8 @@ import pandas as pd
 from datetime import datetime
 import json
 
+from models.instrument import InstrumentDefinition
+
 # --- 1. CONFIGURAÇÃO INICIAL DA PÁGINA E ESTILOS ---
 st.set_page_config(page_title="COPSOQ III - Riscos Psicossociais", page_icon="🛡️", layout="wide")
 
@@ -172,6 +174,19 @@ for cod in QUESTOES.keys():
     else:
         ESCALAS_POR_QUESTAO[cod] = ESCALA_NUNCA_SEMPRE
 
+# Definição declarativa do questionário: cada resposta vale a sua posição na escala (0 a 4)
+COPSOQ_III_DEFINICAO = InstrumentDefinition.from_dimensions(
+    "COPSOQ III",
+    DIMENSOES_COPSOQ,
+    scale_min=0,
+    scale_max=4,
+    item_responses={
+        cod: {rotulo: posicao for posicao, rotulo in enumerate(escala)}
+        for cod, escala in ESCALAS_POR_QUESTAO.items()
+    }
+)
+COPSOQ_III_KERNEL = COPSOQ_III_DEFINICAO.compile()
+
 # --- 5. FUNÇÕES DE CÁLCULO ---
 def calcular_nivel_risco(prob, sev):
     """Calcula o nível de risco com base na probabilidade e severidade."""
@@ -187,22 +202,11 @@ def calcular_nivel_risco(prob, sev):
 
 def calcular_scores_dimensoes(respostas):
     """Calcula os scores de 0 a 100 para cada dimensão do COPSOQ."""
-    scores = {}
-    for dimensao, codigos in DIMENSOES_COPSOQ.items():
-        valores = []
-        for cod in codigos:
-            if cod in respostas and respostas[cod] is not None:
-                escala = ESCALAS_POR_QUESTAO[cod]
-                if respostas[cod] in escala:
-                    valor = escala.index(respostas[cod])
-                    valores.append(valor)
-        if valores:
-            media = sum(valores) / len(valores)
-            score_100 = (media / 4) * 100
-            scores[dimensao] = round(score_100, 1)
-        else:
-            scores[dimensao] = None
-    return scores
+    pontuacoes = COPSOQ_III_KERNEL.score_one(respostas)
+    return {
+        dimensao: round(pontuacoes[dimensao], 1) if dimensao in pontuacoes else None
+        for dimensao in DIMENSOES_COPSOQ
+    }
 
 # --- 6. LAYOUT DA INTERFACE (ABAS) ---
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
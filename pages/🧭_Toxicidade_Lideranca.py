@@ -17,6 +17,8 @@ from config.questionario_toxicidade import (
     criar_questionario_toxicidade, ESCALA_LIKERT, obter_interpretacao
 )
 from logic.toxicidade_logic import GerenciadorAvaliacaoToxicidade
+from logic.toxicidade_agregacao import MIN_AVALIADORES
+from logic.toxicidade_export import FORMATOS_EXPORTACAO
 
 
 # ============================================================================
@@ -453,11 +455,18 @@ def renderizar_questionario(questionario):
             departamento = st.text_input("Departamento (opcional)", key="participante_dept")
             tempo_empresa = st.text_input("Tempo na empresa (opcional)", key="participante_tempo")
         
-        if any([nome, cargo, departamento, tempo_empresa]):
+        lider = st.text_input(
+            "Liderança avaliada (opcional)",
+            key="participante_lider",
+            help="Permite agregar as avaliações de vários avaliadores do mesmo líder (360°)"
+        )
+        
+        if any([nome, cargo, departamento, tempo_empresa, lider]):
             st.session_state.dados_participante = {
                 "nome": nome,
                 "cargo": cargo,
                 "departamento": departamento,
+                "lider": lider,
                 "tempo_empresa": tempo_empresa,
                 "data_preenchimento": datetime.now().isoformat()
             }
@@ -829,17 +838,18 @@ def renderizar_resultados(resultado, gerenciador):
                 st.error(f"❌ Erro ao salvar: {str(e)}")
     
     with col2:
-        if st.button("📥 Exportar JSON", use_container_width=True):
-            try:
-                caminho = gerenciador.exportar_resultados(formato="json")
-                st.success(f"✅ Exportado para:\n`{caminho}`")
-            except Exception as e:
-                st.error(f"❌ Erro: {str(e)}")
+        formato_exportacao = st.selectbox(
+            "Formato de exportação",
+            list(FORMATOS_EXPORTACAO),
+            format_func=str.upper,
+            label_visibility="collapsed"
+        )
     
     with col3:
-        if st.button("📊 Exportar CSV", use_container_width=True):
+        if st.button("📥 Exportar Avaliações", use_container_width=True):
             try:
-                caminho = gerenciador.exportar_resultados(formato="csv")
+                # Escrita em lotes diretamente para o disco (memória constante)
+                caminho = gerenciador.exportar_resultados(formato=formato_exportacao)
                 st.success(f"✅ Exportado para:\n`{caminho}`")
             except Exception as e:
                 st.error(f"❌ Erro: {str(e)}")
@@ -862,9 +872,7 @@ def renderizar_historico(gerenciador):
     
     st.markdown("### 📚 Histórico de Avaliações")
     
-    avaliacoes = gerenciador.listar_avaliacoes()
-    
-    if not avaliacoes:
+    if not gerenciador.contar_avaliacoes():
         st.info("📭 Nenhuma avaliação registrada ainda.")
         st.markdown("""
         **Comece agora:**
@@ -934,29 +942,41 @@ def renderizar_historico(gerenciador):
         )
     
     with col_filtro2:
-        limite_exibir = st.slider("Número de resultados", 5, 50, 10)
+        # Só lideranças com avaliadores suficientes: filtrar uma com 1 avaliação identificá-la-ia
+        filtro_lider = st.selectbox(
+            "Filtrar por Liderança",
+            ["Todas"] + gerenciador.agregador.listar("lider"),
+            help=f"Apenas lideranças com pelo menos {MIN_AVALIADORES} avaliadores"
+        )
     
     with col_filtro3:
         ordem = st.radio("Ordenar por", ["Mais Recente", "Mais Antigo", "Maior Pontuação", "Menor Pontuação"], horizontal=True)
     
-    # Aplica filtros
-    avaliacoes_filtradas = avaliacoes
-    
-    if filtro_nivel != "Todos":
-        avaliacoes_filtradas = [a for a in avaliacoes if a['nivel_risco_geral'] == filtro_nivel]
-    
-    # Aplica ordenação
-    if ordem == "Mais Recente":
-        avaliacoes_filtradas = sorted(avaliacoes_filtradas, key=lambda x: x['timestamp'], reverse=True)
-    elif ordem == "Mais Antigo":
-        avaliacoes_filtradas = sorted(avaliacoes_filtradas, key=lambda x: x['timestamp'])
-    elif ordem == "Maior Pontuação":
-        avaliacoes_filtradas = sorted(avaliacoes_filtradas, key=lambda x: x['pontuacao_total'], reverse=True)
-    else:
-        avaliacoes_filtradas = sorted(avaliacoes_filtradas, key=lambda x: x['pontuacao_total'])
-    
-    # Limita quantidade
-    avaliacoes_exibir = avaliacoes_filtradas[:limite_exibir]
+    col_pag1, col_pag2 = st.columns(2)
+    
+    with col_pag1:
+        tamanho_pagina = st.selectbox("Avaliações por página", [10, 25, 50])
+    
+    with col_pag2:
+        pagina = st.number_input("Página", min_value=1, value=1, step=1)
+    
+    ordenar_por, ordem_reversa = {
+        "Mais Recente": ("timestamp", True),
+        "Mais Antigo": ("timestamp", False),
+        "Maior Pontuação": ("pontuacao_total", True),
+        "Menor Pontuação": ("pontuacao_total", False)
+    }[ordem]
+    
+    # Só as avaliações da página são lidas do disco
+    resultado_pagina = gerenciador.paginar_avaliacoes(
+        pagina=int(pagina),
+        tamanho_pagina=tamanho_pagina,
+        nivel_risco=None if filtro_nivel == "Todos" else filtro_nivel,
+        lider=None if filtro_lider == "Todas" else filtro_lider,
+        ordenar_por=ordenar_por,
+        ordem_reversa=ordem_reversa
+    )
+    avaliacoes_exibir = resultado_pagina["avaliacoes"]
     
     # Cria DataFrame
     if avaliacoes_exibir:
@@ -973,9 +993,69 @@ def renderizar_historico(gerenciador):
         
         st.dataframe(df, use_container_width=True, hide_index=True)
         
-        st.caption(f"Exibindo {len(avaliacoes_exibir)} de {len(avaliacoes_filtradas)} avaliações filtradas")
+        st.caption(
+            f"Página {resultado_pagina['pagina']} de {resultado_pagina['total_paginas']} · "
+            f"Exibindo {len(avaliacoes_exibir)} de {resultado_pagina['total']} avaliações filtradas"
+        )
     else:
         st.info("Nenhuma avaliação corresponde aos filtros selecionados.")
+    
+    renderizar_perfis_360(gerenciador)
+
+
+def renderizar_perfis_360(gerenciador):
+    """Renderiza o perfil agregado (360°) de um líder ou unidade"""
+    
+    st.markdown("---")
+    st.markdown("#### 🧑‍💼 Perfis 360° por Liderança")
+    
+    tipo_label = st.radio("Agregar por", ["Liderança", "Unidade"], horizontal=True, key="perfil_360_tipo")
+    tipo = "lider" if tipo_label == "Liderança" else "unidade"
+    
+    resumo = gerenciador.listar_liderancas(tipo)
+    if not resumo:
+        st.info("Nenhuma avaliação identifica a liderança ou a unidade avaliada.")
+        return
+    
+    def rotulo(linha: dict) -> str:
+        # Sem avaliadores suficientes a pontuação fica oculta (resumo já a devolve como None)
+        if linha['media_total'] is None:
+            return f"{linha['chave']} (🔒 menos de {MIN_AVALIADORES} avaliadores)"
+        return f"{linha['chave']} ({linha['n_avaliadores']} avaliadores, {linha['media_total']:.1f} pts)"
+    
+    rotulos = {linha['chave']: rotulo(linha) for linha in resumo}
+    chave = st.selectbox(
+        tipo_label,
+        list(rotulos),
+        format_func=rotulos.get,
+        key="perfil_360_chave"
+    )
+    perfil = gerenciador.obter_perfil_lideranca(chave, tipo)
+    if perfil is None:
+        return
+    
+    if not perfil['anonimato_garantido']:
+        st.warning(
+            f"🔒 Menos de {MIN_AVALIADORES} avaliadores. O perfil é mostrado "
+            f"a partir de {MIN_AVALIADORES} avaliadores para proteger o anonimato."
+        )
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Avaliadores", perfil['n_avaliadores'])
+    col2.metric("Média Geral", f"{perfil['media_total']:.1f}")
+    col3.metric("Nível de Risco", perfil['nivel_risco'])
+    
+    df_perfil = pd.DataFrame({
+        'Dimensão': list(perfil['medias_dimensoes'].keys()),
+        'Média': list(perfil['medias_dimensoes'].values()),
+        'Desvio Padrão': [perfil['desvios_dimensoes'][d] for d in perfil['medias_dimensoes']]
+    })
+    st.bar_chart(df_perfil.set_index('Dimensão')['Média'])
+    st.dataframe(df_perfil.round(1), use_container_width=True, hide_index=True)
+    
+    st.markdown("**Distribuição dos avaliadores por nível de risco**")
+    st.bar_chart(pd.Series(perfil['distribuicao_niveis_risco'], name='Avaliadores'))
 
 
 # ============================================================================
@@ -1099,15 +1179,26 @@ def renderizar_sobre():
 # FUNÇÃO PRINCIPAL
 # ============================================================================
 
+@st.cache_resource
+def obter_gerenciador() -> GerenciadorAvaliacaoToxicidade:
+    """
+    Gerenciador criado uma única vez e partilhado entre reruns e sessões.
+    
+    O índice das avaliações e os agregados ficam em memória e só leem do disco o que
+    foi gravado depois (por outra sessão ou processo).
+    """
+    return GerenciadorAvaliacaoToxicidade(criar_questionario_toxicidade())
+
+
 def main():
     """Função principal da aplicação"""
     
     # Inicializa session state
     inicializar_session_state()
     
-    # Cria questionário e gerenciador
-    questionario = criar_questionario_toxicidade()
-    gerenciador = GerenciadorAvaliacaoToxicidade(questionario)
+    # Gerenciador partilhado (e o seu questionário)
+    gerenciador = obter_gerenciador()
+    questionario = gerenciador.questionario
     
     # ========== SIDEBAR ==========
     with st.sidebar:
@@ -0,0 +1,320 @@
+# services/analysis_store.py
+# Responsabilidade: Armazenamento indexado das análises (metadados em SQLite, DataFrames em ficheiros Parquet).
+
+import dataclasses
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from models.analysis import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+DATABASE_NAME = "analyses.db"
+PAYLOADS_DIR_NAME = "analysis_payloads"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id          TEXT PRIMARY KEY,
+    type        TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    timestamp   TEXT NOT NULL,
+    risk_level  TEXT,
+    quality     TEXT,
+    record      BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_type_timestamp ON analyses (type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_analyses_timestamp ON analyses (timestamp);
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class PayloadRef:
+    """Referência a um DataFrame guardado fora do registo (nome do ficheiro na pasta da análise)."""
+    filename: str
+
+
+class LazyData(dict):
+    """
+    Dicionário `data` de uma análise carregada do armazenamento.
+
+    Os DataFrames ficam como PayloadRef até serem acedidos; depois de lidos do disco
+    ficam em memória. Todo o protocolo de mapeamento devolve os valores já lidos
+    (data[...], get, items, values, pop, dict(data), {**data}, data | outro, ==), pelo
+    que nenhum PayloadRef sai daqui. Listar análises e consultar os seus atributos
+    não lê nenhum payload.
+    """
+
+    def __init__(self, values: Dict[str, Any], payload_dir: Path):
+        super().__init__(values)
+        self._payload_dir = payload_dir
+
+    def _resolve(self, key: str) -> Any:
+        value = super().__getitem__(key)
+        if isinstance(value, PayloadRef):
+            value = _read_payload(self._payload_dir / value.filename)
+            super().__setitem__(key, value)
+        return value
+
+    def is_loaded(self, key: str) -> bool:
+        """Indica se o valor já está em memória (False para um DataFrame ainda por ler)."""
+        return not isinstance(super().__getitem__(key), PayloadRef)
+
+    def __getitem__(self, key):
+        return self._resolve(key)
+
+    def get(self, key, default=None):
+        return self._resolve(key) if key in self else default
+
+    def __iter__(self):
+        # Um __iter__ próprio faz dict(data) e {**data} usarem keys() + __getitem__
+        return super().__iter__()
+
+    def keys(self):
+        return super().keys()
+
+    def items(self):
+        return [(key, self._resolve(key)) for key in self]
+
+    def values(self):
+        return [self._resolve(key) for key in self]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self._resolve(key)
+            super().pop(key)
+            return value
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self._resolve(key)
+        return super().setdefault(key, default)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __or__(self, other):
+        return dict(self.items()) | other
+
+    def __ror__(self, other):
+        return other | dict(self.items())
+
+    def __reduce__(self):
+        # Ao serializar (pickle, deepcopy) os payloads são materializados num dict simples
+        return dict, (dict(self.items()),)
+
+
+def _payload_filename(key: str) -> str:
+    return hashlib.md5(str(key).encode("utf-8")).hexdigest()[:12]
+
+
+def _write_payload(directory: Path, key: str, df: pd.DataFrame) -> str:
+    """
+    Grava o DataFrame em Parquet (ou pickle, se não for compatível) e devolve o nome do ficheiro.
+
+    Cada gravação usa um nome novo: a versão anterior continua intacta (e referenciada
+    pelo registo em vigor) até ao commit do novo registo.
+    """
+    stem = f"{_payload_filename(key)}-{uuid.uuid4().hex[:8]}"
+    path = directory / f"{stem}.parquet"
+    tmp_path = path.with_suffix(".parquet.tmp")
+    try:
+        df.to_parquet(tmp_path)
+    except Exception as e:
+        # pyarrow ausente ou tipos não suportados (ex.: colunas de tipos mistos)
+        logger.info(f"Armazenamento: Parquet indisponível para '{key}' ({e}), a usar pickle")
+        tmp_path.unlink(missing_ok=True)
+        path = directory / f"{stem}.pkl"
+        tmp_path = path.with_suffix(".pkl.tmp")
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    return path.name
+
+
+def _read_payload(path: Path) -> pd.DataFrame:
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_pickle(path)
+
+
+class AnalysisStore:
+    """
+    Cada análise é um registo próprio: os campos pesquisáveis e o AnalysisResult sem
+    DataFrames ficam numa tabela SQLite, e cada DataFrame num ficheiro Parquet na pasta
+    da análise. Guardar uma análise escreve apenas os seus próprios dados (O(1) em relação
+    ao total guardado); a lista em memória só é recarregada quando outra ligação escreve.
+    """
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.database_path = self.storage_dir / DATABASE_NAME
+        self.payloads_dir = self.storage_dir / PAYLOADS_DIR_NAME
+
+        # O Streamlit partilha o singleton entre threads: uma ligação, protegida por lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.database_path, check_same_thread=False)
+        # WAL: leitores de outros processos não bloqueiam (nem são bloqueados por) uma gravação
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._cache: Optional[Dict[str, AnalysisResult]] = None
+        self._cache_version: Optional[int] = None
+
+    def _payload_dir(self, analysis_id: str) -> Path:
+        return self.payloads_dir / analysis_id
+
+    def _data_version(self) -> int:
+        # Muda sempre que outra ligação (outro processo) faz commit na base de dados
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _from_row(self, record: bytes) -> AnalysisResult:
+        analysis = pickle.loads(record)
+        analysis.data = LazyData(analysis.data, self._payload_dir(analysis.id))
+        return analysis
+
+    def _load_cache(self) -> Dict[str, AnalysisResult]:
+        version = self._data_version()
+        if self._cache is None or version != self._cache_version:
+            rows = self._conn.execute("SELECT record FROM analyses ORDER BY rowid")
+            self._cache = {}
+            for (record,) in rows:
+                try:
+                    analysis = self._from_row(record)
+                except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+                    logger.error(f"Registo de análise ilegível ignorado: {e}")
+                    continue
+                self._cache[analysis.id] = analysis
+            self._cache_version = version
+        return self._cache
+
+    def count(self) -> int:
+        """Número de análises guardadas."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def get_analyses(self, lazy: bool = True) -> List[AnalysisResult]:
+        """
+        Retorna as análises pela ordem em que foram guardadas.
+
+        Args:
+            lazy: Se True, os DataFrames só são lidos do disco quando acedidos
+
+        Returns:
+            Lista de AnalysisResult
+        """
+        with self._lock:
+            analyses = list(self._load_cache().values())
+        if not lazy:
+            for analysis in analyses:
+                analysis.data.values()
+        return analyses
+
+    def get_analysis(self, analysis_id: str) -> Optional[AnalysisResult]:
+        """Retorna uma análise pelo id (None se não existir)."""
+        with self._lock:
+            return self._load_cache().get(analysis_id)
+
+    def save_analysis(self, analysis_result: AnalysisResult):
+        """
+        Salva ou atualiza uma análise, escrevendo apenas os seus dados.
+
+        Os DataFrames são gravados em ficheiros novos antes do commit do registo e os da
+        versão anterior só são apagados depois dele: uma falha a meio deixa a versão
+        anterior completa.
+        """
+        with self._lock:
+            payload_dir = self._payload_dir(analysis_result.id)
+            source = analysis_result.data
+            # Payloads ainda por ler de uma análise já guardada mantêm o ficheiro existente
+            keep_refs = isinstance(source, LazyData) and source._payload_dir == payload_dir
+            data = {}
+            written = []
+            try:
+                for key, value in dict.items(source):
+                    if isinstance(value, PayloadRef) and not keep_refs:
+                        value = source[key]
+                    if isinstance(value, pd.DataFrame):
+                        payload_dir.mkdir(parents=True, exist_ok=True)
+                        value = PayloadRef(_write_payload(payload_dir, key, value))
+                        written.append(value.filename)
+                    data[key] = value
+
+                record = pickle.dumps(dataclasses.replace(analysis_result, data=data))
+                self._insert(analysis_result, record)
+            except BaseException:
+                # O registo anterior continua em vigor: os ficheiros desta tentativa não são usados
+                for filename in written:
+                    (payload_dir / filename).unlink(missing_ok=True)
+                raise
+
+            # Payloads da versão anterior (ou de gravações interrompidas) que deixaram de ser usados
+            referenced = {v.filename for v in data.values() if isinstance(v, PayloadRef)}
+            if payload_dir.exists():
+                for path in payload_dir.iterdir():
+                    if path.name not in referenced:
+                        path.unlink(missing_ok=True)
+
+            if self._cache is not None:
+                self._cache.pop(analysis_result.id, None)
+                self._cache[analysis_result.id] = self._from_row(record)
+
+    def _insert(self, analysis_result: AnalysisResult, record: bytes):
+        """Insere (ou substitui) a linha da análise numa transação."""
+        with self._conn:
+            # REPLACE volta a inserir a linha no fim: a ordem é a da última gravação
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses "
+                "(id, type, name, timestamp, risk_level, quality, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    analysis_result.id,
+                    analysis_result.type.name,
+                    analysis_result.name,
+                    analysis_result.timestamp.isoformat(),
+                    analysis_result.risk_level.name if analysis_result.risk_level else None,
+                    analysis_result.quality.name if analysis_result.quality else None,
+                    sqlite3.Binary(record)
+                )
+            )
+
+    def import_analyses(self, analyses: Iterable[AnalysisResult]) -> int:
+        """Importa análises (ex.: do antigo analyses.pkl). Retorna quantas foram importadas."""
+        imported = 0
+        for analysis in analyses:
+            self.save_analysis(analysis)
+            imported += 1
+        return imported
+
+    def clear(self):
+        """Remove todas as análises e os seus payloads."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM analyses")
+            if self.payloads_dir.exists():
+                shutil.rmtree(self.payloads_dir, ignore_errors=True)
+            self._cache = {}
+            self._cache_version = self._data_version()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
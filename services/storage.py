@@ -7,6 +7,7 @@ import logging
 import streamlit as st
 from typing import Optional, Any, Dict, List
 from models.analysis import AnalysisResult # Importa o modelo que criámos
+from services.analysis_store import AnalysisStore
 from services.storage_backup import auto_backup_on_save, StorageBackup
 
 # Configura o logger para este módulo
@@ -29,9 +30,21 @@ class PersistentStorage:
 
     def _load_all(self):
         """Carrega todos os dados do armazenamento ao iniciar."""
-        self.analyses = self._load_from_pickle(ANALYSES_FILE) or []
+        self.analysis_store = AnalysisStore(STORAGE_DIR)
+        self._migrate_analyses_pickle()
         self.pulse_surveys = self._load_from_pickle(PULSE_SURVEYS_FILE) or {}
 
+    def _migrate_analyses_pickle(self):
+        """Importa uma única vez o antigo analyses.pkl para o armazenamento indexado."""
+        if not os.path.exists(ANALYSES_FILE):
+            return
+        legacy = self._load_from_pickle(ANALYSES_FILE)
+        if legacy is None:
+            return
+        imported = self.analysis_store.import_analyses(legacy)
+        os.replace(ANALYSES_FILE, ANALYSES_FILE + ".migrado")
+        logger.info(f"{imported} análises migradas de {ANALYSES_FILE} para {self.analysis_store.database_path}")
+
     def _load_from_pickle(self, file_path: str) -> Optional[Any]:
         """Carrega dados de um ficheiro pickle com tratamento de erro robusto."""
         try:
@@ -54,20 +67,26 @@ class PersistentStorage:
         except Exception as e:
             logger.error(f"Falha ao salvar dados em {file_path}: {e}")
 
-    def get_analyses(self) -> List[AnalysisResult]:
-        """Retorna a lista de análises salvas."""
-        return self.analyses
+    @property
+    def analyses(self) -> List[AnalysisResult]:
+        return self.get_analyses()
+
+    def get_analyses(self, lazy: bool = True) -> List[AnalysisResult]:
+        """Retorna a lista de análises salvas (DataFrames lidos só quando acedidos, se lazy)."""
+        return self.analysis_store.get_analyses(lazy=lazy)
+
+    def get_analysis(self, analysis_id: str) -> Optional[AnalysisResult]:
+        """Retorna uma análise pelo id."""
+        return self.analysis_store.get_analysis(analysis_id)
 
     @auto_backup_on_save
     def save_analysis(self, analysis_result: AnalysisResult):
-        """Salva ou atualiza uma análise na lista."""
-        self.analyses = [a for a in self.analyses if a.id != analysis_result.id]
-        self.analyses.append(analysis_result)
-        self._save_to_pickle(self.analyses, ANALYSES_FILE)
+        """Salva ou atualiza uma análise (escreve apenas o registo e os DataFrames desta análise)."""
+        self.analysis_store.save_analysis(analysis_result)
 
     def clear_all(self):
         """Limpa todos os dados armazenados."""
-        self.analyses = []
+        self.analysis_store.clear()
         self.pulse_surveys = {}
         for file_path in [ANALYSES_FILE, PULSE_SURVEYS_FILE]:
             if os.path.exists(file_path):
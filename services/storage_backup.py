@@ -7,11 +7,15 @@ import os
 import shutil
 import pickle
 import json
+import sqlite3
+from contextlib import closing
 from pathlib import Path
 from datetime import datetime, timedelta
 import logging
 from typing import Optional, List, Dict
 
+from services.analysis_store import PAYLOADS_DIR_NAME
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,7 +51,7 @@ class StorageBackup:
             # Cria diretório do backup
             backup_path.mkdir(exist_ok=True)
             
-            # Copia todos os arquivos .pkl e .json
+            # Copia todos os arquivos .pkl, .json e .db (e os DataFrames das análises)
             files_backed_up = []
             
             if self.storage_dir.exists():
@@ -56,6 +60,15 @@ class StorageBackup:
                         dest = backup_path / file.name
                         shutil.copy2(file, dest)
                         files_backed_up.append(file.name)
+                    elif file.suffix == '.db':
+                        # API de backup do SQLite: cópia consistente mesmo com a base aberta
+                        with closing(sqlite3.connect(file)) as source, \
+                                closing(sqlite3.connect(backup_path / file.name)) as dest:
+                            source.backup(dest)
+                        files_backed_up.append(file.name)
+                    elif file.is_dir() and file.name == PAYLOADS_DIR_NAME:
+                        shutil.copytree(file, backup_path / file.name, dirs_exist_ok=True)
+                        files_backed_up.append(file.name)
             
             # Cria manifesto do backup
             manifest = {
@@ -111,6 +124,16 @@ class StorageBackup:
                     dest = self.storage_dir / file.name
                     shutil.copy2(file, dest)
                     files_restored.append(file.name)
+                elif file.suffix == '.db':
+                    # Escreve através do SQLite: ligações abertas à base veem os dados restaurados
+                    with closing(sqlite3.connect(file)) as source, \
+                            closing(sqlite3.connect(self.storage_dir / file.name)) as dest:
+                        source.backup(dest)
+                    files_restored.append(file.name)
+                elif file.is_dir() and file.name == PAYLOADS_DIR_NAME:
+                    shutil.rmtree(self.storage_dir / file.name, ignore_errors=True)
+                    shutil.copytree(file, self.storage_dir / file.name)
+                    files_restored.append(file.name)
             
             logger.info(f"Backup restaurado: {backup_name} ({len(files_restored)} arquivos)")
             return True
@@ -0,0 +1,38 @@
+# tests/test_absenteeism_periods.py
+# Responsabilidade: Garantir que a tendência em blocos coincide com a tendência sobre o arquivo inteiro.
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from logic.absenteeism_processor import AbsenteeismProcessor
+
+COLUMN_MAPPING = {'Matricula': 'id_colaborador', 'Inicio': 'data_inicio', 'Fim': 'data_fim'}
+
+
+def _absences(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp("2023-10-01") + pd.to_timedelta(rng.integers(0, 500, n), unit="D")
+    ends = starts + pd.to_timedelta(rng.integers(0, 15, n), unit="D")
+    return pd.DataFrame({
+        'Matricula': rng.integers(1, 40, n).astype(str),
+        'Inicio': starts.strftime('%d/%m/%Y'),
+        'Fim': ends.strftime('%d/%m/%Y'),
+    })
+
+
+def test_chunked_trend_matches_full_read():
+    processor = AbsenteeismProcessor()
+    df = _absences()
+    periods = processor.build_periods(date(2024, 1, 1), date(2024, 12, 31), 'mensal')
+    args = dict(periods=periods, total_employees=50, column_mapping=COLUMN_MAPPING, uf="RJ")
+
+    expected = processor.process_periods(df=df, **args)
+    # Blocos pequenos: os atestados consecutivos de um colaborador ficam em blocos diferentes
+    chunks = (df.iloc[i:i + 37] for i in range(0, len(df), 37))
+    result = processor.process_periods_chunks(chunks=chunks, **args)
+
+    assert expected['total_dias_ausencia'].sum() > 0
+    pdt.assert_frame_equal(result, expected)
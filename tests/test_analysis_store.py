@@ -0,0 +1,125 @@
+# tests/test_analysis_store.py
+# Responsabilidade: Verificar o armazenamento indexado das análises (SQLite + payloads) e o LazyData.
+
+import pickle
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from models.analysis import AnalysisResult
+from models.enums import AnalysisType, RiskLevel
+from services.analysis_store import AnalysisStore, LazyData
+
+
+def _analysis(analysis_id="abc123", n=3):
+    return AnalysisResult(
+        id=analysis_id,
+        type=AnalysisType.ABSENTEEISM,
+        name=f"Análise {analysis_id}",
+        timestamp=datetime(2026, 1, 1, 12, 0),
+        data={
+            'taxa_absentismo': 4.2,
+            'df_bradford': pd.DataFrame({'id_colaborador': [f"C{i}" for i in range(n)], 'fator_bradford': range(n)}),
+            'df_spells': pd.DataFrame({'dias_ausencia': [1, 2, 3][:n]}),
+        },
+        metadata={'setor': 'TI'},
+        risk_level=RiskLevel.LOW
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalysisStore(tmp_path)
+    yield store
+    store.close()
+
+
+def _payload_files(store, analysis_id):
+    return sorted(path.name for path in (store.payloads_dir / analysis_id).iterdir())
+
+
+def test_save_and_reload_round_trip(store, tmp_path):
+    original = _analysis()
+    store.save_analysis(original)
+
+    reopened = AnalysisStore(tmp_path)
+    try:
+        loaded = reopened.get_analysis("abc123")
+        assert isinstance(loaded.data, LazyData)
+        assert not loaded.data.is_loaded('df_bradford')
+        assert loaded.name == original.name and loaded.risk_level == RiskLevel.LOW
+        assert loaded.data['taxa_absentismo'] == 4.2
+        pd.testing.assert_frame_equal(loaded.data['df_bradford'], original.data['df_bradford'])
+        assert loaded.data.is_loaded('df_bradford')
+        assert reopened.count() == 1
+    finally:
+        reopened.close()
+
+
+def test_resave_unloaded_lazy_data_keeps_payloads(store, tmp_path):
+    store.save_analysis(_analysis())
+    files = _payload_files(store, "abc123")
+
+    reopened = AnalysisStore(tmp_path)
+    try:
+        loaded = reopened.get_analysis("abc123")
+        loaded.name = "Renomeada"
+        reopened.save_analysis(loaded)
+        # Payloads ainda por ler mantêm os ficheiros existentes
+        assert _payload_files(reopened, "abc123") == files
+
+        again = AnalysisStore(tmp_path)
+        try:
+            result = again.get_analysis("abc123")
+            assert result.name == "Renomeada"
+            pd.testing.assert_frame_equal(result.data['df_spells'], _analysis().data['df_spells'])
+        finally:
+            again.close()
+    finally:
+        reopened.close()
+
+
+def test_orphaned_payloads_are_removed(store):
+    store.save_analysis(_analysis())
+    old_files = _payload_files(store, "abc123")
+    (store.payloads_dir / "abc123" / "interrompido.parquet").write_bytes(b"")
+
+    store.save_analysis(_analysis(n=2))
+    new_files = _payload_files(store, "abc123")
+    assert len(new_files) == 2
+    assert not set(new_files) & set(old_files)
+    assert len(store.get_analysis("abc123").data['df_bradford']) == 2
+
+
+def test_lazy_data_pickles_as_plain_dict(store):
+    store.save_analysis(_analysis())
+    data = store.get_analysis("abc123").data
+
+    restored = pickle.loads(pickle.dumps(data))
+    assert type(restored) is dict
+    pd.testing.assert_frame_equal(restored['df_bradford'], _analysis().data['df_bradford'])
+    assert restored.keys() == data.keys()
+    assert restored['taxa_absentismo'] == data['taxa_absentismo']
+
+
+def test_legacy_pickle_migrated_once(tmp_path, monkeypatch):
+    from services import storage
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage.PersistentStorage, "_instance", None)
+    (tmp_path / storage.STORAGE_DIR).mkdir()
+    with open(storage.ANALYSES_FILE, 'wb') as f:
+        pickle.dump([_analysis("a1"), _analysis("a2")], f)
+
+    persistent = storage.PersistentStorage()
+    try:
+        assert [a.id for a in persistent.get_analyses()] == ["a1", "a2"]
+        assert not (tmp_path / storage.ANALYSES_FILE).exists()
+        assert (tmp_path / (storage.ANALYSES_FILE + ".migrado")).exists()
+
+        # Nova inicialização: o .migrado não volta a ser importado
+        persistent._migrate_analyses_pickle()
+        assert persistent.analysis_store.count() == 2
+    finally:
+        persistent.analysis_store.close()
@@ -0,0 +1,39 @@
+# tests/test_business_calendar.py
+# Responsabilidade: Verificar os feriados aplicados pelo calendário de dias úteis.
+
+from datetime import date
+
+import numpy as np
+
+from logic.business_calendar import get_business_calendar, list_holidays
+
+
+def test_consciencia_negra_only_from_2024():
+    holidays = list_holidays(2022, 2025)
+    assert date(2022, 11, 20) not in holidays
+    assert date(2023, 11, 20) not in holidays
+    assert date(2024, 11, 20) in holidays
+    assert date(2025, 11, 20) in holidays
+
+
+def test_consciencia_negra_business_days():
+    busdaycal = get_business_calendar(2023, 2024)
+    # 20/11/2023 e 20/11/2024 são, respetivamente, segunda e quarta-feira
+    assert np.is_busday(np.datetime64('2023-11-20'), busdaycal=busdaycal)
+    assert not np.is_busday(np.datetime64('2024-11-20'), busdaycal=busdaycal)
+
+
+def test_consciencia_negra_local_laws_before_2024():
+    # 20/11/2020 foi uma sexta-feira
+    day = np.datetime64('2020-11-20')
+    assert np.is_busday(day, busdaycal=get_business_calendar(2020, 2020))
+    assert np.is_busday(day, busdaycal=get_business_calendar(2020, 2020, "SP"))
+    assert not np.is_busday(day, busdaycal=get_business_calendar(2020, 2020, "RJ"))
+    assert not np.is_busday(day, busdaycal=get_business_calendar(2020, 2020, "SP", "São Paulo"))
+
+
+def test_consciencia_negra_local_start_year():
+    assert date(2002, 11, 20) not in list_holidays(2002, 2002, "RJ")
+    assert date(2003, 11, 20) in list_holidays(2003, 2003, "RJ")
+    assert date(2003, 11, 20) not in list_holidays(2003, 2003, "SP", "São Paulo")
+    assert date(2004, 11, 20) in list_holidays(2004, 2004, "SP", "São Paulo")
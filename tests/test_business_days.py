@@ -0,0 +1,98 @@
+# tests/test_business_days.py
+# Responsabilidade: Garantir que a contagem vetorizada de dias úteis coincide com a implementação de referência.
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.absenteeism_processor import AbsenteeismProcessor
+from logic.business_calendar import get_business_calendar
+
+PERIOD_START = date(2024, 1, 1)
+PERIOD_END = date(2024, 12, 31)
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return AbsenteeismProcessor()
+
+
+def _reference(processor, starts, ends, period_start, period_end, busdaycal=None):
+    """_calculate_business_days linha a linha, com as datas recortadas ao período."""
+    result = []
+    for start, end in zip(starts, ends):
+        if pd.isna(start) or pd.isna(end):
+            result.append(0)
+            continue
+        start = max(pd.Timestamp(start).date(), period_start)
+        end = min(pd.Timestamp(end).date(), period_end)
+        result.append(processor._calculate_business_days(start, end, busdaycal))
+    return result
+
+
+def _assert_same(processor, spells, period_start=PERIOD_START, period_end=PERIOD_END, busdaycal=None):
+    starts = pd.Series(pd.to_datetime([s for s, _ in spells]))
+    ends = pd.Series(pd.to_datetime([e for _, e in spells]))
+    vectorized = processor._calculate_business_days_vectorized(
+        starts, ends, period_start, period_end, busdaycal
+    )
+    expected = _reference(processor, starts, ends, period_start, period_end, busdaycal)
+    assert vectorized.tolist() == expected
+    return expected
+
+
+@pytest.mark.parametrize("spell, expected", [
+    (("2024-03-09", "2024-03-10"), 0),   # sábado a domingo
+    (("2024-03-08", "2024-03-11"), 2),   # sexta a segunda
+    (("2024-03-04", "2024-03-17"), 10),  # duas semanas completas
+])
+def test_weekends(processor, spell, expected):
+    assert _assert_same(processor, [spell]) == [expected]
+
+
+@pytest.mark.parametrize("day, expected", [
+    ("2024-03-06", 1),  # quarta-feira
+    ("2024-03-09", 0),  # sábado
+])
+def test_same_day_spell(processor, day, expected):
+    assert _assert_same(processor, [(day, day)]) == [expected]
+
+
+def test_start_after_end(processor):
+    assert _assert_same(processor, [("2024-03-15", "2024-03-11")]) == [0]
+
+
+def test_missing_dates(processor):
+    spells = [(None, "2024-03-11"), ("2024-03-11", None), (None, None), ("2024-03-11", "2024-03-12")]
+    assert _assert_same(processor, spells) == [0, 0, 0, 2]
+
+
+def test_holidays(processor):
+    busdaycal = get_business_calendar(2024, 2024)
+    spells = [
+        ("2024-12-23", "2024-12-27"),  # semana do Natal (quarta-feira, 25/12)
+        ("2024-04-21", "2024-04-21"),  # Tiradentes, num domingo
+        ("2024-05-01", "2024-05-01"),  # Dia do Trabalho, quarta-feira
+    ]
+    assert _assert_same(processor, spells, busdaycal=busdaycal) == [4, 0, 0]
+
+
+def test_spells_clipped_to_period(processor):
+    spells = [
+        ("2023-12-28", "2024-01-03"),  # começa antes do período
+        ("2024-12-30", "2025-01-06"),  # termina depois do período
+        ("2023-06-01", "2023-06-30"),  # inteiramente fora do período
+    ]
+    assert _assert_same(processor, spells) == [3, 2, 0]
+
+
+def test_random_spells(processor):
+    rng = np.random.default_rng(42)
+    starts = pd.Timestamp("2023-11-01") + pd.to_timedelta(rng.integers(0, 500, 300), unit="D")
+    ends = starts + pd.to_timedelta(rng.integers(-5, 40, 300), unit="D")
+    spells = list(zip(starts, ends))
+    spells[::37] = [(None, e) for _, e in spells[::37]]
+    busdaycal = get_business_calendar(2023, 2025, "SP", "São Paulo")
+    _assert_same(processor, spells, busdaycal=busdaycal)
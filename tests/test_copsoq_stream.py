@@ -0,0 +1,41 @@
+# tests/test_copsoq_stream.py
+# Responsabilidade: Verificar que a agregação COPSOQ lote a lote coincide com o cálculo numa só passagem.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.copsoq_processor import COPSOQProcessor
+from logic.copsoq_stream import COPSOQStreamAggregator, TOTAL_GROUP
+
+
+@pytest.fixture(scope="module")
+def respostas():
+    processor = COPSOQProcessor()
+    columns = list(processor.layout_for([f"P{i}" for i in range(1, 200)]).items)
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.integers(1, 6, (200, len(columns))).astype(float), columns=columns)
+    df.iloc[::9, 4] = np.nan
+    df["setor"] = rng.choice(["A", "B", "C"], 200)
+    return df
+
+
+def test_batch_merge_matches_single_pass(respostas):
+    aggregator = COPSOQStreamAggregator(group_col="setor")
+    # Lotes de tamanhos diferentes, incluindo um lote com um único respondente
+    for k, (start, end) in enumerate([(0, 1), (1, 40), (40, 115), (115, 200)]):
+        aggregator.update(respostas.iloc[start:end].copy(), f"lote{k}")
+
+    scores = COPSOQProcessor().score_respondents(respostas.drop(columns="setor").copy())
+    stats = aggregator.group_stats(min_group_size=1)
+
+    for group, reference in [(TOTAL_GROUP, scores), ("B", scores[respostas["setor"] == "B"])]:
+        merged = stats[stats["grupo"] == group].set_index("escala")
+        for scale in reference.columns:
+            assert merged.loc[scale, "n"] == reference[scale].count()
+            assert merged.loc[scale, "media"] == pytest.approx(reference[scale].mean(), rel=1e-12)
+            assert merged.loc[scale, "desvio_padrao"] == pytest.approx(reference[scale].std(), rel=1e-9)
+
+    # O estado gravado e relido continua a coincidir
+    reloaded = COPSOQStreamAggregator.from_dict(aggregator.to_dict())
+    pd.testing.assert_frame_equal(reloaded.group_stats(min_group_size=1), stats)
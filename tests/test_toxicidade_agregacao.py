@@ -0,0 +1,61 @@
+# tests/test_toxicidade_agregacao.py
+# Responsabilidade: Verificar os agregados 360° das avaliações de toxicidade.
+
+import pytest
+
+from logic.toxicidade_agregacao import AgregadorLiderancas, MIN_AVALIADORES
+
+
+def _avaliacao(lider, pontuacao, departamento="TI"):
+    return {
+        "timestamp": f"2026-01-01T00:00:{int(pontuacao) % 60:02d}",
+        "dados_participante": {"lider": lider, "departamento": departamento},
+        "pontuacao_total": pontuacao,
+        "nivel_risco_geral": "Baixo" if pontuacao < 50 else "Alto",
+        "pontuacoes_dimensoes": {"Dimensão A": pontuacao, "Dimensão B": pontuacao / 2},
+    }
+
+
+@pytest.fixture
+def agregador(tmp_path):
+    agregador = AgregadorLiderancas(tmp_path / "agregados.db")
+    yield agregador
+    agregador.fechar()
+
+
+def test_perfil_below_threshold_reveals_only_count(agregador):
+    for pontuacao in range(MIN_AVALIADORES - 1):
+        agregador.registar(_avaliacao("Ana", 10 + pontuacao))
+
+    perfil = agregador.perfil("Ana")
+    assert perfil == {"chave": "Ana", "tipo": "lider", "n_avaliadores": MIN_AVALIADORES - 1,
+                      "anonimato_garantido": False}
+    assert agregador.listar("lider") == []
+    assert agregador.listar("lider", min_avaliadores=1) == ["Ana"]
+    assert agregador.resumo("lider")[0]["media_total"] is None
+
+    agregador.registar(_avaliacao("Ana", 40))
+    perfil = agregador.perfil("Ana")
+    assert perfil["anonimato_garantido"] and "medias_dimensoes" in perfil
+    assert agregador.listar("lider") == ["Ana"]
+
+
+def test_incremental_matches_full_rebuild(agregador):
+    avaliacoes = [
+        _avaliacao(lider, 7.5 * i % 100, departamento)
+        for i, (lider, departamento) in enumerate(
+            [("Ana", "TI"), ("Rui", "RH"), ("Ana", "RH"), ("Eva", "TI"), ("Rui", "RH")] * 4
+        )
+    ]
+    # Avaliação sem líder nem departamento só conta para o agregado geral
+    avaliacoes.append({**_avaliacao("", 33.3), "dados_participante": {}})
+
+    for avaliacao in avaliacoes:
+        agregador.registar(avaliacao)
+    assert agregador.verificar(avaliacoes) == []
+    assert agregador.verificar(avaliacoes[:-1]) != []
+
+    incremental = agregador.resumo("lider")
+    agregador.reconstruir(avaliacoes)
+    assert agregador.resumo("lider") == incremental
+    assert agregador.geral()["n_avaliadores"] == len(avaliacoes)
@@ -0,0 +1,106 @@
+# tests/test_toxicidade_store.py
+# Responsabilidade: Verificar o armazém JSONL das avaliações (índice, migração e IDs únicos).
+
+import json
+
+import pytest
+
+from logic.toxicidade_store import ArmazemJSONL
+
+CAMPOS = ("dados_participante.lider",)
+
+
+def _registo(n, lider="Ana"):
+    return {
+        "id": f"avaliacao_{n:03d}",
+        "timestamp": f"2026-01-01T00:00:{n:02d}",
+        "dados_participante": {"lider": lider},
+    }
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return tmp_path / "avaliacoes.jsonl"
+
+
+def test_anexar_e_obter(caminho):
+    armazem = ArmazemJSONL(caminho, CAMPOS)
+    for n in range(5):
+        armazem.anexar(_registo(n, lider="Ana" if n % 2 else "Rui"))
+
+    assert armazem.contar() == 5
+    assert armazem.obter("avaliacao_003") == _registo(3)
+    assert armazem.obter("inexistente") is None
+
+    pagina, total = armazem.paginar(tamanho_pagina=2, filtros={"dados_participante.lider": "Ana"})
+    assert total == 2
+    assert [r["id"] for r in pagina] == ["avaliacao_003", "avaliacao_001"]
+
+    # Outra instância (ex.: outro processo) lê o mesmo .idx
+    assert ArmazemJSONL(caminho, CAMPOS).obter("avaliacao_004") == _registo(4, lider="Rui")
+
+
+def test_indice_reconstruido_apos_truncagem(caminho):
+    armazem = ArmazemJSONL(caminho, CAMPOS)
+    for n in range(3):
+        armazem.anexar(_registo(n))
+    armazem.contar()
+
+    # Gravação interrompida a meio do último registo
+    conteudo = caminho.read_bytes()
+    caminho.write_bytes(conteudo[:-10])
+
+    novo = ArmazemJSONL(caminho, CAMPOS)
+    assert novo.contar() == 2
+    assert novo.obter("avaliacao_002") is None
+    assert novo.obter("avaliacao_001") == _registo(1)
+
+    novo.anexar(_registo(3))
+    assert novo.obter("avaliacao_003") == _registo(3)
+    assert [r["id"] for r in novo.listar()] == ["avaliacao_000", "avaliacao_001", "avaliacao_003"]
+
+
+def test_indice_desatualizado_e_reconstruido(caminho):
+    armazem = ArmazemJSONL(caminho, CAMPOS)
+    for n in range(3):
+        armazem.anexar(_registo(n))
+    armazem.contar()
+
+    # Dados substituídos por outros do mesmo tamanho (ex.: cópia de segurança reposta), .idx antigo
+    substitutos = [_registo(n + 10) for n in range(3)]
+    caminho.write_bytes(b"".join(
+        (json.dumps(r, ensure_ascii=False) + "\n").encode('utf-8') for r in substitutos
+    ))
+
+    novo = ArmazemJSONL(caminho, CAMPOS)
+    assert novo.obter("avaliacao_000") is None
+    assert novo.obter("avaliacao_011") == substitutos[1]
+    assert novo.contar() == 3
+
+
+def test_migracao_unica_do_json(caminho, tmp_path):
+    legado = tmp_path / "avaliacoes.json"
+    legado.write_text(json.dumps([_registo(n) for n in range(4)]), encoding='utf-8')
+
+    armazem = ArmazemJSONL(caminho, CAMPOS)
+    armazem.anexar(_registo(1))  # já presente no JSONL: não é duplicado
+
+    assert armazem.migrar_json(legado) == 3
+    assert not legado.exists()
+    assert legado.with_name("avaliacoes.json.migrado").exists()
+    assert armazem.contar() == 4
+    assert sorted(r["id"] for r in armazem.listar()) == [f"avaliacao_{n:03d}" for n in range(4)]
+
+    # Segunda chamada (ex.: outra sessão): nada a migrar
+    assert armazem.migrar_json(legado) == 0
+    assert armazem.contar() == 4
+
+
+def test_id_repetido_recusado(caminho):
+    armazem = ArmazemJSONL(caminho, CAMPOS)
+    armazem.anexar(_registo(1), exigir_id_unico=True)
+
+    with pytest.raises(ValueError):
+        ArmazemJSONL(caminho, CAMPOS).anexar(_registo(1), exigir_id_unico=True)
+
+    assert armazem.contar() == 1
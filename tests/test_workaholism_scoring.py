@@ -0,0 +1,46 @@
+# tests/test_workaholism_scoring.py
+# Responsabilidade: Verificar a pontuação do DUWAS com respostas incompletas.
+
+import numpy as np
+import pandas as pd
+
+from logic.workaholism_processor import EXCESSIVE, COMPULSIVE, WorkaholismProcessor
+
+
+def test_blank_item_is_prorated():
+    # Q1 em branco: 3 itens a 4 valem o mesmo que 4 itens a 4 (16, não 12)
+    data = pd.DataFrame({f"Q{i}": [4] * 2 for i in range(1, 9)})
+    data.loc[1, "Q1"] = None
+    result = WorkaholismProcessor().score_respondents(data)
+    assert result[EXCESSIVE].tolist() == [16.0, 16.0]
+    assert result["Total"].tolist() == [32.0, 32.0]
+    assert result["Nível de Risco"].nunique() == 1
+
+
+def test_unanswered_subscale_has_no_total():
+    data = pd.DataFrame({f"Q{i}": [None if i <= 4 else 3] for i in range(1, 9)})
+    result = WorkaholismProcessor().score_respondents(data)
+    assert np.isnan(result.loc[0, EXCESSIVE])
+    assert result.loc[0, COMPULSIVE] == 12.0
+    assert np.isnan(result.loc[0, "Total"])
+    assert result.loc[0, "Nível de Risco"] == "N/A"
+    assert result.loc[0, "Quadrante"] == "N/A"
+
+
+def test_form_and_batch_scores_agree():
+    processor = WorkaholismProcessor()
+    answers = [4, 3, None, 2, 1, None, None, 3]
+    form = {
+        key: (None if value is None else {1: "(Quase) Nunca", 2: "Ocasionalmente",
+                                          3: "Frequentemente", 4: "(Quase) Sempre"}[value])
+        for key, value in zip(processor.kernel.keys, answers)
+    }
+    batch = processor.score_respondents(pd.DataFrame([answers], columns=[f"Q{i}" for i in range(1, 9)]))
+
+    scores = processor._calculate_scores(form)
+    assert scores[EXCESSIVE] == batch.loc[0, EXCESSIVE] == 12.0
+    assert scores[COMPULSIVE] == batch.loc[0, COMPULSIVE] == 8.0
+
+    analysis = processor.process("teste", form)
+    assert analysis.metadata["overall_score"] == batch.loc[0, "Total"]
+    assert analysis.risk_level.label == batch.loc[0, "Nível de Risco"]
@@ -0,0 +1,199 @@
+# utils/dataset_cache.py
+# Responsabilidade: Cache em disco (Parquet) dos arquivos de RH já lidos e tipados.
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from config.settings import AppConfig
+from utils.file_validators import FileValidator
+
+logger = logging.getLogger(__name__)
+
+# Versão da leitura (read_file_robust) e do esquema das entradas: faz parte da chave,
+# pelo que ao incrementá-la as entradas lidas pelo código anterior deixam de ser usadas
+PARSER_VERSION = 1
+
+
+class DatasetCache:
+    """
+    Cache endereçada por conteúdo: o hash dos bytes do upload identifica o DataFrame
+    já lido, guardado em Parquet (ou pickle, se o pyarrow não estiver disponível ou
+    o DataFrame não for compatível). Os avisos da leitura original ficam num JSON
+    ao lado, para serem mostrados de novo. Reexecuções e novos uploads do mesmo arquivo
+    carregam em milissegundos. O tamanho total é limitado com despejo LRU.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[int] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else AppConfig.CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if max_size_mb is None:
+            max_size_mb = AppConfig.CACHE_MAX_SIZE_MB
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+
+    @staticmethod
+    def key_for(uploaded_file, variant: str = "") -> str:
+        """
+        Calcula a chave da cache a partir do conteúdo do arquivo, da versão do leitor
+        (PARSER_VERSION) e da versão do pandas, que determina os tipos inferidos.
+
+        Args:
+            uploaded_file: Objeto de arquivo do Streamlit (UploadedFile)
+            variant: Identifica o modo de leitura (ex.: colunas projetadas)
+
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        digest = hashlib.sha256(uploaded_file.getvalue())
+        extension = uploaded_file.name.split('.')[-1].lower()
+        digest.update(f"|{extension}|{variant}|v{PARSER_VERSION}|pandas {pd.__version__}".encode())
+        return digest.hexdigest()
+
+    def _entries(self) -> List[Path]:
+        return [p for p in self.cache_dir.glob('*') if p.suffix in ('.parquet', '.pkl')]
+
+    def _warnings_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Tuple[Optional[pd.DataFrame], List[str]]:
+        """
+        Retorna o DataFrame em cache e os avisos da leitura original ((None, []) se não
+        existir) e marca a entrada como usada recentemente.
+        """
+        for path in (self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.pkl"):
+            if not path.exists():
+                continue
+            try:
+                df = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_pickle(path)
+                warnings_path = self._warnings_path(key)
+                warnings = json.loads(warnings_path.read_text(encoding='utf-8')) if warnings_path.exists() else []
+                os.utime(path, None)
+                logger.info(f"Cache: {path.name} carregado")
+                return df, warnings
+            except Exception as e:
+                logger.warning(f"Cache: entrada corrompida {path.name} removida ({e})")
+                path.unlink(missing_ok=True)
+                self._warnings_path(key).unlink(missing_ok=True)
+        return None, []
+
+    def put(self, key: str, df: pd.DataFrame, warnings: Optional[List[str]] = None):
+        """Guarda o DataFrame (e os avisos da leitura) na cache e aplica o limite de tamanho."""
+        # Os avisos são gravados primeiro: uma entrada visível tem sempre os seus avisos
+        warnings_path = self._warnings_path(key)
+        warnings_tmp = warnings_path.with_suffix('.json.tmp')
+        warnings_tmp.write_text(json.dumps(list(warnings or []), ensure_ascii=False), encoding='utf-8')
+        os.replace(warnings_tmp, warnings_path)
+
+        try:
+            path = self.cache_dir / f"{key}.parquet"
+            tmp_path = path.with_suffix('.parquet.tmp')
+            df.to_parquet(tmp_path)
+        except Exception as e:
+            # pyarrow ausente ou tipos não suportados (ex.: colunas de tipos mistos)
+            logger.info(f"Cache: Parquet indisponível ({e}), a usar pickle")
+            tmp_path.unlink(missing_ok=True)
+            path = self.cache_dir / f"{key}.pkl"
+            tmp_path = path.with_suffix('.pkl.tmp')
+            try:
+                df.to_pickle(tmp_path)
+            except Exception as e:
+                logger.warning(f"Cache: falha ao guardar {key}: {e}")
+                tmp_path.unlink(missing_ok=True)
+                warnings_path.unlink(missing_ok=True)
+                return
+
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """Remove as entradas usadas há mais tempo até respeitar o tamanho máximo."""
+        entries = sorted(self._entries(), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in entries)
+
+        while entries and total > self.max_size_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            self._warnings_path(oldest.stem).unlink(missing_ok=True)
+            logger.info(f"Cache: {oldest.name} removido (LRU)")
+
+    def list_entries(self) -> List[Dict]:
+        """Lista as entradas da cache, das mais recentes para as mais antigas."""
+        entries = []
+        for path in self._entries():
+            stat = path.stat()
+            entries.append({
+                'chave': path.stem[:12],
+                'formato': 'Parquet' if path.suffix == '.parquet' else 'Pickle',
+                'tamanho': f"{stat.st_size / 1024:.2f} KB",
+                'ultimo_uso': datetime.fromtimestamp(stat.st_mtime).strftime('%d/%m/%Y %H:%M'),
+                '_mtime': stat.st_mtime
+            })
+        entries.sort(key=lambda e: e['_mtime'], reverse=True)
+        for entry in entries:
+            entry.pop('_mtime')
+        return entries
+
+    def total_size_mb(self) -> float:
+        return sum(p.stat().st_size for p in self._entries()) / (1024 * 1024)
+
+    def clear(self) -> int:
+        """Remove todas as entradas da cache. Retorna o número de arquivos removidos."""
+        removed = 0
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+            self._warnings_path(path.stem).unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+def read_file_cached(uploaded_file) -> Tuple[Optional[pd.DataFrame], List[str], List[str]]:
+    """
+    Lê o arquivo via FileValidator.read_file_robust, reutilizando a cache em disco.
+
+    Args:
+        uploaded_file: Objeto de arquivo do Streamlit (UploadedFile)
+
+    Returns:
+        Mesma tupla de FileValidator.read_file_robust (DataFrame, avisos, erros); vinda
+        da cache, inclui os avisos da leitura original
+    """
+    if uploaded_file is None:
+        return FileValidator.read_file_robust(uploaded_file)
+
+    cache = DatasetCache()
+    key = cache.key_for(uploaded_file)
+
+    df, warnings = cache.get(key)
+    if df is not None:
+        return df, warnings + ["Arquivo carregado da cache"], []
+
+    df, warnings, errors = FileValidator.read_file_robust(uploaded_file)
+    if df is not None and not errors:
+        cache.put(key, df, warnings)
+    return df, warnings, errors
+
+
+def render_cache_interface():
+    """Renderiza a inspeção e limpeza da cache de arquivos na sidebar."""
+    cache = DatasetCache()
+    entries = cache.list_entries()
+
+    with st.sidebar.expander(f"🗃️ Cache de Arquivos ({len(entries)})"):
+        st.caption(
+            f"{cache.total_size_mb():.1f} MB de {cache.max_size_bytes / (1024 * 1024):.0f} MB"
+        )
+
+        if entries:
+            st.dataframe(pd.DataFrame(entries), hide_index=True, use_container_width=True)
+
+        if st.button("🧹 Limpar Cache", key="btn_clear_dataset_cache", width="stretch"):
+            removed = cache.clear()
+            st.success(f"{removed} arquivo(s) removido(s) da cache")
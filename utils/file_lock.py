@@ -0,0 +1,36 @@
+# utils/file_lock.py
+# Responsabilidade: Bloqueio exclusivo entre processos sobre um arquivo .lock (fcntl/msvcrt).
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def bloqueio_exclusivo(caminho: Path):
+    """
+    Bloqueio exclusivo entre processos sobre um arquivo .lock
+
+    Args:
+        caminho: Arquivo de bloqueio (criado se não existir)
+    """
+    with open(caminho, 'a+b') as f:
+        if os.name == "nt":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
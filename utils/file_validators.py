@@ -3,11 +3,20 @@
 
 import pandas as pd
 import io
+import codecs
 import logging
-from typing import Optional, Tuple, List
+import time
+from typing import Optional, Tuple, List, Dict, Iterator, Union
 
 logger = logging.getLogger(__name__)
 
+try:
+    import python_calamine  # noqa: F401 (motor opcional do pd.read_excel)
+    # O motor 'calamine' só existe no pd.read_excel a partir do pandas 2.2
+    CALAMINE_AVAILABLE = tuple(int(p) for p in pd.__version__.split('.')[:2]) >= (2, 2)
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
 
 class FileValidator:
     """
@@ -21,6 +30,29 @@ class FileValidator:
     # Separadores comuns para CSV
     SEPARATORS = [',', ';', '\t', '|']
     
+    # Marcas de ordem de bytes (BOM) reconhecidas na deteção de encoding
+    BOMS = [
+        (codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16')
+    ]
+    
+    # Linhas da amostra usadas na contagem de separadores
+    SNIFF_LINES = 50
+    
+    # Leitura em blocos (arquivos grandes)
+    CHUNK_SIZE = 50000
+    PROBE_BYTES = 64 * 1024
+    STREAMING_THRESHOLD_MB = 20
+    
+    # Tipos sugeridos por campo mapeado (datas ficam como texto e são convertidas pelo processador)
+    FIELD_DTYPES = {
+        'id_colaborador': 'string',
+        'data_inicio': 'string',
+        'data_fim': 'string',
+        'motivo': 'category'
+    }
+    
     @staticmethod
     def read_file_robust(uploaded_file) -> Tuple[Optional[pd.DataFrame], List[str], List[str]]:
         """
@@ -56,11 +88,37 @@ class FileValidator:
                 errors.append(f"Erro ao ler arquivo Excel: {str(e)}")
                 # Tenta como CSV se falhar
         
-        # Tenta ler como CSV
+        # Deteta encoding e separador numa amostra e lê o arquivo uma única vez
+        sniff_start = time.perf_counter()
+        detected = FileValidator.sniff_csv_format(uploaded_file)
+        sniff_ms = (time.perf_counter() - sniff_start) * 1000
+        
+        if detected is not None:
+            encoding, separator = detected
+            try:
+                df = pd.read_csv(
+                    FileValidator._as_stream(uploaded_file),
+                    sep=separator,
+                    encoding=encoding,
+                    low_memory=False
+                )
+                
+                if df.shape[1] > 1:
+                    if encoding != 'utf-8':
+                        warnings.append(f"Arquivo lido com encoding '{encoding}'")
+                    if separator != ',':
+                        warnings.append(f"Separador '{separator}' detectado")
+                    warnings.append(f"Formato do arquivo detectado em {sniff_ms:.1f} ms")
+                    
+                    logger.info(f"CSV lido com encoding='{encoding}', sep='{separator}' (deteção: {sniff_ms:.1f} ms)")
+                    return df, warnings, errors
+            except (UnicodeDecodeError, pd.errors.ParserError) as e:
+                logger.warning(f"Formato detectado falhou ({encoding}, '{separator}'): {e}. A tentar combinações.")
+        
+        # Recurso: tenta diferentes combinações de encoding e separador
         uploaded_file.seek(0)
         file_content = uploaded_file.getvalue()
         
-        # Tenta diferentes combinações de encoding e separador
         for encoding in FileValidator.ENCODINGS:
             for separator in FileValidator.SEPARATORS:
                 try:
@@ -95,6 +153,258 @@ class FileValidator:
         )
         return None, warnings, errors
     
+    @staticmethod
+    def should_stream(uploaded_file) -> bool:
+        """Indica se o arquivo é grande o suficiente para ser lido em blocos."""
+        size = getattr(uploaded_file, 'size', None)
+        if size is None:
+            size = len(uploaded_file.getvalue())
+        return size > FileValidator.STREAMING_THRESHOLD_MB * 1024 * 1024
+    
+    @staticmethod
+    def build_dtype_hints(column_mapping: Dict[str, str]) -> Dict[str, str]:
+        """
+        Converte o mapeamento de colunas em tipos de leitura para pd.read_csv.
+        
+        Args:
+            column_mapping: Mapeamento {coluna do arquivo: campo da aplicação}
+        
+        Returns:
+            Dicionário {coluna do arquivo: dtype}
+        """
+        return {
+            source: FileValidator.FIELD_DTYPES[target]
+            for source, target in column_mapping.items()
+            if target in FileValidator.FIELD_DTYPES
+        }
+    
+    @staticmethod
+    def _read_head(uploaded_file, n_bytes: int) -> bytes:
+        """Lê os primeiros bytes do arquivo sem alterar a posição de leitura."""
+        uploaded_file.seek(0)
+        if hasattr(uploaded_file, 'read'):
+            head = uploaded_file.read(n_bytes)
+        else:
+            head = uploaded_file.getvalue()[:n_bytes]
+        uploaded_file.seek(0)
+        return head
+    
+    @staticmethod
+    def _as_stream(uploaded_file):
+        """Devolve um objeto legível por pd.read_csv (o próprio arquivo, se possível)."""
+        if hasattr(uploaded_file, 'read'):
+            uploaded_file.seek(0)
+            return uploaded_file
+        return io.BytesIO(uploaded_file.getvalue())
+    
+    @staticmethod
+    def _sniff_encoding(head: bytes) -> str:
+        """
+        Deteta o encoding de uma amostra de bytes: BOM, validade UTF-8 e, por fim, latin-1/cp1252.
+        
+        Args:
+            head: Primeiros bytes do arquivo
+        
+        Returns:
+            Nome do encoding
+        """
+        for bom, encoding in FileValidator.BOMS:
+            if head.startswith(bom):
+                return encoding
+        
+        try:
+            head.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError as e:
+            # Erro apenas num caractere cortado no fim da amostra: continua a ser UTF-8
+            if e.start >= len(head) - 3 and e.reason == 'unexpected end of data':
+                return 'utf-8'
+        
+        # Bytes 0x80-0x9F só têm caracteres imprimíveis em cp1252 (€, aspas curvas, ...)
+        if any(0x80 <= byte <= 0x9F for byte in head):
+            try:
+                head.decode('cp1252')
+                return 'cp1252'
+            except UnicodeDecodeError:
+                pass
+        return 'latin-1'
+    
+    @staticmethod
+    def _sniff_separator(lines: List[str]) -> Optional[str]:
+        """
+        Escolhe o separador com contagem mais consistente (e não nula) entre as linhas da amostra.
+        
+        Args:
+            lines: Linhas iniciais do arquivo (já descodificadas)
+        
+        Returns:
+            Separador detectado ou None
+        """
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return None
+        
+        best_separator, best_score = None, (0.0, 0)
+        for separator in FileValidator.SEPARATORS:
+            counts = [line.count(separator) for line in lines]
+            header_count = counts[0]
+            if header_count == 0:
+                continue
+            consistency = sum(1 for c in counts if c == header_count) / len(counts)
+            score = (consistency, header_count)
+            if score > best_score:
+                best_separator, best_score = separator, score
+        
+        return best_separator
+    
+    @staticmethod
+    def sniff_csv_format(uploaded_file) -> Optional[Tuple[str, str]]:
+        """
+        Deteta encoding e separador lendo apenas o início do arquivo.
+        
+        Args:
+            uploaded_file: Objeto de arquivo do Streamlit (UploadedFile)
+        
+        Returns:
+            Tupla (encoding, separador) ou None se não for possível detetar
+        """
+        head = FileValidator._read_head(uploaded_file, FileValidator.PROBE_BYTES)
+        
+        if not head:
+            return None
+        
+        encoding = FileValidator._sniff_encoding(head)
+        
+        # Descarta a última linha (possivelmente cortada a meio)
+        if len(head) == FileValidator.PROBE_BYTES and b'\n' in head:
+            head = head[:head.rfind(b'\n') + 1]
+        
+        text_content = head.decode(encoding, errors='replace')
+        separator = FileValidator._sniff_separator(
+            text_content.splitlines()[:FileValidator.SNIFF_LINES]
+        )
+        
+        if separator is None:
+            return None
+        return encoding, separator
+    
+    @staticmethod
+    def read_excel_fast(
+        uploaded_file,
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None,
+        sheet_name: Union[str, int] = 0,
+        engine: Optional[str] = 'openpyxl'
+    ) -> pd.DataFrame:
+        """
+        Lê uma folha Excel com pd.read_excel, apenas com as colunas pedidas já tipadas.
+        
+        O motor calamine é opcional: os tipos que devolve (datas, inteiros) ainda não foram
+        comparados com os do openpyxl em todos os relatórios (ver benchmark_leitura_excel.py).
+        
+        Args:
+            uploaded_file: Objeto de arquivo do Streamlit (UploadedFile)
+            usecols: Colunas a ler
+            dtype: Tipos das colunas
+            sheet_name: Nome ou índice da folha
+            engine: 'openpyxl' (padrão), None (escolha do pandas) ou 'calamine'
+                (requer python-calamine e pandas >= 2.2)
+        
+        Returns:
+            DataFrame com o conteúdo da folha
+        """
+        if engine == 'calamine' and not CALAMINE_AVAILABLE:
+            raise ImportError("Motor 'calamine' indisponível: requer python-calamine e pandas >= 2.2")
+        uploaded_file.seek(0)
+        return pd.read_excel(
+            uploaded_file, engine=engine, sheet_name=sheet_name, usecols=usecols, dtype=dtype
+        )
+    
+    @staticmethod
+    def read_file_chunked(
+        uploaded_file,
+        chunksize: Optional[int] = None,
+        usecols: Optional[List[str]] = None,
+        dtype: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[Iterator[pd.DataFrame]], List[str], List[str]]:
+        """
+        Lê um arquivo CSV ou Excel em blocos, sem copiar o conteúdo inteiro para memória.
+        
+        O encoding e o separador são detetados numa amostra do início do arquivo; o
+        arquivo é depois lido diretamente (sem decode/StringIO) bloco a bloco.
+        
+        Args:
+            uploaded_file: Objeto de arquivo do Streamlit (UploadedFile)
+            chunksize: Número de linhas por bloco (padrão: CHUNK_SIZE)
+            usecols: Colunas a ler (ex.: apenas as colunas mapeadas)
+            dtype: Tipos das colunas (ver build_dtype_hints)
+        
+        Returns:
+            Tupla contendo:
+            - Iterador de DataFrames se bem-sucedido, None caso contrário
+            - Lista de avisos
+            - Lista de erros
+        """
+        warnings = []
+        errors = []
+        chunksize = chunksize or FileValidator.CHUNK_SIZE
+        
+        if uploaded_file is None:
+            errors.append("Nenhum arquivo foi carregado")
+            return None, warnings, errors
+        
+        file_extension = uploaded_file.name.split('.')[-1].lower()
+        
+        if file_extension in ['xlsx', 'xls']:
+            # pd.read_excel não suporta leitura em blocos: lê só as colunas pedidas e entrega em fatias
+            try:
+                df = FileValidator.read_excel_fast(
+                    uploaded_file,
+                    usecols=usecols,
+                    dtype=dtype,
+                    engine='openpyxl' if file_extension == 'xlsx' else None
+                )
+                warnings.append("Arquivos Excel são lidos por completo antes de serem processados em blocos")
+                chunks = (df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize))
+                return chunks, warnings, errors
+            except Exception as e:
+                logger.error(f"Erro ao ler Excel: {e}")
+                errors.append(f"Erro ao ler arquivo Excel: {str(e)}")
+                return None, warnings, errors
+        
+        sniff_start = time.perf_counter()
+        detected = FileValidator.sniff_csv_format(uploaded_file)
+        sniff_ms = (time.perf_counter() - sniff_start) * 1000
+        if detected is None:
+            errors.append(
+                "Não foi possível ler o arquivo. Verifique se é um CSV ou Excel válido."
+            )
+            return None, warnings, errors
+        
+        encoding, separator = detected
+        if encoding != 'utf-8':
+            warnings.append(f"Arquivo lido com encoding '{encoding}'")
+        if separator != ',':
+            warnings.append(f"Separador '{separator}' detectado")
+        warnings.append(f"Formato do arquivo detectado em {sniff_ms:.1f} ms")
+        
+        try:
+            reader = pd.read_csv(
+                FileValidator._as_stream(uploaded_file),
+                sep=separator,
+                encoding=encoding,
+                chunksize=chunksize,
+                usecols=usecols,
+                dtype=dtype
+            )
+        except Exception as e:
+            logger.error(f"Erro ao iniciar leitura em blocos: {e}")
+            errors.append(f"Erro ao ler arquivo CSV: {str(e)}")
+            return None, warnings, errors
+        
+        logger.info(f"CSV em blocos de {chunksize} linhas (encoding='{encoding}', sep='{separator}')")
+        return reader, warnings, errors
+    
     @staticmethod
     def validate_dataframe(
         df: pd.DataFrame,